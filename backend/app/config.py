@@ -6,13 +6,18 @@ Reads from environment variables / .env file.
 Defaults to SQLite for local development (no PostgreSQL needed).
 """
 
+from functools import cached_property
 from pydantic_settings import BaseSettings
 from typing import List
 import os
 
 
 class Settings(BaseSettings):
-    """Application settings loaded from environment variables."""
+    """
+    Application settings loaded from environment variables.
+    Derived values (cors_origins, allowed_extensions_list, max_upload_bytes)
+    are computed once on first access.
+    """
     
     # --- Application ---
     APP_NAME: str = "RSA MVP Enhanced"
@@ -22,14 +27,20 @@ class Settings(BaseSettings):
     
     # --- Database (SQLite default for dev, PostgreSQL for production) ---
     DATABASE_URL: str = "sqlite:///./rsa_dev.db"
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 30
+    DB_POOL_TIMEOUT: float = 10.0   # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800     # Recycle connections older than 30 minutes
     
     # --- Redis ---
     REDIS_URL: str = "redis://localhost:6379/0"
+    USE_CELERY: bool = False  # Run resume/JD processing and matching on the Celery worker
+    BACKGROUND_TASK_LIMIT: int = 0  # In-process background tasks run at once; 0 = CPU count
     
     # --- CORS ---
     BACKEND_CORS_ORIGINS: str = "http://localhost:3000,http://localhost:3001"
     
-    @property
+    @cached_property
     def cors_origins(self) -> List[str]:
         return [origin.strip() for origin in self.BACKEND_CORS_ORIGINS.split(",")]
     
@@ -37,22 +48,27 @@ class Settings(BaseSettings):
     HUGGINGFACE_API_TOKEN: str = ""
     OPENAI_API_KEY: str = ""
     EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
+    PRELOAD_EMBEDDING_MODEL: bool = False  # Off by default: ~100MB+ RAM per worker
+    GENERATE_EMBEDDINGS: bool = False  # Embed resumes/JDs during processing; loads the model on first use
+    EMBEDDING_BACKEND: str = "torch"  # "onnx" runs the int8-quantized ONNX export on ONNX Runtime
+    EMBEDDING_ONNX_FILE: str = "onnx/model_qint8_avx512_vnni.onnx"
     
     # --- File Upload ---
     MAX_UPLOAD_SIZE_MB: int = 10
     ALLOWED_EXTENSIONS: str = "pdf,docx,txt,doc"
     UPLOAD_DIR: str = os.path.join(os.path.dirname(os.path.dirname(__file__)), "uploads")
     
-    @property
+    @cached_property
     def allowed_extensions_list(self) -> List[str]:
         return [ext.strip().lower() for ext in self.ALLOWED_EXTENSIONS.split(",")]
     
-    @property
+    @cached_property
     def max_upload_bytes(self) -> int:
         return self.MAX_UPLOAD_SIZE_MB * 1024 * 1024
     
     # --- Data Retention ---
     DATA_RETENTION_DAYS: int = 90
+    AUDIT_HASH_KEY: str = ""  # HMAC key for hashed audit fields; falls back to SECRET_KEY
     
     # --- ATS Webhook ---
     ATS_WEBHOOK_URL: str = ""
@@ -63,6 +79,8 @@ class Settings(BaseSettings):
     DEFAULT_EXPERIENCE_WEIGHT: float = 0.3
     DEFAULT_EDUCATION_WEIGHT: float = 0.2
     DEFAULT_SEMANTIC_WEIGHT: float = 0.1
+    MATCH_WORKERS: int = 0  # Scoring processes for large sessions; 0 = CPU count, 1 = serial
+    MATCH_PARALLEL_MIN_CANDIDATES: int = 500
     
     # --- Auth ---
     JWT_ALGORITHM: str = "HS256"
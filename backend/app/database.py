@@ -5,10 +5,23 @@ SQLAlchemy engine, session management, and base model.
 Automatically detects SQLite vs PostgreSQL from DATABASE_URL.
 """
 
-from sqlalchemy import create_engine, event
+import logging
+import os
+import time
+import uuid
+from functools import lru_cache
+
+from sqlalchemy import JSON, DateTime, create_engine, event, inspect, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.expression import FunctionElement
 from app.config import settings
+from app.utils.responses import json_bytes, json_loads, orjson
+
+logger = logging.getLogger(__name__)
 
 # Fix Render's postgres:// URL to postgresql:// (required by SQLAlchemy 2.x)
 DATABASE_URL = settings.DATABASE_URL
@@ -17,32 +30,75 @@ if DATABASE_URL.startswith("postgres://"):
 
 # Detect database type
 is_sqlite = DATABASE_URL.startswith("sqlite")
+is_sqlite_memory = is_sqlite and (":memory:" in DATABASE_URL or DATABASE_URL.rstrip("/") == "sqlite:")
 
 # Create engine with appropriate config
 engine_kwargs = {}
 if is_sqlite:
     # SQLite needs check_same_thread = False for FastAPI
     engine_kwargs["connect_args"] = {"check_same_thread": False}
+    if not is_sqlite_memory:
+        # Keep a sized pool of open file connections so requests don't pay
+        # sqlite3_open + PRAGMA setup on every checkout
+        engine_kwargs["poolclass"] = QueuePool
+        engine_kwargs["pool_size"] = settings.DB_POOL_SIZE
+        engine_kwargs["max_overflow"] = settings.DB_MAX_OVERFLOW
+        engine_kwargs["pool_timeout"] = settings.DB_POOL_TIMEOUT
+        engine_kwargs["pool_pre_ping"] = True
 else:
     # PostgreSQL with connection pooling
-    engine_kwargs["pool_size"] = 10
-    engine_kwargs["max_overflow"] = 20
+    engine_kwargs["pool_size"] = settings.DB_POOL_SIZE
+    engine_kwargs["max_overflow"] = settings.DB_MAX_OVERFLOW
+    engine_kwargs["pool_timeout"] = settings.DB_POOL_TIMEOUT
+    engine_kwargs["pool_recycle"] = settings.DB_POOL_RECYCLE
     engine_kwargs["pool_pre_ping"] = True
 
+
+def _json_serializer(value) -> str:
+    return json_bytes(value).decode("utf-8")
+
+
+# JSON/JSONB columns (compressed_data, bias_flags, ...) encode and decode with
+# orjson when it is installed; otherwise SQLAlchemy's stdlib defaults apply
+JSON_ENGINE_KWARGS = {"json_serializer": _json_serializer, "json_deserializer": json_loads} if orjson else {}
+
 engine = create_engine(
     DATABASE_URL,
     echo=settings.DEBUG,
+    # Room for every model's compiled SELECT/INSERT/UPDATE forms (default 500)
+    query_cache_size=1200,
+    # Rows per multi-VALUES INSERT statement when inserting in bulk
+    insertmanyvalues_page_size=1000,
+    **JSON_ENGINE_KWARGS,
     **engine_kwargs,
 )
 
-# Enable WAL mode for SQLite (better concurrency)
+def set_sqlite_pragma(dbapi_connection, connection_record):
+    """WAL mode + performance pragmas for every new SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    # WAL + NORMAL only fsyncs at checkpoints, not on every commit
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-64000")       # ~64MB page cache
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=2147483648")    # 2GB memory-mapped reads
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.execute("PRAGMA wal_autocheckpoint=1000")  # Bound WAL growth
+    cursor.close()
+
+
+# Enable WAL mode + performance pragmas for SQLite
 if is_sqlite:
-    @event.listens_for(engine, "connect")
-    def set_sqlite_pragma(dbapi_connection, connection_record):
-        cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA journal_mode=WAL")
-        cursor.execute("PRAGMA foreign_keys=ON")
-        cursor.close()
+    event.listen(engine, "connect", set_sqlite_pragma)
+
+    @event.listens_for(engine, "close")
+    def optimize_sqlite_on_close(dbapi_connection, connection_record):
+        # Let SQLite refresh query-planner statistics before the connection goes away
+        try:
+            dbapi_connection.execute("PRAGMA optimize")
+        except Exception:
+            pass
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -51,6 +107,58 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+# JSON on SQLite, binary JSONB on PostgreSQL (pre-parsed reads, GIN-indexable)
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
+
+def new_id() -> str:
+    """
+    Generate a time-ordered UUIDv7 string for primary keys.
+    The leading 48-bit millisecond timestamp keeps new keys appending to the
+    right edge of the PK B-tree instead of splitting random pages.
+    """
+    ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (
+        (ms & 0xFFFFFFFFFFFF) << 80
+        | 0x7 << 76                          # version 7
+        | ((rand >> 64) & 0xFFF) << 64       # rand_a
+        | 0b10 << 62                         # RFC 4122 variant
+        | (rand & 0x3FFFFFFFFFFFFFFF)        # rand_b
+    )
+    return str(uuid.UUID(int=value))
+
+
+class utcnow(FunctionElement):
+    """
+    Current UTC timestamp evaluated by the database. Timestamp columns use
+    it as both default (rendered into the INSERT, so rows on tables created
+    before the server default get a value) and server_default. Columns stay
+    naive DateTime holding UTC.
+    """
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow, "postgresql")
+def _pg_utcnow(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+@compiles(utcnow, "sqlite")
+def _sqlite_utcnow(element, compiler, **kw):
+    # CURRENT_TIMESTAMP only has second precision; keep milliseconds so
+    # ORDER BY created_at stays stable for rows inserted in the same second.
+    # Pad to microseconds to match how SQLAlchemy stores bound datetimes,
+    # otherwise text comparisons against parameters are off.
+    return "(STRFTIME('%Y-%m-%d %H:%M:%f000', 'now'))"
+
+
+@compiles(utcnow)
+def _default_utcnow(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
 def get_db():
     """
     Dependency that provides a database session.
@@ -63,8 +171,104 @@ def get_db():
         db.close()
 
 
+@lru_cache(maxsize=4)
+def _sessionmaker_for(db_url: str) -> sessionmaker:
+    connect_args = {"check_same_thread": False} if db_url.startswith("sqlite") else {}
+    engine = create_engine(db_url, connect_args=connect_args, **JSON_ENGINE_KWARGS)
+    if db_url.startswith("sqlite"):
+        # Same WAL/busy_timeout setup as the app engine, so these writers
+        # don't hit "database is locked" against it
+        event.listen(engine, "connect", set_sqlite_pragma)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def background_session(db_url: str = "") -> Session:
+    """
+    Open a session for background tasks and Celery jobs.
+    The app's own DATABASE_URL reuses the shared engine and its pool; any
+    other URL gets one cached engine instead of a new one per task.
+    """
+    if not db_url or db_url in (DATABASE_URL, settings.DATABASE_URL):
+        return SessionLocal()
+    return _sessionmaker_for(db_url)()
+
+
+def warm_pool(size: int = None):
+    """
+    Open `size` pooled connections up front so connect-time setup
+    (PRAGMAs, TCP/auth handshakes) is paid at startup, not by the first requests.
+    Connections are held simultaneously, otherwise the pool would hand back the same one.
+    """
+    size = size or settings.DB_POOL_SIZE
+    connections = []
+    try:
+        for _ in range(size):
+            conn = engine.connect()
+            conn.execute(text("SELECT 1"))
+            connections.append(conn)
+    finally:
+        for conn in connections:
+            conn.close()
+
+
 def init_db():
     """Create all tables defined in models."""
     # Import all models so they register with Base
     from app.models import candidate, job, match, audit, webhook, user  # noqa
     Base.metadata.create_all(bind=engine)
+    
+    # create_all() skips tables that already exist, so also add any
+    # indexes declared on the models since those tables were created
+    _add_match_session_job_title()
+    _create_missing_indexes()
+
+
+def _create_missing_indexes():
+    """
+    Create model indexes that don't exist yet. Each index is created on its
+    own, so one failure is logged without skipping the rest.
+    """
+    inspector = inspect(engine)
+    is_postgres = engine.dialect.name == "postgresql"
+    for table in Base.metadata.sorted_tables:
+        column_types = {c["name"]: c["type"] for c in inspector.get_columns(table.name)}
+        for index in table.indexes:
+            if is_postgres and _needs_jsonb(index, column_types):
+                logger.warning(
+                    f"⚠️ Skipping index {index.name}: {table.name} columns are not jsonb "
+                    f"(table predates the JSONB column type)"
+                )
+                continue
+            try:
+                index.create(bind=engine, checkfirst=True)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not create index {index.name}: {e}")
+
+
+def _needs_jsonb(index, column_types: dict) -> bool:
+    """
+    True for a GIN index whose columns aren't jsonb in the live schema.
+    JSONType only maps to JSONB in newly created tables, and jsonb_path_ops
+    can't index a plain json column.
+    """
+    if index.dialect_options["postgresql"]["using"] != "gin":
+        return False
+    return not all(isinstance(column_types.get(c.name), JSONB) for c in index.columns)
+
+
+def _add_match_session_job_title():
+    """
+    Add and backfill match_sessions.job_title on databases created before it.
+    The schema is managed with create_all() (there are no migrations), which
+    never alters an existing table, so this one column is upgraded here.
+    Does nothing once the column exists.
+    """
+    columns = {c["name"] for c in inspect(engine).get_columns("match_sessions")}
+    if "job_title" in columns:
+        return
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE match_sessions ADD COLUMN job_title VARCHAR(500)"))
+        conn.execute(text(
+            "UPDATE match_sessions SET job_title = "
+            "(SELECT title FROM jobs WHERE jobs.id = match_sessions.job_id)"
+        ))
@@ -10,10 +10,11 @@ import os
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
 from app.config import settings
-from app.database import init_db
+from app.database import init_db, warm_pool
+from app.services.cache import CacheService
+from app.utils.responses import FastJSONResponse
 from app.routers import resumes, jobs, matching, dashboard, webhooks, auth, gdpr
 
 # Configure logging
@@ -37,6 +38,26 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"⚠️ Database initialization skipped: {e}")
     
+    # Pre-open pooled DB connections
+    try:
+        warm_pool()
+        logger.info("✅ Database connection pool warmed")
+    except Exception as e:
+        logger.warning(f"⚠️ Database pool warm-up skipped: {e}")
+    
+    # Connect Redis now rather than on the first authenticated request
+    if CacheService.ping():
+        logger.info("✅ Redis connected")
+    
+    # Load the embedding model up front when enabled (memory-heavy, so opt-in)
+    if settings.PRELOAD_EMBEDDING_MODEL:
+        try:
+            from app.services.matcher import get_embedding_model
+            get_embedding_model()
+            logger.info("✅ Embedding model preloaded")
+        except Exception as e:
+            logger.warning(f"⚠️ Embedding model preload skipped: {e}")
+    
     # Create upload directory
     os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
     logger.info(f"📁 Upload directory: {settings.UPLOAD_DIR}")
@@ -45,6 +66,7 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("🛑 Shutting down RSA MVP Enhanced")
+    matching.shutdown_match_executor()
 
 
 # Create FastAPI application
@@ -72,6 +94,8 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     lifespan=lifespan,
+    # orjson-backed encoding for every JSON endpoint
+    default_response_class=FastJSONResponse,
 )
 
 # CORS middleware
@@ -83,6 +107,7 @@ app.add_middleware(
     allow_credentials=use_credentials,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Keyset cursor on paginated lists
 )
 
 # Include routers
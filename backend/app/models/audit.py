@@ -4,26 +4,31 @@ RSA MVP Enhanced — Audit Log Model
 Tracks all significant operations for GDPR compliance.
 """
 
-import uuid
-from datetime import datetime
-from sqlalchemy import Column, String, Text, DateTime, JSON
-from app.database import Base
+from sqlalchemy import Column, String, Text, DateTime, Index
+from app.database import Base, JSONType, new_id, utcnow
 
 
 class AuditLog(Base):
     """Audit log for tracking all significant operations."""
     
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        # Audit trail: filter by entity, newest first
+        Index("ix_audit_logs_entity_created", "entity_type", "entity_id", "created_at"),
+        Index("ix_audit_logs_entity_id_created", "entity_id", "created_at"),
+        # GDPR status counts per action
+        Index("ix_audit_logs_action_created", "action", "created_at"),
+    )
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String(36), primary_key=True, default=new_id)
     entity_type = Column(String(50), nullable=False)   # candidate, job, match_session
     entity_id = Column(String(36), nullable=True)
     action = Column(String(50), nullable=False)         # created, processed, deleted, exported
-    details = Column(JSON, nullable=True)
+    details = Column(JSONType, nullable=True)
     user_id = Column(String(36), nullable=True)
     company_id = Column(String(36), nullable=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
     
     def __repr__(self):
         return f"<AuditLog(action='{self.action}', entity='{self.entity_type}:{self.entity_id}')>"
@@ -5,29 +5,42 @@ SQLAlchemy ORM model for candidate/resume data.
 Uses JSON columns for cross-database compatibility (SQLite + PostgreSQL).
 """
 
-import uuid
 from datetime import datetime, timedelta
-from sqlalchemy import Column, String, Text, Float, DateTime, LargeBinary, JSON
-from app.database import Base
+from sqlalchemy import Column, String, Text, Float, DateTime, LargeBinary, Index
+from sqlalchemy.orm import column_property
+from app.database import Base, JSONType, new_id, utcnow
 
 
 class Candidate(Base):
     """Represents a candidate whose resume has been uploaded and processed."""
     
     __tablename__ = "candidates"
+    __table_args__ = (
+        # Skill containment lookups (skills @> '["python"]'), PostgreSQL only
+        Index(
+            "ix_candidates_skills_gin", "skills",
+            postgresql_using="gin", postgresql_ops={"skills": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+        # Dashboard: recent activity feed
+        Index("ix_candidates_created_at", "created_at"),
+        # Candidate list: WHERE status = ? ORDER BY created_at DESC
+        Index("ix_candidates_status_created_at", "status", "created_at"),
+        # Shared-upload reference check before deleting a stored file
+        Index("ix_candidates_file_path", "file_path"),
+    )
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String(36), primary_key=True, default=new_id)
     name = Column(String(300), nullable=True, default="")
     email = Column(String(300), nullable=True, default="")
     phone = Column(String(50), nullable=True, default="")
     
     # Original and processed content
     original_text = Column(Text, nullable=True)
-    compressed_data = Column(JSON, nullable=True)   # Structured JSON from NLP
+    compressed_data = Column(JSONType, nullable=True)   # Structured JSON from NLP
     embedding = Column(LargeBinary, nullable=True)   # Serialized vector
     
     # Extracted fields
-    skills = Column(JSON, nullable=True)             # List of skills as JSON
+    skills = Column(JSONType, nullable=True)             # List of skills as JSON
     experience_years = Column(Float, nullable=True, default=0.0)
     education = Column(Text, nullable=True)
     
@@ -35,19 +48,22 @@ class Candidate(Base):
     file_path = Column(String(1000), nullable=True)
     file_type = Column(String(20), nullable=True)
     file_name = Column(String(500), nullable=True)
-    status = Column(String(20), default="uploaded")  # uploaded, parsing, parsed, compressing, compressed, error
+    # active_history loads the old value before a set, so re-setting the
+    # current status (on an expired instance) is recognised as a no-op and
+    # doesn't emit an UPDATE / bump updated_at
+    status = column_property(Column(String(20), default="uploaded", index=True), active_history=True)  # uploaded, parsing, parsed, compressing, compressed, error
     
     # Bias detection
-    bias_flags = Column(JSON, nullable=True)
+    bias_flags = Column(JSONType, nullable=True)
     
     # Company/auth context
-    company_id = Column(String(36), nullable=True)
+    company_id = Column(String(36), nullable=True, index=True)
     uploaded_by = Column(String(36), nullable=True)
     
     # Timestamps & retention
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    expires_at = Column(DateTime, default=lambda: datetime.utcnow() + timedelta(days=90))
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
+    updated_at = Column(DateTime, default=utcnow(), server_default=utcnow(), onupdate=utcnow())
+    expires_at = Column(DateTime, default=lambda: datetime.utcnow() + timedelta(days=90), index=True)
     
     def __repr__(self):
         return f"<Candidate(id={self.id}, name='{self.name}', status='{self.status}')>"
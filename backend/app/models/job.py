@@ -5,18 +5,28 @@ SQLAlchemy ORM model for job descriptions.
 Uses JSON columns for cross-database compatibility.
 """
 
-import uuid
-from datetime import datetime
-from sqlalchemy import Column, String, Text, Float, DateTime, LargeBinary, JSON
-from app.database import Base
+from sqlalchemy import Column, String, Text, Float, DateTime, LargeBinary, Index
+from sqlalchemy.orm import column_property
+from app.database import Base, JSONType, new_id, utcnow
 
 
 class Job(Base):
     """Represents a job description for candidate matching."""
     
     __tablename__ = "jobs"
-    
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    __table_args__ = (
+        # Skill containment lookups (required_skills @> '["python"]'), PostgreSQL only
+        Index(
+            "ix_jobs_required_skills_gin", "required_skills",
+            postgresql_using="gin", postgresql_ops={"required_skills": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+        # Dashboard: newest active jobs
+        Index("ix_jobs_active_created", "is_active", "created_at"),
+        # Keyset pagination for the job list (newest first)
+        Index("ix_jobs_created_at_id", "created_at", "id"),
+    )
+    
+    id = Column(String(36), primary_key=True, default=new_id)
     title = Column(String(500), nullable=False)
     company = Column(String(300), nullable=True, default="")
     department = Column(String(200), nullable=True, default="")
@@ -24,27 +34,27 @@ class Job(Base):
     
     # Original and processed content
     original_text = Column(Text, nullable=True)
-    compressed_data = Column(JSON, nullable=True)
+    compressed_data = Column(JSONType, nullable=True)
     embedding = Column(LargeBinary, nullable=True)
     
     # Extracted fields
-    required_skills = Column(JSON, nullable=True)    # List of required skills
-    preferred_skills = Column(JSON, nullable=True)   # List of preferred skills
+    required_skills = Column(JSONType, nullable=True)    # List of required skills
+    preferred_skills = Column(JSONType, nullable=True)   # List of preferred skills
     experience_range = Column(String(50), nullable=True)  # e.g. "3-5"
     education_requirement = Column(String(200), nullable=True)
     salary_range = Column(String(100), nullable=True)
     
     # Status
-    status = Column(String(20), default="uploaded")  # uploaded, processing, compressed, error
-    is_active = Column(String(5), default="true")    # Whether job is currently active
+    status = column_property(Column(String(20), default="uploaded"), active_history=True)  # uploaded, processing, compressed, error
+    is_active = Column(String(5), default="true", index=True)    # Whether job is currently active
     
     # Company/auth context
-    company_id = Column(String(36), nullable=True)
+    company_id = Column(String(36), nullable=True, index=True)
     created_by = Column(String(36), nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
+    updated_at = Column(DateTime, default=utcnow(), server_default=utcnow(), onupdate=utcnow())
     
     def __repr__(self):
         return f"<Job(id={self.id}, title='{self.title}', status='{self.status}')>"
@@ -5,23 +5,28 @@ SQLAlchemy ORM models for matching operations.
 Uses JSON columns for cross-database compatibility.
 """
 
-import uuid
-from datetime import datetime
-from sqlalchemy import Column, String, Text, Float, Integer, DateTime, Boolean, JSON, ForeignKey
-from sqlalchemy.orm import relationship
-from app.database import Base
+from sqlalchemy import Column, String, Text, Float, Integer, DateTime, Boolean, ForeignKey, Index
+from sqlalchemy.orm import column_property, relationship
+from app.database import Base, JSONType, new_id, utcnow
 
 
 class MatchSession(Base):
     """Represents a matching session between candidates and a job."""
     
     __tablename__ = "match_sessions"
-    
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    __table_args__ = (
+        # Job analytics: a job's sessions, newest first; dashboard matched counts
+        Index("ix_match_sessions_job_created", "job_id", "created_at"),
+        # Keyset pagination for the session list (newest first)
+        Index("ix_match_sessions_created_at_id", "created_at", "id"),
+    )
+    
+    id = Column(String(36), primary_key=True, default=new_id)
     job_id = Column(String(36), nullable=False)
+    job_title = Column(String(500), nullable=True)  # Copied from the job at creation, so listings skip the join
     
-    status = Column(String(20), default="pending")  # pending, processing, completed, failed
-    config = Column(JSON, nullable=True)
+    status = column_property(Column(String(20), default="pending"), active_history=True)  # pending, processing, completed, failed
+    config = Column(JSONType, nullable=True)
     
     total_candidates = Column(Integer, default=0)
     processed_candidates = Column(Integer, default=0)
@@ -31,7 +36,7 @@ class MatchSession(Base):
     created_by = Column(String(36), nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
     
@@ -46,10 +51,24 @@ class MatchResult(Base):
     """Individual match result for a candidate in a session."""
     
     __tablename__ = "match_results"
-    
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    session_id = Column(String(36), ForeignKey("match_sessions.id"), nullable=False)
-    candidate_id = Column(String(36), nullable=False)
+    __table_args__ = (
+        # Ranked reads of a session's results
+        Index("ix_match_results_session_score", "session_id", "overall_score"),
+        # Per-candidate best score for the dashboard leaderboard; on PostgreSQL the
+        # INCLUDE columns let the leaderboard read scores from the index alone
+        Index(
+            "ix_match_results_candidate_score", "candidate_id", "overall_score",
+            postgresql_include=[
+                "session_id", "skill_score", "experience_score", "education_score", "bias_adjusted",
+            ],
+        ),
+        # Report exports read a session's results in rank order
+        Index("ix_match_results_session_rank", "session_id", "rank"),
+    )
+    
+    id = Column(String(36), primary_key=True, default=new_id)
+    session_id = Column(String(36), ForeignKey("match_sessions.id"), nullable=False, index=True)
+    candidate_id = Column(String(36), nullable=False, index=True)
     
     # Multi-dimensional scores (0.0 to 1.0)
     overall_score = Column(Float, default=0.0)
@@ -59,7 +78,7 @@ class MatchResult(Base):
     semantic_score = Column(Float, default=0.0)
     
     # Detailed breakdown
-    score_breakdown = Column(JSON, nullable=True)
+    score_breakdown = Column(JSONType, nullable=True)
     
     # Bias tracking
     bias_adjusted = Column(Boolean, default=False)
@@ -68,7 +87,7 @@ class MatchResult(Base):
     rank = Column(Integer, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
     
     # Relationships
     session = relationship("MatchSession", back_populates="results")
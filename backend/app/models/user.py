@@ -4,18 +4,20 @@ RSA MVP Enhanced — User Model & Auth
 User model for role-based authentication.
 """
 
-import uuid
-from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Boolean
-from app.database import Base
+from sqlalchemy import Column, String, DateTime, Boolean, Index
+from app.database import Base, new_id, utcnow
 
 
 class User(Base):
     """User model for authentication."""
     
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset pagination for the admin user list (newest first)
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String(36), primary_key=True, default=new_id)
     email = Column(String(300), unique=True, nullable=False)
     password_hash = Column(String(200), nullable=False)
     name = Column(String(300), nullable=False)
@@ -29,7 +31,7 @@ class User(Base):
     
     is_active = Column(Boolean, default=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
     last_login = Column(DateTime, nullable=True)
     
     def __repr__(self):
@@ -4,10 +4,8 @@ RSA MVP Enhanced — Webhook Log Model
 Tracks webhook delivery attempts to ATS systems.
 """
 
-import uuid
-from datetime import datetime
-from sqlalchemy import Column, String, Integer, DateTime, JSON
-from app.database import Base
+from sqlalchemy import Column, String, Integer, DateTime
+from app.database import Base, JSONType, new_id, utcnow
 
 
 class WebhookLog(Base):
@@ -15,14 +13,14 @@ class WebhookLog(Base):
     
     __tablename__ = "webhook_logs"
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    event_type = Column(String(50), nullable=False)
-    payload = Column(JSON, nullable=True)
+    id = Column(String(36), primary_key=True, default=new_id)
+    event_type = Column(String(50), nullable=False, index=True)
+    payload = Column(JSONType, nullable=True)
     response_status = Column(Integer, nullable=True)
     response_body = Column(String(5000), nullable=True)
     error = Column(String(1000), nullable=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow(), index=True)
     
     def __repr__(self):
         return f"<WebhookLog(event='{self.event_type}', status={self.response_status})>"
@@ -6,17 +6,27 @@ Company-specific data isolation.
 """
 
 import logging
+import base64
 import hashlib
+import hmac
+import os
+import time
 import uuid
-from datetime import datetime, timedelta
+from dataclasses import dataclass, asdict
+from datetime import datetime
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, EmailStr
+from jose import jwt, JWTError
 
-from app.database import get_db
+from app.database import get_db, new_id
 from app.config import settings
 from app.models.user import User
+from app.services.cache import CacheService
+from app.utils.pagination import keyset_filter, next_cursor_headers
+from app.utils.responses import FastJSONResponse
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/auth", tags=["Authentication"])
@@ -46,52 +56,68 @@ class TokenResponse(BaseModel):
 
 
 # ========================
-# Simple JWT helpers (no external library needed)
+# JWT helpers
 # ========================
 
-import json
-import base64
-import hmac
-
-def _b64encode(data: bytes) -> str:
-    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
-
-def _b64decode(s: str) -> bytes:
-    s += '=' * (4 - len(s) % 4)
-    return base64.urlsafe_b64decode(s)
-
 def create_token(payload: dict) -> str:
-    """Create a simple JWT token."""
-    header = _b64encode(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
-    payload_data = {**payload, "exp": (datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)).isoformat()}
-    body = _b64encode(json.dumps(payload_data).encode())
-    signature = hmac.new(settings.SECRET_KEY.encode(), f"{header}.{body}".encode(), hashlib.sha256).hexdigest()
-    return f"{header}.{body}.{signature}"
+    """Create a signed JWT with a numeric (unix timestamp) expiry."""
+    exp = int(time.time()) + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    return jwt.encode({**payload, "exp": exp}, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
 
 def verify_token(token: str) -> Optional[dict]:
-    """Verify and decode a JWT token."""
+    """Verify signature and expiry of a JWT and return its payload."""
     try:
-        parts = token.split(".")
-        if len(parts) != 3:
-            return None
-        header, body, sig = parts
-        expected_sig = hmac.new(settings.SECRET_KEY.encode(), f"{header}.{body}".encode(), hashlib.sha256).hexdigest()
-        if not hmac.compare_digest(sig, expected_sig):
-            return None
-        payload = json.loads(_b64decode(body))
-        if datetime.fromisoformat(payload["exp"]) < datetime.utcnow():
-            return None
-        return payload
-    except Exception:
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+    except JWTError:
         return None
 
 
-def hash_password(password: str) -> str:
-    """Hash a password using SHA256 + salt."""
+# scrypt cost parameters (~16MB memory per hash)
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=64 * 1024 * 1024)
+
+
+def _legacy_hash_password(password: str) -> str:
+    """Old SHA256 + shared-salt scheme, kept only to verify and upgrade existing accounts."""
     salt = settings.SECRET_KEY[:8]
     return hashlib.sha256(f"{salt}{password}".encode()).hexdigest()
 
 
+def hash_password(password: str) -> str:
+    """Hash a password with scrypt (memory-hard KDF) and a random per-user salt."""
+    salt = os.urandom(16)
+    digest = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return "$".join([
+        "scrypt", str(SCRYPT_N), str(SCRYPT_R), str(SCRYPT_P),
+        base64.b64encode(salt).decode(), base64.b64encode(digest).decode(),
+    ])
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    """Constant-time check of a password against a stored scrypt (or legacy SHA256) hash."""
+    if not password_hash:
+        return False
+    if not password_hash.startswith("scrypt$"):
+        return hmac.compare_digest(password_hash, _legacy_hash_password(password))
+    try:
+        _, n, r, p, salt, expected = password_hash.split("$")
+        digest = _scrypt(password, base64.b64decode(salt), int(n), int(r), int(p))
+    except (ValueError, TypeError):
+        return False
+    return hmac.compare_digest(digest, base64.b64decode(expected))
+
+
+def password_needs_rehash(password_hash: str) -> bool:
+    """True for hashes created with the legacy scheme or older scrypt parameters."""
+    return not password_hash.startswith(f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
+
+
 # ========================
 # Auth Dependencies
 # ========================
@@ -100,7 +126,69 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 security = HTTPBearer(auto_error=False)
 
-async def get_current_user(
+# How long a user's auth context may be served from Redis
+USER_CACHE_TTL = 300
+
+
+@dataclass
+class UserCtx:
+    """Lightweight snapshot of a user, cacheable so auth doesn't hit the DB."""
+    id: str
+    email: str
+    name: str
+    role: str
+    company_id: Optional[str]
+    company_name: Optional[str]
+    is_active: bool
+    created_at: Optional[datetime] = None
+    last_login: Optional[datetime] = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserCtx":
+        return cls(
+            id=user.id, email=user.email, name=user.name, role=user.role,
+            company_id=user.company_id, company_name=user.company_name,
+            is_active=user.is_active, created_at=user.created_at, last_login=user.last_login,
+        )
+
+    def to_cache(self) -> dict:
+        data = asdict(self)
+        for field in ("created_at", "last_login"):
+            data[field] = data[field].isoformat() if data[field] else None
+        return data
+
+    @classmethod
+    def from_cache(cls, data: dict) -> "UserCtx":
+        for field in ("created_at", "last_login"):
+            data[field] = datetime.fromisoformat(data[field]) if data.get(field) else None
+        return cls(**data)
+
+
+def _user_cache_key(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+def invalidate_user_cache(user_id: str):
+    """Drop a cached user context (call after login, role change or deactivation)."""
+    CacheService.delete(_user_cache_key(user_id))
+
+
+def _load_user_ctx(user_id: Optional[str], db: Session) -> Optional[UserCtx]:
+    """Return the user's context from Redis, falling back to the DB on a miss."""
+    if not user_id:
+        return None
+    cached = CacheService.get_json(_user_cache_key(user_id))
+    if cached:
+        return UserCtx.from_cache(cached)
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        return None
+    ctx = UserCtx.from_user(user)
+    CacheService.set_json(_user_cache_key(user_id), ctx.to_cache(), USER_CACHE_TTL)
+    return ctx
+
+
+def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db),
 ) -> Optional[User]:
@@ -114,17 +202,17 @@ async def get_current_user(
     return user
 
 
-async def require_auth(
+def require_auth(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db),
-) -> User:
+) -> UserCtx:
     """Require authentication — raises 401 if not valid."""
     if not credentials:
         raise HTTPException(status_code=401, detail="Not authenticated")
     payload = verify_token(credentials.credentials)
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
-    user = db.query(User).filter(User.id == payload.get("sub")).first()
+    user = _load_user_ctx(payload.get("sub"), db)
     if not user or not user.is_active:
         raise HTTPException(status_code=401, detail="User not found or inactive")
     return user
@@ -132,7 +220,7 @@ async def require_auth(
 
 def require_role(*roles):
     """Dependency factory for role-based access control."""
-    async def role_check(user: User = Depends(require_auth)):
+    async def role_check(user: UserCtx = Depends(require_auth)):
         if user.role not in roles:
             raise HTTPException(status_code=403, detail=f"Requires role: {', '.join(roles)}")
         return user
@@ -144,7 +232,7 @@ def require_role(*roles):
 # ========================
 
 @router.post("/register", status_code=201)
-async def register(request: RegisterRequest, db: Session = Depends(get_db)):
+def register(request: RegisterRequest, db: Session = Depends(get_db)):
     """Register a new user account."""
     # Check if email exists
     existing = db.query(User).filter(User.email == request.email).first()
@@ -156,52 +244,57 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
     if request.role not in valid_roles:
         raise HTTPException(status_code=400, detail=f"Invalid role. Must be one of: {', '.join(valid_roles)}")
     
-    # Create user
+    # Create user; every returned field is known here, so no refresh SELECT
     company_id = str(uuid.uuid4()) if request.company_name else None
-    user = User(
+    user_id = new_id()
+    db.execute(insert(User).values(
+        id=user_id,
         email=request.email,
         password_hash=hash_password(request.password),
         name=request.name,
         role=request.role,
         company_id=company_id,
         company_name=request.company_name or "",
-    )
-    db.add(user)
+    ))
     db.commit()
-    db.refresh(user)
     
     # Generate token
-    token = create_token({"sub": user.id, "email": user.email, "role": user.role, "company_id": user.company_id})
+    token = create_token({"sub": user_id, "email": request.email, "role": request.role, "company_id": company_id})
     
     return {
         "access_token": token,
         "token_type": "bearer",
         "user": {
-            "id": user.id,
-            "email": user.email,
-            "name": user.name,
-            "role": user.role,
-            "company_name": user.company_name,
+            "id": user_id,
+            "email": request.email,
+            "name": request.name,
+            "role": request.role,
+            "company_name": request.company_name or "",
         },
     }
 
 
 @router.post("/login")
-async def login(request: LoginRequest, db: Session = Depends(get_db)):
+def login(request: LoginRequest, db: Session = Depends(get_db)):
     """Authenticate and receive a JWT token."""
     user = db.query(User).filter(User.email == request.email).first()
     if not user:
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
-    if user.password_hash != hash_password(request.password):
+    if not verify_password(request.password, user.password_hash):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
     if not user.is_active:
         raise HTTPException(status_code=403, detail="Account is deactivated")
     
+    # Transparently upgrade legacy SHA256 hashes now that we have the plaintext
+    if password_needs_rehash(user.password_hash):
+        user.password_hash = hash_password(request.password)
+    
     # Update last login
     user.last_login = datetime.utcnow()
     db.commit()
+    invalidate_user_cache(user.id)
     
     token = create_token({"sub": user.id, "email": user.email, "role": user.role, "company_id": user.company_id})
     
@@ -219,7 +312,7 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/me")
-async def get_current_user_info(user: User = Depends(require_auth)):
+async def get_current_user_info(user: UserCtx = Depends(require_auth)):
     """Get current user profile."""
     return {
         "id": user.id,
@@ -235,18 +328,39 @@ async def get_current_user_info(user: User = Depends(require_auth)):
 
 
 @router.get("/users")
-async def list_users(user: User = Depends(require_role("admin")), db: Session = Depends(get_db)):
-    """List all users (admin only)."""
-    users = db.query(User).order_by(User.created_at.desc()).all()
-    return [
-        {
-            "id": u.id,
-            "email": u.email,
-            "name": u.name,
-            "role": u.role,
-            "company_name": u.company_name,
-            "is_active": u.is_active,
-            "last_login": u.last_login.isoformat() if u.last_login else None,
-        }
-        for u in users
-    ]
+def list_users(
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    user: UserCtx = Depends(require_role("admin")),
+    db: Session = Depends(get_db),
+):
+    """
+    List users newest first (admin only). The body stays a plain list; the
+    keyset cursor for the next page comes back in the X-Next-Cursor header.
+    """
+    query = db.query(
+        User.id, User.email, User.name, User.role,
+        User.company_name, User.is_active, User.last_login, User.created_at,
+    )
+    if cursor:
+        query = query.filter(keyset_filter(User.created_at, User.id, cursor))
+    
+    rows = query.order_by(User.created_at.desc(), User.id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    return FastJSONResponse(
+        [
+            {
+                "id": u.id,
+                "email": u.email,
+                "name": u.name,
+                "role": u.role,
+                "company_name": u.company_name,
+                "is_active": u.is_active,
+                "last_login": u.last_login.isoformat() if u.last_login else None,
+            }
+            for u in rows
+        ],
+        headers=next_cursor_headers(rows[-1], has_more) if rows else {},
+    )
@@ -6,43 +6,123 @@ Also handles report exports.
 """
 
 import logging
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import and_, bindparam, case, func, desc, select
 from pydantic import BaseModel
 import io
+import time
 
-from app.database import get_db
+from app.database import SessionLocal, get_db
 from app.models.job import Job
 from app.models.candidate import Candidate
 from app.models.match import MatchSession, MatchResult
+from app.services.reports import ReportGenerator
+from app.utils.responses import FastJSONResponse
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1", tags=["Dashboard & Reports"])
 
+# Metrics payloads are memoised per (days, watermark) for a few seconds;
+# the watermark changes whenever a row the payload depends on does
+METRICS_CACHE_TTL = 10
+_metrics_cache = {}
+
+
+# Hot metrics queries are built once at import time. SQLAlchemy keys its
+# compiled-SQL cache on statement structure, so every request after the
+# first reuses the compiled form instead of rebuilding the expression tree.
+_WATERMARK_STMT = select(
+    select(func.count(Job.id)).scalar_subquery(),
+    select(func.max(Job.updated_at)).scalar_subquery(),
+    select(func.count(Candidate.id)).scalar_subquery(),
+    select(func.max(Candidate.updated_at)).scalar_subquery(),
+    select(func.count(MatchSession.id)).scalar_subquery(),
+    select(func.max(MatchSession.completed_at)).scalar_subquery(),
+    select(func.count(MatchResult.id)).scalar_subquery(),
+    select(func.max(MatchResult.created_at)).scalar_subquery(),
+)
+
+_JOB_COUNTS_STMT = select(Job.is_active, func.count(Job.id)).group_by(Job.is_active)
+
+# Read-only rows: select just the columns the payload needs, no ORM objects
+_ACTIVE_JOBS_STMT = select(
+    Job.id, Job.title, Job.company, Job.department, Job.location,
+    Job.status, Job.required_skills, Job.created_at,
+).where(Job.is_active == "true").order_by(Job.created_at.desc()).limit(10)
+
+_MATCHED_COUNTS_STMT = select(MatchSession.job_id, func.count(MatchResult.id)) \
+    .join(MatchResult, MatchResult.session_id == MatchSession.id) \
+    .where(MatchSession.job_id.in_(bindparam("job_ids", expanding=True))) \
+    .group_by(MatchSession.job_id)
+
+_CANDIDATE_COUNTS_STMT = select(Candidate.status, func.count(Candidate.id)).group_by(Candidate.status)
+
+# Best result per candidate via ROW_NUMBER(), so exactly 10 distinct rows come back
+_ranked_results = select(
+    MatchResult.id.label("id"),
+    func.row_number().over(
+        partition_by=MatchResult.candidate_id,
+        order_by=(MatchResult.overall_score.desc().nulls_last(), MatchResult.id),
+    ).label("rn"),
+).subquery()
+_LEADERBOARD_STMT = select(
+    MatchResult.overall_score, MatchResult.skill_score, MatchResult.experience_score,
+    MatchResult.education_score, MatchResult.bias_adjusted,
+    Candidate.id.label("candidate_id"), Candidate.name, Candidate.email,
+    Candidate.skills, Candidate.experience_years, Job.title.label("job_title"),
+) \
+    .join(_ranked_results, and_(_ranked_results.c.id == MatchResult.id, _ranked_results.c.rn == 1)) \
+    .join(Candidate, MatchResult.candidate_id == Candidate.id) \
+    .outerjoin(MatchSession, MatchResult.session_id == MatchSession.id) \
+    .outerjoin(Job, MatchSession.job_id == Job.id) \
+    .order_by(MatchResult.overall_score.desc().nulls_last(), MatchResult.id) \
+    .limit(10)
+
+_SESSION_COUNTS_STMT = select(MatchSession.status, func.count(MatchSession.id)).group_by(MatchSession.status)
+
+_AVG_SCORE_STMT = select(func.avg(MatchResult.overall_score))
+
+_RECENT_CANDIDATES_STMT = select(
+    Candidate.name, Candidate.file_name, Candidate.status, Candidate.created_at,
+).order_by(Candidate.created_at.desc()).limit(5)
+
 
 @router.get("/dashboard/metrics")
-async def get_dashboard_metrics(
+def get_dashboard_metrics(
     days: int = Query(30, ge=1, le=365),
     db: Session = Depends(get_db),
 ):
     """
     Dashboard data: active jobs, total candidates, leaderboard, rankings.
     """
+    # Row-change fingerprint for the tables behind the payload
+    key = (days, tuple(db.execute(_WATERMARK_STMT).one()))
+    cached = _metrics_cache.get(key)
+    if cached and cached[0] > time.monotonic():
+        return FastJSONResponse(cached[1])
+    
+    # Job totals in one grouped scan
+    job_counts = dict(db.execute(_JOB_COUNTS_STMT).all())
+    total_jobs = sum(job_counts.values())
+    total_active_jobs = job_counts.get("true", 0)
+    
     # Active jobs (status = compressed AND is_active = 'true')
-    active_jobs_query = db.query(Job).filter(Job.is_active == "true")
-    total_active_jobs = active_jobs_query.count()
+    active_jobs = db.execute(_ACTIVE_JOBS_STMT).all()
+    
+    # Count candidates matched for all listed jobs in one grouped query
+    job_ids = [job.id for job in active_jobs]
+    matched_counts = dict(
+        db.execute(_MATCHED_COUNTS_STMT, {"job_ids": job_ids}).all()
+    ) if job_ids else {}
     
-    active_jobs = active_jobs_query.order_by(Job.created_at.desc()).limit(10).all()
     active_jobs_list = []
     for job in active_jobs:
-        # Count candidates matched for this job
-        matched = db.query(func.count(MatchResult.id)).join(
-            MatchSession, MatchResult.session_id == MatchSession.id
-        ).filter(MatchSession.job_id == job.id).scalar() or 0
+        matched = matched_counts.get(job.id, 0)
         
         active_jobs_list.append({
             "id": job.id,
@@ -56,61 +136,48 @@ async def get_dashboard_metrics(
             "created_at": job.created_at.isoformat() if job.created_at else None,
         })
     
-    # Total candidates
-    total_candidates = db.query(func.count(Candidate.id)).scalar() or 0
-    candidates_ready = db.query(func.count(Candidate.id)).filter(Candidate.status == "compressed").scalar() or 0
-    candidates_pending = db.query(func.count(Candidate.id)).filter(Candidate.status == "uploaded").scalar() or 0
-    candidates_processing = db.query(func.count(Candidate.id)).filter(
-        Candidate.status.in_(["parsing", "compressing"])
-    ).scalar() or 0
-    candidates_error = db.query(func.count(Candidate.id)).filter(Candidate.status == "error").scalar() or 0
+    # Candidate totals by status in one grouped scan
+    candidate_counts = dict(
+        db.execute(_CANDIDATE_COUNTS_STMT).all()
+    )
+    total_candidates = sum(candidate_counts.values())
+    candidates_ready = candidate_counts.get("compressed", 0)
+    candidates_pending = candidate_counts.get("uploaded", 0)
+    candidates_processing = candidate_counts.get("parsing", 0) + candidate_counts.get("compressing", 0)
+    candidates_error = candidate_counts.get("error", 0)
     
     # Leaderboard — top candidates by best overall_score
     leaderboard = []
-    top_results = db.query(MatchResult).order_by(desc(MatchResult.overall_score)).limit(15).all()
+    top_results = db.execute(_LEADERBOARD_STMT).all()
     
-    seen_candidates = set()
-    for r in top_results:
-        if r.candidate_id in seen_candidates:
-            continue
-        seen_candidates.add(r.candidate_id)
-        
-        candidate = db.query(Candidate).filter(Candidate.id == r.candidate_id).first()
-        session = db.query(MatchSession).filter(MatchSession.id == r.session_id).first()
-        job = db.query(Job).filter(Job.id == session.job_id).first() if session else None
-        
-        if candidate:
-            leaderboard.append({
-                "rank": len(leaderboard) + 1,
-                "candidate_id": candidate.id,
-                "name": candidate.name or "Unknown",
-                "email": candidate.email or "",
-                "overall_score": float(r.overall_score or 0),
-                "skill_score": float(r.skill_score or 0),
-                "experience_score": float(r.experience_score or 0),
-                "education_score": float(r.education_score or 0),
-                "skills": (candidate.skills or [])[:6],
-                "experience_years": float(candidate.experience_years) if candidate.experience_years else 0,
-                "matched_job": job.title if job else "N/A",
-                "bias_adjusted": r.bias_adjusted or False,
-            })
-        
-        if len(leaderboard) >= 10:
-            break
+    for rank, r in enumerate(top_results, start=1):
+        leaderboard.append({
+            "rank": rank,
+            "candidate_id": r.candidate_id,
+            "name": r.name or "Unknown",
+            "email": r.email or "",
+            "overall_score": float(r.overall_score or 0),
+            "skill_score": float(r.skill_score or 0),
+            "experience_score": float(r.experience_score or 0),
+            "education_score": float(r.education_score or 0),
+            "skills": (r.skills or [])[:6],
+            "experience_years": float(r.experience_years) if r.experience_years else 0,
+            "matched_job": r.job_title or "N/A",
+            "bias_adjusted": r.bias_adjusted or False,
+        })
     
     # Session stats
-    total_sessions = db.query(func.count(MatchSession.id)).scalar() or 0
-    completed_sessions = db.query(func.count(MatchSession.id)).filter(
-        MatchSession.status == "completed"
-    ).scalar() or 0
+    session_counts = dict(
+        db.execute(_SESSION_COUNTS_STMT).all()
+    )
+    total_sessions = sum(session_counts.values())
+    completed_sessions = session_counts.get("completed", 0)
     
     # Average match score
-    avg_score = db.query(func.avg(MatchResult.overall_score)).scalar()
+    avg_score = db.execute(_AVG_SCORE_STMT).scalar()
     
     # Recent activity
-    recent_candidates = db.query(Candidate).order_by(
-        Candidate.created_at.desc()
-    ).limit(5).all()
+    recent_candidates = db.execute(_RECENT_CANDIDATES_STMT).all()
     
     recent_activity = []
     for c in recent_candidates:
@@ -121,10 +188,10 @@ async def get_dashboard_metrics(
             "time": c.created_at.isoformat() if c.created_at else None,
         })
     
-    return {
+    payload = {
         "active_jobs": active_jobs_list,
         "total_active_jobs": total_active_jobs,
-        "total_jobs": db.query(func.count(Job.id)).scalar() or 0,
+        "total_jobs": total_jobs,
         "total_candidates": total_candidates,
         "candidates_ready": candidates_ready,
         "candidates_pending": candidates_pending,
@@ -136,6 +203,10 @@ async def get_dashboard_metrics(
         "avg_match_score": round(float(avg_score), 4) if avg_score else 0.0,
         "recent_activity": recent_activity,
     }
+    # Only the latest watermark can still be hit, so keep a single entry
+    _metrics_cache.clear()
+    _metrics_cache[key] = (time.monotonic() + METRICS_CACHE_TTL, payload)
+    return FastJSONResponse(payload)
 
 
 class ReportExportRequest(BaseModel):
@@ -144,171 +215,216 @@ class ReportExportRequest(BaseModel):
     top_n: Optional[int] = None
 
 
+def _iter_export_results(db: Session, session_id: str, top_n: Optional[int] = None):
+    """Yield export rows for a session in rank order, fetched in batches from a server-side cursor."""
+    # Plain column rows: the export only reads scalars, so skip ORM hydration
+    stmt = select(
+        MatchResult.rank, MatchResult.overall_score, MatchResult.skill_score,
+        MatchResult.experience_score, MatchResult.education_score, MatchResult.semantic_score,
+        MatchResult.bias_adjusted, Candidate.id.label("candidate_id"), Candidate.name, Candidate.email,
+    ) \
+        .outerjoin(Candidate, MatchResult.candidate_id == Candidate.id) \
+        .where(MatchResult.session_id == session_id) \
+        .order_by(MatchResult.rank)
+    if top_n:
+        stmt = stmt.limit(top_n)
+    
+    rows = db.execute(stmt, execution_options={"stream_results": True, "yield_per": 500})
+    for r in rows:
+        yield {
+            "rank": r.rank,
+            "candidate_name": r.name if r.candidate_id else "Unknown",
+            "candidate_email": r.email if r.candidate_id else "",
+            "overall_score": float(r.overall_score or 0),
+            "skill_score": float(r.skill_score or 0),
+            "experience_score": float(r.experience_score or 0),
+            "education_score": float(r.education_score or 0),
+            "semantic_score": float(r.semantic_score or 0),
+            "bias_adjusted": r.bias_adjusted or False,
+        }
+
+
+def _stream_csv_report(session_id: str, top_n: Optional[int], job_title: str):
+    """CSV body generator; owns its DB session because it runs after the request's session is closed."""
+    db = SessionLocal()
+    try:
+        yield from ReportGenerator.iter_csv(_iter_export_results(db, session_id, top_n), job_title)
+    finally:
+        db.close()
+
+
 @router.post("/reports/export")
-async def export_report(
+def export_report(
     request: ReportExportRequest,
     db: Session = Depends(get_db),
 ):
     """Export match results as CSV, PDF, or JSON."""
-    session = db.query(MatchSession).filter(MatchSession.id == request.session_id).first()
+    session = db.query(MatchSession.id, MatchSession.status, MatchSession.job_id) \
+        .filter(MatchSession.id == request.session_id) \
+        .first()
     if not session:
         raise HTTPException(status_code=404, detail="Match session not found")
     
     if session.status != "completed":
         raise HTTPException(status_code=400, detail="Session not yet completed")
     
-    job = db.query(Job).filter(Job.id == session.job_id).first()
-    job_title = job.title if job else "Unknown"
-    
-    results_query = db.query(MatchResult).filter(
-        MatchResult.session_id == request.session_id
-    ).order_by(MatchResult.rank)
-    
-    if request.top_n:
-        results_query = results_query.limit(request.top_n)
-    
-    db_results = results_query.all()
-    
-    results = []
-    for r in db_results:
-        candidate = db.query(Candidate).filter(Candidate.id == r.candidate_id).first()
-        results.append({
-            "rank": r.rank,
-            "candidate_name": candidate.name if candidate else "Unknown",
-            "candidate_email": candidate.email if candidate else "",
-            "overall_score": float(r.overall_score or 0),
-            "skill_score": float(r.skill_score or 0),
-            "experience_score": float(r.experience_score or 0),
-            "education_score": float(r.education_score or 0),
-            "semantic_score": float(r.semantic_score or 0),
-            "bias_adjusted": r.bias_adjusted or False,
-        })
+    job_title = db.query(Job.title).filter(Job.id == session.job_id).scalar() or "Unknown"
     
-    from app.services.reports import ReportGenerator
+    if request.format not in ("csv", "json", "pdf"):
+        raise HTTPException(status_code=400, detail="Unsupported format. Use 'csv', 'json', or 'pdf'.")
     
     if request.format == "csv":
-        csv_content = ReportGenerator.generate_csv(results, job_title)
         return StreamingResponse(
-            io.StringIO(csv_content),
+            _stream_csv_report(request.session_id, request.top_n, job_title),
             media_type="text/csv",
             headers={"Content-Disposition": f"attachment; filename=report_{session.id}.csv"}
         )
-    elif request.format == "json":
-        return JSONResponse(content={"report": {"job_title": job_title, "results": results}})
-    elif request.format == "pdf":
-        pdf_bytes = ReportGenerator.generate_pdf(results, job_title)
-        if not pdf_bytes:
-            raise HTTPException(
-                status_code=503,
-                detail="PDF generation unavailable. Install 'reportlab' to enable PDF exports."
-            )
-        return StreamingResponse(
-            io.BytesIO(pdf_bytes),
-            media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename=report_{session.id}.pdf"}
+    
+    results = list(_iter_export_results(db, request.session_id, request.top_n))
+    if request.format == "json":
+        return FastJSONResponse({"report": {"job_title": job_title, "results": results}})
+    
+    pdf_bytes = ReportGenerator.generate_pdf(results, job_title)
+    if not pdf_bytes:
+        raise HTTPException(
+            status_code=503,
+            detail="PDF generation unavailable. Install 'reportlab' to enable PDF exports."
         )
-    else:
-        raise HTTPException(status_code=400, detail="Unsupported format. Use 'csv', 'json', or 'pdf'.")
+    return StreamingResponse(
+        io.BytesIO(pdf_bytes),
+        media_type="application/pdf",
+        headers={"Content-Disposition": f"attachment; filename=report_{session.id}.pdf"}
+    )
 
 
 @router.get("/dashboard/job/{job_id}/analytics")
-async def get_job_analytics(
+def get_job_analytics(
     job_id: str,
     db: Session = Depends(get_db),
 ):
     """Per-job analytics: score distributions, skill coverage, experience breakdown, top candidates."""
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = db.query(
+        Job.id, Job.title, Job.company, Job.department, Job.location,
+        Job.status, Job.required_skills, Job.created_at,
+    ).filter(Job.id == job_id).first()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    # All match sessions for this job
-    sessions = db.query(MatchSession).filter(MatchSession.job_id == job_id).order_by(desc(MatchSession.created_at)).all()
-    session_ids = [s.id for s in sessions]
-
-    # All match results across sessions
-    results = []
-    if session_ids:
-        results = db.query(MatchResult).filter(MatchResult.session_id.in_(session_ids)).all()
-
-    total_matched = len(results)
-
-    # Score distribution (buckets: 0-10, 10-20, ..., 90-100)
-    score_buckets = [0] * 10
-    skill_scores, exp_scores, edu_scores, sem_scores, overall_scores = [], [], [], [], []
-    for r in results:
-        score = float(r.overall_score or 0) * 100
-        bucket = min(int(score // 10), 9)
-        score_buckets[bucket] += 1
-        overall_scores.append(float(r.overall_score or 0))
-        skill_scores.append(float(r.skill_score or 0))
-        exp_scores.append(float(r.experience_score or 0))
-        edu_scores.append(float(r.education_score or 0))
-        sem_scores.append(float(r.semantic_score or 0))
+    # Results are scoped to the job with a subquery, so session rows are only
+    # loaded for the 10-entry history below
+    in_job_sessions = MatchResult.session_id.in_(
+        select(MatchSession.id).where(MatchSession.job_id == job_id)
+    )
+    total_sessions = db.query(func.count(MatchSession.id)).filter(MatchSession.job_id == job_id).scalar()
+
+    # Score distribution (buckets: 0-10, 10-20, ..., 90-100) and all summary
+    # aggregates in a single scan; NULL scores count as 0 like before
+    overall = func.coalesce(MatchResult.overall_score, 0)
+    bucket_columns = [
+        func.sum(case((and_(overall >= i / 10, overall < (i + 1) / 10), 1), else_=0))
+        for i in range(9)
+    ] + [func.sum(case((overall >= 0.9, 1), else_=0))]
+    stats = db.query(
+        func.count(MatchResult.id),
+        func.avg(overall),
+        func.avg(func.coalesce(MatchResult.skill_score, 0)),
+        func.avg(func.coalesce(MatchResult.experience_score, 0)),
+        func.avg(func.coalesce(MatchResult.education_score, 0)),
+        func.avg(func.coalesce(MatchResult.semantic_score, 0)),
+        func.max(overall),
+        func.min(overall),
+        func.sum(case((MatchResult.bias_adjusted == True, 1), else_=0)),  # noqa: E712
+        *bucket_columns,
+    ).filter(in_job_sessions).one()
+
+    total_matched = stats[0]
+    has_results = total_matched > 0
+
+    def _stat(index):
+        return round(float(stats[index]), 4) if has_results and stats[index] is not None else 0.0
 
     score_distribution = [
-        {"range": f"{i*10}-{i*10+10}", "count": score_buckets[i]} for i in range(10)
+        {"range": f"{i*10}-{i*10+10}", "count": int(stats[9 + i] or 0) if has_results else 0}
+        for i in range(10)
     ]
 
-    avg = lambda lst: round(sum(lst) / len(lst), 4) if lst else 0.0
-
-    # Top candidates for this job
-    top_results = sorted(results, key=lambda r: float(r.overall_score or 0), reverse=True)[:10]
+    # Top candidates for this job — each candidate's best result, 10 rows
+    top_results = []
+    if has_results:
+        ranked = select(
+            MatchResult.id.label("id"),
+            func.row_number().over(
+                partition_by=MatchResult.candidate_id,
+                order_by=(MatchResult.overall_score.desc().nulls_last(), MatchResult.id),
+            ).label("rn"),
+        ).where(in_job_sessions).subquery()
+        top_results = db.query(
+            MatchResult.overall_score, MatchResult.skill_score, MatchResult.experience_score,
+            MatchResult.education_score, MatchResult.bias_adjusted, MatchResult.rank,
+            Candidate.id.label("candidate_id"), Candidate.name, Candidate.email,
+            Candidate.skills, Candidate.experience_years,
+        ) \
+            .join(ranked, and_(ranked.c.id == MatchResult.id, ranked.c.rn == 1)) \
+            .join(Candidate, MatchResult.candidate_id == Candidate.id) \
+            .order_by(MatchResult.overall_score.desc().nulls_last(), MatchResult.id) \
+            .limit(10) \
+            .all()
     top_candidates = []
-    seen = set()
     for r in top_results:
-        if r.candidate_id in seen:
-            continue
-        seen.add(r.candidate_id)
-        candidate = db.query(Candidate).filter(Candidate.id == r.candidate_id).first()
-        if candidate:
-            top_candidates.append({
-                "candidate_id": candidate.id,
-                "name": candidate.name or "Unknown",
-                "email": candidate.email or "",
-                "overall_score": float(r.overall_score or 0),
-                "skill_score": float(r.skill_score or 0),
-                "experience_score": float(r.experience_score or 0),
-                "education_score": float(r.education_score or 0),
-                "skills": (candidate.skills or [])[:8],
-                "experience_years": float(candidate.experience_years) if candidate.experience_years else 0,
-                "bias_adjusted": r.bias_adjusted or False,
-                "rank": r.rank,
-            })
+        top_candidates.append({
+            "candidate_id": r.candidate_id,
+            "name": r.name or "Unknown",
+            "email": r.email or "",
+            "overall_score": float(r.overall_score or 0),
+            "skill_score": float(r.skill_score or 0),
+            "experience_score": float(r.experience_score or 0),
+            "education_score": float(r.education_score or 0),
+            "skills": (r.skills or [])[:8],
+            "experience_years": float(r.experience_years) if r.experience_years else 0,
+            "bias_adjusted": r.bias_adjusted or False,
+            "rank": r.rank,
+        })
+
+    # Candidates matched for this job, as a subquery over its results
+    matched_candidates = Candidate.id.in_(select(MatchResult.candidate_id).where(in_job_sessions).distinct())
+
+    # Experience distribution — one CASE aggregate over the matched candidates
+    years = func.coalesce(Candidate.experience_years, 0)
+    exp_row = db.query(
+        func.count(Candidate.id),
+        func.sum(case((years <= 2, 1), else_=0)),
+        func.sum(case((and_(years > 2, years <= 5), 1), else_=0)),
+        func.sum(case((and_(years > 5, years <= 10), 1), else_=0)),
+        func.sum(case((years > 10, 1), else_=0)),
+    ).filter(matched_candidates).one() if has_results else (0, 0, 0, 0, 0)
+    total_candidates = exp_row[0]
+    exp_dist = dict(zip(("0-2", "3-5", "6-10", "10+"), (int(n or 0) for n in exp_row[1:])))
 
     # Skill coverage — what % of candidates have each required skill
     required_skills = job.required_skills or []
     skill_coverage = []
-    if required_skills and results:
-        cand_ids = list({r.candidate_id for r in results})
-        cands = db.query(Candidate).filter(Candidate.id.in_(cand_ids)).all()
+    if required_skills and has_results:
+        # Lowercase each candidate's skills once and count distinct skills per candidate
+        skill_counts = Counter()
+        for (skills,) in db.query(Candidate.skills).filter(matched_candidates):
+            if skills:
+                skill_counts.update({s.lower() for s in skills})
         for sk in required_skills[:12]:
-            matched = sum(1 for c in cands if c.skills and sk.lower() in [s.lower() for s in c.skills])
+            matched = skill_counts[sk.lower()]
             skill_coverage.append({
                 "skill": sk,
                 "matched": matched,
-                "total": len(cands),
-                "percent": round(matched / len(cands) * 100, 1) if cands else 0,
+                "total": total_candidates,
+                "percent": round(matched / total_candidates * 100, 1) if total_candidates else 0,
             })
 
-    # Experience distribution
-    exp_dist = {"0-2": 0, "3-5": 0, "6-10": 0, "10+": 0}
-    if results:
-        cand_ids = list({r.candidate_id for r in results})
-        cands = db.query(Candidate).filter(Candidate.id.in_(cand_ids)).all()
-        for c in cands:
-            yr = float(c.experience_years) if c.experience_years else 0
-            if yr <= 2:
-                exp_dist["0-2"] += 1
-            elif yr <= 5:
-                exp_dist["3-5"] += 1
-            elif yr <= 10:
-                exp_dist["6-10"] += 1
-            else:
-                exp_dist["10+"] += 1
-
     # Session history
+    sessions = db.query(
+        MatchSession.id, MatchSession.status, MatchSession.total_candidates,
+        MatchSession.processed_candidates, MatchSession.created_at, MatchSession.completed_at,
+    ).filter(MatchSession.job_id == job_id).order_by(desc(MatchSession.created_at)).limit(10).all()
     session_list = []
-    for s in sessions[:10]:
+    for s in sessions:
         session_list.append({
             "id": s.id,
             "status": s.status,
@@ -319,9 +435,9 @@ async def get_job_analytics(
         })
 
     # Bias stats
-    bias_adjusted_count = sum(1 for r in results if r.bias_adjusted)
+    bias_adjusted_count = int(stats[8] or 0) if has_results else 0
 
-    return {
+    return FastJSONResponse({
         "job": {
             "id": job.id,
             "title": job.title,
@@ -334,14 +450,14 @@ async def get_job_analytics(
         },
         "summary": {
             "total_matched": total_matched,
-            "total_sessions": len(sessions),
-            "avg_overall_score": avg(overall_scores),
-            "avg_skill_score": avg(skill_scores),
-            "avg_experience_score": avg(exp_scores),
-            "avg_education_score": avg(edu_scores),
-            "avg_semantic_score": avg(sem_scores),
-            "highest_score": round(max(overall_scores), 4) if overall_scores else 0.0,
-            "lowest_score": round(min(overall_scores), 4) if overall_scores else 0.0,
+            "total_sessions": total_sessions,
+            "avg_overall_score": _stat(1),
+            "avg_skill_score": _stat(2),
+            "avg_experience_score": _stat(3),
+            "avg_education_score": _stat(4),
+            "avg_semantic_score": _stat(5),
+            "highest_score": _stat(6),
+            "lowest_score": _stat(7),
             "bias_adjusted_count": bias_adjusted_count,
         },
         "score_distribution": score_distribution,
@@ -351,4 +467,4 @@ async def get_job_analytics(
         ],
         "top_candidates": top_candidates,
         "sessions": session_list,
-    }
+    })
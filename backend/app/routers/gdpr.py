@@ -9,25 +9,46 @@ Handles GDPR-related endpoints:
 - Audit trail
 """
 
+import hashlib
+import hmac
 import logging
 import json
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional
 from pydantic import BaseModel
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import case, desc, func
 
 from app.database import get_db
 from app.config import settings
 from app.models.candidate import Candidate
 from app.models.audit import AuditLog
+from app.services.cache import CacheService
+from app.utils.responses import FastJSONResponse
+from app.utils.uploads import remove_upload
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/gdpr", tags=["GDPR Compliance"])
 
 
+# /status counts are cached briefly; GDPR writes below drop the entry
+STATUS_CACHE_KEY = "gdpr:status"
+STATUS_CACHE_TTL = 30
+
+
+def invalidate_status_cache():
+    """Drop the cached /status payload (call after writing audit records)."""
+    CacheService.delete(STATUS_CACHE_KEY)
+
+
+def audit_hash(value: str) -> str:
+    """Keyed SHA-256 of a personal value: stable across processes, not reversible by lookup."""
+    key = (settings.AUDIT_HASH_KEY or settings.SECRET_KEY).encode()
+    return hmac.new(key, value.encode(), hashlib.sha256).hexdigest()
+
+
 # =====================
 # Models
 # =====================
@@ -70,6 +91,7 @@ async def record_consent(request: ConsentRequest, db: Session = Depends(get_db))
     )
     db.add(audit)
     db.commit()
+    invalidate_status_cache()
 
     logger.info(f"GDPR consent {action} for {request.entity_type}:{request.entity_id}")
 
@@ -105,6 +127,7 @@ async def export_candidate_data(candidate_id: str, db: Session = Depends(get_db)
     )
     db.add(audit)
     db.commit()
+    invalidate_status_cache()
 
     exported_data = {
         "candidate_profile": {
@@ -141,7 +164,8 @@ async def export_candidate_data(candidate_id: str, db: Session = Depends(get_db)
         },
     }
 
-    return JSONResponse(
+    # compressed_data and bias_flags can be large; encode them with orjson
+    return FastJSONResponse(
         content=exported_data,
         headers={"Content-Disposition": f"attachment; filename=gdpr_export_{candidate_id}.json"},
     )
@@ -168,18 +192,10 @@ async def delete_candidate_data(request: DataDeletionRequest, db: Session = Depe
     candidate_name = candidate.name or "Unknown"
     file_path = candidate.file_path
 
-    # Delete the file from disk
-    if file_path:
-        import os
-        try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                logger.info(f"Deleted file: {file_path}")
-        except Exception as e:
-            logger.warning(f"Could not delete file {file_path}: {e}")
-
-    # Delete from database
+    # Delete from database, then the file unless an identical upload still uses it
     db.delete(candidate)
+    db.flush()
+    remove_upload(db, file_path)
 
     # Log the deletion in audit trail (GDPR requires keeping deletion records)
     audit = AuditLog(
@@ -188,13 +204,14 @@ async def delete_candidate_data(request: DataDeletionRequest, db: Session = Depe
         action="data_erased",
         details={
             "reason": request.reason,
-            "candidate_name_hash": hash(candidate_name),  # Store hash, not actual name
+            "candidate_name_hash": audit_hash(candidate_name),  # Store hash, not actual name
             "gdpr_article": "Article 17",
             "timestamp": datetime.utcnow().isoformat(),
         },
     )
     db.add(audit)
     db.commit()
+    invalidate_status_cache()
 
     logger.info(f"GDPR erasure completed for candidate {request.entity_id}")
 
@@ -210,25 +227,31 @@ async def delete_candidate_data(request: DataDeletionRequest, db: Session = Depe
 # Data Retention Policy
 # =====================
 
-@router.get("/retention-policy")
-async def get_retention_policy():
-    """Return the current data retention policy configuration."""
+@lru_cache(maxsize=1)
+def _retention_policy(retention_days: int) -> dict:
+    """Build the policy payload; it only depends on the retention setting."""
     return {
-        "retention_days": settings.DATA_RETENTION_DAYS,
+        "retention_days": retention_days,
         "auto_cleanup": True,
         "cleanup_method": "Celery periodic task (cleanup_expired_data)",
-        "description": f"Candidate data is automatically deleted {settings.DATA_RETENTION_DAYS} days after upload.",
+        "description": f"Candidate data is automatically deleted {retention_days} days after upload.",
         "gdpr_articles": ["Article 5(1)(e) — Storage Limitation", "Article 17 — Right to Erasure"],
         "data_categories": [
-            {"category": "Personal Information", "includes": "Name, Email, Phone", "retention": f"{settings.DATA_RETENTION_DAYS} days"},
-            {"category": "Resume Content", "includes": "Original text, parsed data", "retention": f"{settings.DATA_RETENTION_DAYS} days"},
-            {"category": "AI-Processed Data", "includes": "Skills extraction, embeddings, bias flags", "retention": f"{settings.DATA_RETENTION_DAYS} days"},
-            {"category": "Match Results", "includes": "Scores, rankings", "retention": f"{settings.DATA_RETENTION_DAYS} days"},
+            {"category": "Personal Information", "includes": "Name, Email, Phone", "retention": f"{retention_days} days"},
+            {"category": "Resume Content", "includes": "Original text, parsed data", "retention": f"{retention_days} days"},
+            {"category": "AI-Processed Data", "includes": "Skills extraction, embeddings, bias flags", "retention": f"{retention_days} days"},
+            {"category": "Match Results", "includes": "Scores, rankings", "retention": f"{retention_days} days"},
             {"category": "Audit Logs", "includes": "Consent records, deletion logs", "retention": "Indefinite (legal requirement)"},
         ],
     }
 
 
+@router.get("/retention-policy")
+async def get_retention_policy():
+    """Return the current data retention policy configuration."""
+    return _retention_policy(settings.DATA_RETENTION_DAYS)
+
+
 # =====================
 # Audit Trail
 # =====================
@@ -277,26 +300,25 @@ async def gdpr_status(db: Session = Depends(get_db)):
     """
     Get an overview of GDPR compliance status.
     """
-    from sqlalchemy import func
-
-    total_candidates = db.query(func.count(Candidate.id)).scalar() or 0
-    expired_candidates = db.query(func.count(Candidate.id)).filter(
-        Candidate.expires_at < datetime.utcnow()
-    ).scalar() or 0
-
-    total_consent_records = db.query(func.count(AuditLog.id)).filter(
-        AuditLog.action.in_(["consent_given", "consent_withdrawn"])
-    ).scalar() or 0
-
-    total_deletions = db.query(func.count(AuditLog.id)).filter(
-        AuditLog.action == "data_erased"
-    ).scalar() or 0
-
-    total_exports = db.query(func.count(AuditLog.id)).filter(
-        AuditLog.action == "data_exported"
-    ).scalar() or 0
-
-    return {
+    cached = CacheService.get_json(STATUS_CACHE_KEY)
+    if cached:
+        return cached
+
+    # One pass over each table: candidate totals, then per-action audit counts
+    total_candidates, expired_candidates = db.query(
+        func.count(Candidate.id),
+        func.sum(case((Candidate.expires_at < datetime.utcnow(), 1), else_=0)),
+    ).one()
+
+    consent_records, total_deletions, total_exports = db.query(
+        func.sum(case((AuditLog.action.in_(["consent_given", "consent_withdrawn"]), 1), else_=0)),
+        func.sum(case((AuditLog.action == "data_erased", 1), else_=0)),
+        func.sum(case((AuditLog.action == "data_exported", 1), else_=0)),
+    ).filter(
+        AuditLog.action.in_(["consent_given", "consent_withdrawn", "data_erased", "data_exported"])
+    ).one()
+
+    status = {
         "compliance_features": {
             "consent_management": True,
             "right_to_access": True,
@@ -306,11 +328,13 @@ async def gdpr_status(db: Session = Depends(get_db)):
             "auto_cleanup": True,
         },
         "statistics": {
-            "total_candidates": total_candidates,
-            "expired_awaiting_cleanup": expired_candidates,
-            "consent_records": total_consent_records,
-            "data_deletions": total_deletions,
-            "data_exports": total_exports,
+            "total_candidates": total_candidates or 0,
+            "expired_awaiting_cleanup": expired_candidates or 0,
+            "consent_records": consent_records or 0,
+            "data_deletions": total_deletions or 0,
+            "data_exports": total_exports or 0,
             "retention_days": settings.DATA_RETENTION_DAYS,
         },
     }
+    CacheService.set_json(STATUS_CACHE_KEY, status, STATUS_CACHE_TTL)
+    return status
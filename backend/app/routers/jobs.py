@@ -5,21 +5,26 @@ Handles job description uploads, listing, and processing.
 Fixed for SQLite compatibility.
 """
 
-import os
-import uuid
+import base64
 import logging
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Query, BackgroundTasks, Body
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
-from app.database import get_db
+from app.database import background_session, get_db
 from app.config import settings
 from app.models.job import Job
 from app.models.match import MatchSession
 from app.models.audit import AuditLog
 from app.services.parser import FileParser
+from app.services.cache import CacheService
 from app.services.compressor import JDCompressor
+from app.tasks.dispatch import enqueue
+from app.utils.pagination import keyset_filter, next_cursor_headers
+from app.utils.responses import FastJSONResponse
+from app.utils.uploads import save_upload
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/jobs", tags=["Job Descriptions"])
@@ -33,8 +38,16 @@ class JobCreateRequest(BaseModel):
     description_text: Optional[str] = ""
 
 
+# Columns read by job_to_dict; creates return exactly these via RETURNING
+JOB_DICT_COLUMNS = (
+    Job.id, Job.title, Job.company, Job.department, Job.location, Job.status,
+    Job.is_active, Job.required_skills, Job.preferred_skills, Job.experience_range,
+    Job.education_requirement, Job.created_at, Job.updated_at,
+)
+
+
 def job_to_dict(job):
-    """Convert a Job ORM object to a dict for JSON response."""
+    """Convert a Job ORM object (or a JOB_DICT_COLUMNS row) to a dict for JSON response."""
     return {
         "id": job.id,
         "title": job.title,
@@ -52,6 +65,43 @@ def job_to_dict(job):
     }
 
 
+# Scoring inputs per job, cached so concurrent match sessions against the same
+# job skip reloading its JSON and embedding blob
+JOB_PAYLOAD_TTL = 3600
+
+
+def job_payload_key(job_id: str) -> str:
+    return f"job:{job_id}:payload"
+
+
+def cache_job_payload(job_id: str, title: str, compressed: Dict[str, Any], embedding: Optional[bytes]) -> None:
+    """Store a job's scoring inputs; the embedding blob travels as base64."""
+    CacheService.set_json(job_payload_key(job_id), {
+        "title": title,
+        "compressed": compressed,
+        "embedding": base64.b64encode(embedding).decode("ascii") if embedding else None,
+    }, JOB_PAYLOAD_TTL)
+
+
+def load_job_payload(db: Session, job_id: str) -> Optional[Tuple[Dict[str, Any], Optional[bytes]]]:
+    """
+    Return (job data with title, embedding blob) for matching, from Redis when
+    cached. None if the job is missing or not yet compressed.
+    """
+    cached = CacheService.get_json(job_payload_key(job_id))
+    if cached is not None:
+        title, compressed = cached["title"], cached["compressed"]
+        embedding = base64.b64decode(cached["embedding"]) if cached["embedding"] else None
+    else:
+        row = db.query(Job.title, Job.compressed_data, Job.embedding).filter(Job.id == job_id).first()
+        if not row or not row.compressed_data:
+            return None
+        title, compressed, embedding = row
+        cache_job_payload(job_id, title, compressed, embedding)
+    
+    return {**compressed, "title": title}, embedding
+
+
 def process_jd_background(job_id: str, file_path: str = None, text: str = None, db_url: str = ""):
     """
     Background task to process a job description:
@@ -59,16 +109,7 @@ def process_jd_background(job_id: str, file_path: str = None, text: str = None,
     2. Compress into structured JSON via NLP
     3. Generate embeddings for semantic matching
     """
-    from sqlalchemy import create_engine
-    from sqlalchemy.orm import sessionmaker
-    
-    connect_args = {}
-    if db_url.startswith("sqlite"):
-        connect_args = {"check_same_thread": False}
-    
-    engine = create_engine(db_url, connect_args=connect_args)
-    SessionLocal = sessionmaker(bind=engine)
-    db = SessionLocal()
+    db = background_session(db_url)
     
     job = None
     try:
@@ -101,17 +142,18 @@ def process_jd_background(job_id: str, file_path: str = None, text: str = None,
         job.experience_range = compressed.get("experience_range", "")
         job.education_requirement = compressed.get("education_requirements", "")
         
-        # Step 3: Generate embedding (optional — disabled for Render free tier to prevent OOM)
-        try:
-            # from app.services.matcher import MatchingEngine
-            # embedding = MatchingEngine.generate_embedding(raw_text)
-            # job.embedding = embedding
-            pass
-        except Exception as e:
-            logger.warning(f"Embedding generation skipped for job {job_id}: {e}")
+        # Step 3: Generate embedding (off unless GENERATE_EMBEDDINGS — the model
+        # would OOM the Render free tier). Batched with other in-flight tasks.
+        if settings.GENERATE_EMBEDDINGS:
+            try:
+                from app.services.matcher import embedding_batcher
+                job.embedding = embedding_batcher.embed(raw_text)
+            except Exception as e:
+                logger.warning(f"Embedding generation skipped for job {job_id}: {e}")
         
         job.status = "compressed"
         db.commit()
+        cache_job_payload(job_id, job.title, compressed, job.embedding)
         
         # Audit log
         audit = AuditLog(
@@ -138,7 +180,7 @@ def process_jd_background(job_id: str, file_path: str = None, text: str = None,
 
 
 @router.post("/upload", status_code=201)
-async def upload_job_description(
+def upload_job_description(
     file: Optional[UploadFile] = File(None),
     title: str = Query(..., description="Job title"),
     company: Optional[str] = Query(None),
@@ -150,91 +192,97 @@ async def upload_job_description(
     file_path = None
     
     if file:
-        error = FileParser.validate_file(file.filename, settings.max_upload_bytes, file.size or 0)
+        error = FileParser.validate_file(file.filename, settings.max_upload_bytes, file.size)
         if error:
             raise HTTPException(status_code=400, detail=error)
         
-        os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-        file_ext = os.path.splitext(file.filename)[1]
-        unique_filename = f"{uuid.uuid4()}{file_ext}"
-        file_path = os.path.join(settings.UPLOAD_DIR, unique_filename)
-        
-        content = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
+        file_path = save_upload(file)
     
-    job = Job(
-        title=title,
-        company=company or "",
-        department=department or "",
-        status="uploaded",
-    )
-    db.add(job)
+    # INSERT ... RETURNING hands back the server-side timestamps without a
+    # follow-up SELECT to refresh the row
+    job = db.execute(
+        insert(Job).values(
+            title=title,
+            company=company or "",
+            department=department or "",
+            status="uploaded",
+        ).returning(*JOB_DICT_COLUMNS)
+    ).one()
     db.commit()
-    db.refresh(job)
     
-    background_tasks.add_task(
-        process_jd_background, str(job.id), file_path, None, settings.DATABASE_URL,
-    )
+    enqueue(background_tasks, "process_jd_task", process_jd_background, str(job.id), file_path, None)
     
-    return job_to_dict(job)
+    return FastJSONResponse(job_to_dict(job), status_code=201)
 
 
 @router.post("/create", status_code=201)
-async def create_job_from_text(
+def create_job_from_text(
     job_data: JobCreateRequest,
     background_tasks: BackgroundTasks = BackgroundTasks(),
     db: Session = Depends(get_db),
 ):
     """Create a job description from text input (no file upload needed)."""
-    job = Job(
-        title=job_data.title,
-        company=job_data.company or "",
-        department=job_data.department or "",
-        location=job_data.location or "",
-        original_text=job_data.description_text,
-        status="uploaded",
-    )
-    db.add(job)
+    job = db.execute(
+        insert(Job).values(
+            title=job_data.title,
+            company=job_data.company or "",
+            department=job_data.department or "",
+            location=job_data.location or "",
+            original_text=job_data.description_text,
+            status="uploaded",
+        ).returning(*JOB_DICT_COLUMNS)
+    ).one()
     db.commit()
-    db.refresh(job)
     
     if job_data.description_text:
-        background_tasks.add_task(
-            process_jd_background, str(job.id), None, job_data.description_text, settings.DATABASE_URL,
+        enqueue(
+            background_tasks, "process_jd_task", process_jd_background,
+            str(job.id), None, job_data.description_text,
         )
     
-    return job_to_dict(job)
+    return FastJSONResponse(job_to_dict(job), status_code=201)
 
 
 @router.get("")
-async def list_jobs(
+def list_jobs(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     status: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page; replaces page"),
     db: Session = Depends(get_db),
 ):
-    """List all job descriptions with pagination."""
+    """
+    List all job descriptions, newest first. Pass `cursor` for keyset paging;
+    the cursor for the next page comes back in the X-Next-Cursor header.
+    """
     query = db.query(Job)
     if status:
         query = query.filter(Job.status == status)
     
     total = query.count()
-    jobs = query.order_by(Job.created_at.desc()) \
-        .offset((page - 1) * per_page) \
-        .limit(per_page) \
-        .all()
+    query = query.order_by(Job.created_at.desc(), Job.id.desc())
+    if cursor:
+        query = query.filter(keyset_filter(Job.created_at, Job.id, cursor))
+    else:
+        query = query.offset((page - 1) * per_page)
+    jobs = query.limit(per_page + 1).all()
+    has_more = len(jobs) > per_page
+    jobs = jobs[:per_page]
     
-    return {
-        "jobs": [job_to_dict(j) for j in jobs],
-        "total": total,
-        "page": page,
-        "per_page": per_page,
-    }
+    # Payload is already JSON-ready; skip FastAPI's jsonable_encoder pass
+    return FastJSONResponse(
+        {
+            "jobs": [job_to_dict(j) for j in jobs],
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+        },
+        headers=next_cursor_headers(jobs[-1], has_more) if jobs else {},
+    )
 
 
 @router.get("/{job_id}")
-async def get_job(job_id: str, db: Session = Depends(get_db)):
+def get_job(job_id: str, db: Session = Depends(get_db)):
     """Get detailed information about a specific job description."""
     job = db.query(Job).filter(Job.id == job_id).first()
     if not job:
@@ -243,7 +291,7 @@ async def get_job(job_id: str, db: Session = Depends(get_db)):
 
 
 @router.delete("/{job_id}", status_code=204)
-async def delete_job(job_id: str, db: Session = Depends(get_db)):
+def delete_job(job_id: str, db: Session = Depends(get_db)):
     """Delete a job description and associated data."""
     job = db.query(Job).filter(Job.id == job_id).first()
     if not job:
@@ -253,7 +301,11 @@ async def delete_job(job_id: str, db: Session = Depends(get_db)):
     db.add(audit)
     
     # Cascade delete match sessions
+    session_ids = [sid for (sid,) in db.query(MatchSession.id).filter(MatchSession.job_id == job_id)]
     db.query(MatchSession).filter(MatchSession.job_id == job_id).delete()
     
     db.delete(job)
     db.commit()
+    
+    from app.routers.matching import session_status_key  # matching imports this module
+    CacheService.delete(job_payload_key(job_id), *[session_status_key(sid) for sid in session_ids])
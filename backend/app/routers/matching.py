@@ -7,25 +7,175 @@ Fixed for SQLite compatibility.
 
 import uuid
 import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import partial
 from typing import Optional
 from pydantic import BaseModel
 from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import String, and_, any_, bindparam, desc, func, insert, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
 
-from app.database import get_db
+from app.database import background_session, get_db, new_id
 from app.config import settings
 from app.models.job import Job
+from app.routers.jobs import load_job_payload
+from app.services.cache import CacheService
 from app.models.candidate import Candidate
 from app.models.match import MatchSession, MatchResult
 from app.models.audit import AuditLog
-from app.services.matcher import MatchingEngine
+from app.services.matcher import score_candidate_batch
 from app.services.bias import BiasDetector
+from app.tasks.dispatch import enqueue
+from app.utils.pagination import keyset_filter, next_cursor_headers
+from app.utils.responses import FastJSONResponse
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/match", tags=["Matching"])
 
+# Commit a progress heartbeat every N scored candidates instead of every row
+PROGRESS_EVERY = 25
+
+# Max ids per IN (...) where ids can't be bound as one array; stays under
+# SQLite's historical 999-variable limit
+CANDIDATE_ID_CHUNK = 900
+
+# Candidates read (and results written) per query while scoring a session
+CANDIDATE_SCAN_CHUNK = 500
+
+# Rows fetched per round-trip when listing a session's results
+RESULTS_FETCH_CHUNK = 500
+
+# Status polls are served from Redis; the matcher republishes on every heartbeat
+SESSION_STATUS_TTL = 3600
+
+
+def session_status_key(session_id: str) -> str:
+    return f"match:session:{session_id}:status"
+
+
+def session_status_payload(session_id: str, status: str, total: int, processed: int) -> dict:
+    """Response body of GET /status/{session_id}."""
+    progress = (processed / total * 100) if total and total > 0 else 0
+    return {
+        "session_id": str(session_id),
+        "status": status,
+        "total_candidates": total or 0,
+        "processed_candidates": processed or 0,
+        "progress_percent": round(progress, 1),
+    }
+
+
+def publish_session_status(session_id: str, status: str, total: int, processed: int) -> None:
+    """Push a session's committed progress to the status cache."""
+    CacheService.set_json(
+        session_status_key(session_id),
+        session_status_payload(session_id, status, total, processed),
+        SESSION_STATUS_TTL,
+    )
+
+
+_match_executor = None
+
+
+def get_match_executor(candidate_count: int) -> Optional[ProcessPoolExecutor]:
+    """
+    Process pool for scoring large sessions, created once and reused.
+    
+    The rule-based scorers are pure Python, so threads would serialise on the
+    GIL. Returns None (score inline) for small sessions, when MATCH_WORKERS is
+    1, or inside a daemonic process such as a Celery prefork child, which may
+    not start children of its own.
+    """
+    global _match_executor
+    workers = settings.MATCH_WORKERS or os.cpu_count() or 1
+    if (
+        workers < 2
+        or candidate_count < settings.MATCH_PARALLEL_MIN_CANDIDATES
+        or multiprocessing.current_process().daemon
+    ):
+        return None
+    if _match_executor is None:
+        # spawn: forking a threaded server process can deadlock the children
+        _match_executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _match_executor
+
+
+def shutdown_match_executor():
+    """Stop the scoring pool (app shutdown)."""
+    global _match_executor
+    if _match_executor is not None:
+        _match_executor.shutdown(cancel_futures=True)
+        _match_executor = None
+
+
+def candidate_filters(db: Session, candidate_ids: Optional[list] = None) -> list:
+    """
+    WHERE clauses for the candidates a session scores, one per id chunk.
+    
+    PostgreSQL gets the ids as one array parameter (id = ANY(:ids)), so the
+    statement text doesn't grow with the list; other databases get one
+    IN list per CANDIDATE_ID_CHUNK ids.
+    """
+    ready = Candidate.status == "compressed"
+    if not candidate_ids:
+        return [ready]
+    
+    ids = list(dict.fromkeys(candidate_ids))
+    if db.get_bind().dialect.name == "postgresql":
+        id_array = bindparam("candidate_ids", value=ids, type_=ARRAY(String))
+        return [and_(ready, Candidate.id == any_(id_array))]
+    return [
+        and_(ready, Candidate.id.in_(ids[start:start + CANDIDATE_ID_CHUNK]))
+        for start in range(0, len(ids), CANDIDATE_ID_CHUNK)
+    ]
+
+
+def count_candidates(db: Session, filters: list) -> int:
+    return sum(db.scalar(select(func.count()).select_from(Candidate).where(f)) for f in filters)
+
+
+def iter_candidate_chunks(db: Session, filters: list, chunk_size: Optional[int] = None):
+    """
+    Yield the scoring columns of matching candidates, chunk_size rows at a time.
+    
+    Each chunk is its own keyset query on id rather than one long-lived
+    cursor, so callers can commit between chunks and memory stays bounded by
+    the chunk size.
+    """
+    chunk_size = chunk_size or CANDIDATE_SCAN_CHUNK
+    columns = select(Candidate.id, Candidate.bias_flags, Candidate.compressed_data, Candidate.embedding)
+    for where in filters:
+        last_id = None
+        while True:
+            stmt = columns.where(where).order_by(Candidate.id).limit(chunk_size)
+            if last_id is not None:
+                stmt = stmt.where(Candidate.id > last_id)
+            rows = db.execute(stmt).all()
+            if rows:
+                yield rows
+            if len(rows) < chunk_size:
+                break
+            last_id = rows[-1].id
+
+
+def rank_session_results(db: Session, session_id: str) -> None:
+    """Set MatchResult.rank by descending score for a session in one UPDATE."""
+    ranked = select(
+        MatchResult.id,
+        func.row_number().over(order_by=(MatchResult.overall_score.desc(), MatchResult.id)).label("rank"),
+    ).where(MatchResult.session_id == session_id).subquery()
+    db.execute(
+        update(MatchResult)
+        .where(MatchResult.id == ranked.c.id)
+        .values(rank=ranked.c.rank)
+    )
+
 
 class MatchConfig(BaseModel):
     skill_weight: float = 0.30
@@ -46,16 +196,7 @@ class MatchRunRequest(BaseModel):
 
 def run_matching_background(session_id: str, db_url: str):
     """Background task that runs the full matching pipeline."""
-    from sqlalchemy import create_engine
-    from sqlalchemy.orm import sessionmaker
-    
-    connect_args = {}
-    if db_url.startswith("sqlite"):
-        connect_args = {"check_same_thread": False}
-    
-    engine = create_engine(db_url, connect_args=connect_args)
-    SessionLocal = sessionmaker(bind=engine)
-    db = SessionLocal()
+    db = background_session(db_url)
     
     session = None
     try:
@@ -67,31 +208,29 @@ def run_matching_background(session_id: str, db_url: str):
         session.status = "processing"
         session.started_at = datetime.utcnow()
         db.commit()
+        publish_session_status(session_id, "processing", 0, 0)
         
-        # Load job
-        job = db.query(Job).filter(Job.id == session.job_id).first()
-        if not job or not job.compressed_data:
+        # Load job scoring inputs (Redis first, then the DB)
+        job = load_job_payload(db, session.job_id)
+        if job is None:
             session.status = "failed"
             db.commit()
+            CacheService.delete(session_status_key(session_id))
             logger.error(f"Job {session.job_id} not ready for matching")
             return
         
-        # Load candidates
-        candidate_query = db.query(Candidate).filter(Candidate.status == "compressed")
-        
+        # Count candidates up front so progress has a denominator
         config = session.config or {}
-        candidate_ids = config.get("candidate_ids")
-        if candidate_ids:
-            candidate_query = candidate_query.filter(Candidate.id.in_(candidate_ids))
-        
-        candidates = candidate_query.all()
-        session.total_candidates = len(candidates)
+        filters = candidate_filters(db, config.get("candidate_ids"))
+        total = count_candidates(db, filters)
+        session.total_candidates = total
         db.commit()
         
-        if not candidates:
+        if not total:
             session.status = "completed"
             session.completed_at = datetime.utcnow()
             db.commit()
+            publish_session_status(session_id, "completed", 0, 0)
             return
         
         # Match config
@@ -105,56 +244,75 @@ def run_matching_background(session_id: str, db_url: str):
             "semantic_weight": config.get("semantic_weight", settings.DEFAULT_SEMANTIC_WEIGHT),
         }
         
-        job_payload = job.compressed_data or {}
-        job_payload["title"] = job.title
+        job_payload, job_embedding = job
+        score_batch = partial(
+            score_candidate_batch,
+            job_data=job_payload,
+            job_embedding=job_embedding,
+            config=match_config,
+        )
+        executor = get_match_executor(total)
         
-        results = []
-        for i, candidate in enumerate(candidates):
-            try:
-                match_result = MatchingEngine.compute_match(
-                    candidate_data=candidate.compressed_data or {},
-                    job_data=job_payload,
-                    candidate_embedding=candidate.embedding,
-                    job_embedding=job.embedding,
-                    config=match_config,
-                )
-                
-                bias_adjusted = False
-                if config.get("bias_check", True) and candidate.bias_flags:
-                    if candidate.bias_flags.get("risk_level") in ("medium", "high"):
-                        bias_adjusted = True
+        # Stream candidates a chunk at a time and write each chunk's results
+        # before reading the next, so memory is bounded by the chunk size
+        processed = 0
+        matched = 0
+        for rows in iter_candidate_chunks(db, filters):
+            # Score in batches: one matmul per batch for embeddings and
+            # weights, with a progress heartbeat after each. Large sessions
+            # spread the batches over the process pool; map keeps them in order
+            batches = [rows[start:start + PROGRESS_EVERY] for start in range(0, len(rows), PROGRESS_EVERY)]
+            scored = (executor.map if executor else map)(
+                score_batch,
+                [[r.compressed_data or {} for r in batch] for batch in batches],
+                [[r.embedding for r in batch] for batch in batches],
+            )
+            
+            results = []
+            for batch, match_results in zip(batches, scored):
+                for row, match_result in zip(batch, match_results):
+                    if match_result is None:
+                        logger.error(f"Error matching candidate {row.id}")
+                        continue
+                    
+                    bias_adjusted = False
+                    if config.get("bias_check", True) and row.bias_flags:
+                        if row.bias_flags.get("risk_level") in ("medium", "high"):
+                            bias_adjusted = True
+                    
+                    results.append({
+                        "id": new_id(),
+                        "session_id": session_id,
+                        "candidate_id": row.id,
+                        "overall_score": match_result["overall_score"],
+                        "skill_score": match_result["skill_score"],
+                        "experience_score": match_result["experience_score"],
+                        "education_score": match_result["education_score"],
+                        "semantic_score": match_result["semantic_score"],
+                        "score_breakdown": match_result.get("score_breakdown"),
+                        "bias_adjusted": bias_adjusted,
+                    })
                 
-                result = MatchResult(
-                    session_id=session_id,
-                    candidate_id=candidate.id,
-                    overall_score=match_result["overall_score"],
-                    skill_score=match_result["skill_score"],
-                    experience_score=match_result["experience_score"],
-                    education_score=match_result["education_score"],
-                    semantic_score=match_result["semantic_score"],
-                    score_breakdown=match_result.get("score_breakdown"),
-                    bias_adjusted=bias_adjusted,
-                )
-                db.add(result)
-                results.append(result)
-                
-                session.processed_candidates = i + 1
+                processed += len(batch)
+                if processed < total:
+                    session.processed_candidates = processed
+                    db.commit()
+                    publish_session_status(session_id, "processing", total, processed)
+            
+            # One multi-row INSERT per chunk; ranks are assigned at the end
+            if results:
+                db.execute(insert(MatchResult), results)
                 db.commit()
-                
-            except Exception as e:
-                logger.error(f"Error matching candidate {candidate.id}: {e}")
-                continue
-        
-        # Rank by score
-        results.sort(key=lambda r: float(r.overall_score or 0), reverse=True)
-        for rank, result in enumerate(results, 1):
-            result.rank = rank
+                matched += len(results)
         
+        rank_session_results(db, session_id)
+        session.processed_candidates = total
         session.status = "completed"
         session.completed_at = datetime.utcnow()
         db.commit()
+        publish_session_status(session_id, "completed", total, total)
         
-        logger.info(f"✅ Matching session {session_id} completed: {len(results)} candidates")
+        logger.info(f"✅ Matching session {session_id} completed: {matched} candidates")
         
     except Exception as e:
         logger.error(f"❌ Error in matching session {session_id}: {e}")
@@ -164,12 +322,14 @@ def run_matching_background(session_id: str, db_url: str):
                 db.commit()
             except Exception:
                 db.rollback()
+        # Polls fall back to the DB for the final state
+        CacheService.delete(session_status_key(session_id))
     finally:
         db.close()
 
 
 @router.post("/run", status_code=202)
-async def run_matching(
+def run_matching(
     request: MatchRunRequest,
     background_tasks: BackgroundTasks = BackgroundTasks(),
     db: Session = Depends(get_db),
@@ -198,20 +358,20 @@ async def run_matching(
     if request.candidate_ids:
         config_dict["candidate_ids"] = request.candidate_ids
     
-    session = MatchSession(
-        job_id=request.job_id,
-        status="pending",
-        config=config_dict,
-    )
-    db.add(session)
+    # RETURNING supplies the id and server-side created_at without a refresh SELECT
+    session = db.execute(
+        insert(MatchSession).values(
+            job_id=request.job_id,
+            job_title=job.title,
+            status="pending",
+            config=config_dict,
+        ).returning(MatchSession.id, MatchSession.job_id, MatchSession.status, MatchSession.created_at)
+    ).one()
     db.commit()
-    db.refresh(session)
     
-    background_tasks.add_task(
-        run_matching_background, str(session.id), settings.DATABASE_URL,
-    )
+    enqueue(background_tasks, "run_matching_task", run_matching_background, str(session.id))
     
-    return {
+    return FastJSONResponse({
         "id": session.id,
         "job_id": session.job_id,
         "job_title": job.title,
@@ -220,34 +380,44 @@ async def run_matching(
         "processed_candidates": 0,
         "progress_percent": 0.0,
         "created_at": session.created_at.isoformat() if session.created_at else None,
-    }
+    }, status_code=202)
 
 
 @router.get("/sessions")
-async def list_sessions(
+def list_sessions(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=50),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page; replaces page"),
     db: Session = Depends(get_db),
 ):
-    """List all matching sessions."""
-    sessions = db.query(MatchSession) \
-        .order_by(desc(MatchSession.created_at)) \
-        .offset((page - 1) * per_page) \
-        .limit(per_page) \
-        .all()
+    """
+    List all matching sessions, newest first. The body stays a plain list;
+    the keyset cursor for the next page comes back in the X-Next-Cursor header.
+    """
+    # The job title is stored on the session; jobs is only probed by primary
+    # key so sessions whose job is gone are still skipped
+    query = db.query(
+        MatchSession.id, MatchSession.job_id, MatchSession.job_title, MatchSession.status,
+        MatchSession.total_candidates, MatchSession.processed_candidates,
+        MatchSession.created_at, MatchSession.started_at, MatchSession.completed_at,
+    ).filter(select(Job.id).where(Job.id == MatchSession.job_id).exists()) \
+        .order_by(desc(MatchSession.created_at), desc(MatchSession.id))
+    if cursor:
+        query = query.filter(keyset_filter(MatchSession.created_at, MatchSession.id, cursor))
+    else:
+        query = query.offset((page - 1) * per_page)
+    sessions = query.limit(per_page + 1).all()
+    has_more = len(sessions) > per_page
+    sessions = sessions[:per_page]
     
     result = []
     for s in sessions:
-        job = db.query(Job).filter(Job.id == s.job_id).first()
-        if not job:
-            continue
-
         progress = (s.processed_candidates / s.total_candidates * 100) if s.total_candidates and s.total_candidates > 0 else 0
         
         result.append({
             "id": s.id,
             "job_id": s.job_id,
-            "job_title": job.title,
+            "job_title": s.job_title or "Unknown",
             "status": s.status,
             "total_candidates": s.total_candidates or 0,
             "processed_candidates": s.processed_candidates or 0,
@@ -257,11 +427,11 @@ async def list_sessions(
             "completed_at": s.completed_at.isoformat() if s.completed_at else None,
         })
     
-    return result
+    return FastJSONResponse(result, headers=next_cursor_headers(sessions[-1], has_more) if sessions else {})
 
 
 @router.get("/results/{session_id}")
-async def get_match_results(
+def get_match_results(
     session_id: str,
     top_n: Optional[int] = Query(None, ge=1, le=100),
     db: Session = Depends(get_db),
@@ -271,25 +441,31 @@ async def get_match_results(
     if not session:
         raise HTTPException(status_code=404, detail="Match session not found")
     
-    job = db.query(Job).filter(Job.id == session.job_id).first()
+    job_title = session.job_title or db.query(Job.title).filter(Job.id == session.job_id).scalar()
     
-    results_query = db.query(MatchResult) \
+    # Candidate details come from the same query instead of one lookup per
+    # result. Only the listed columns are read: no score breakdowns, resume
+    # text or embeddings, and rows are fetched in chunks as they're consumed
+    results_query = db.query(
+        MatchResult.id, MatchResult.candidate_id, MatchResult.overall_score,
+        MatchResult.skill_score, MatchResult.experience_score, MatchResult.education_score,
+        MatchResult.semantic_score, MatchResult.bias_adjusted, MatchResult.rank,
+        Candidate.id.label("found"), Candidate.name, Candidate.email,
+        Candidate.skills, Candidate.experience_years,
+    ) \
+        .outerjoin(Candidate, MatchResult.candidate_id == Candidate.id) \
         .filter(MatchResult.session_id == session_id) \
         .order_by(MatchResult.rank)
     
     if top_n:
         results_query = results_query.limit(top_n)
     
-    results = results_query.all()
-    
-    result_list = []
-    for r in results:
-        candidate = db.query(Candidate).filter(Candidate.id == r.candidate_id).first()
-        result_list.append({
+    result_list = [
+        {
             "id": r.id,
             "candidate_id": r.candidate_id,
-            "candidate_name": candidate.name if candidate else "Unknown",
-            "candidate_email": candidate.email if candidate else None,
+            "candidate_name": r.name if r.found else "Unknown",
+            "candidate_email": r.email if r.found else None,
             "overall_score": float(r.overall_score or 0),
             "skill_score": float(r.skill_score or 0),
             "experience_score": float(r.experience_score or 0),
@@ -297,17 +473,19 @@ async def get_match_results(
             "semantic_score": float(r.semantic_score or 0),
             "bias_adjusted": r.bias_adjusted or False,
             "rank": r.rank,
-            "candidate_skills": candidate.skills if candidate and candidate.skills else [],
-            "candidate_experience_years": float(candidate.experience_years) if candidate and candidate.experience_years else None,
-        })
+            "candidate_skills": r.skills or [],
+            "candidate_experience_years": float(r.experience_years) if r.experience_years else None,
+        }
+        for r in results_query.yield_per(RESULTS_FETCH_CHUNK)
+    ]
     
     progress = (session.processed_candidates / session.total_candidates * 100) if session.total_candidates and session.total_candidates > 0 else 0
     
-    return {
+    return FastJSONResponse({
         "session": {
             "id": session.id,
             "job_id": session.job_id,
-            "job_title": job.title if job else "Unknown",
+            "job_title": job_title or "Unknown",
             "status": session.status,
             "total_candidates": session.total_candidates or 0,
             "processed_candidates": session.processed_candidates or 0,
@@ -315,22 +493,26 @@ async def get_match_results(
         },
         "results": result_list,
         "total": len(result_list),
-    }
+    })
 
 
 @router.get("/status/{session_id}")
-async def get_session_status(session_id: str, db: Session = Depends(get_db)):
-    """Get the current processing status of a matching session."""
-    session = db.query(MatchSession).filter(MatchSession.id == session_id).first()
+def get_session_status(session_id: str, db: Session = Depends(get_db)):
+    """
+    Get the current processing status of a matching session. Served from
+    the status cache while the matcher publishes it; the DB otherwise.
+    """
+    cached = CacheService.get_json(session_status_key(session_id))
+    if cached is not None:
+        return FastJSONResponse(cached)
+    
+    session = db.query(
+        MatchSession.id, MatchSession.status,
+        MatchSession.total_candidates, MatchSession.processed_candidates,
+    ).filter(MatchSession.id == session_id).first()
     if not session:
         raise HTTPException(status_code=404, detail="Match session not found")
     
-    progress = (session.processed_candidates / session.total_candidates * 100) if session.total_candidates and session.total_candidates > 0 else 0
-    
-    return {
-        "session_id": str(session.id),
-        "status": session.status,
-        "total_candidates": session.total_candidates or 0,
-        "processed_candidates": session.processed_candidates or 0,
-        "progress_percent": round(progress, 1),
-    }
+    return FastJSONResponse(session_status_payload(
+        session.id, session.status, session.total_candidates, session.processed_candidates
+    ))
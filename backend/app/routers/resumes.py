@@ -6,25 +6,58 @@ Fixed to work with SQLite (no PostgreSQL needed).
 """
 
 import os
-import uuid
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Optional
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Query, BackgroundTasks, Form
 from fastapi.responses import FileResponse
+from sqlalchemy import func, insert
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import background_session, get_db, new_id
 from app.config import settings
 from app.models.candidate import Candidate
 from app.models.audit import AuditLog
 from app.services.parser import FileParser
 from app.services.compressor import ResumeCompressor
 from app.services.bias import BiasDetector
+from app.tasks.dispatch import enqueue
+from app.utils.responses import FastJSONResponse
+from app.utils.uploads import load_extracted_text, remove_upload, save_extracted_text, save_upload
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/resumes", tags=["Resumes"])
 
+# Columns returned by the candidate list, in response key order.
+# experience_years NULL -> 0 is done by the database, not per row in Python.
+CANDIDATE_LIST_COLUMNS = (
+    Candidate.id, Candidate.name, Candidate.email, Candidate.phone, Candidate.skills,
+    func.coalesce(Candidate.experience_years, 0).label("experience_years"),
+    Candidate.education, Candidate.status, Candidate.file_name,
+    Candidate.created_at, Candidate.updated_at,
+)
+
+# Content-Type for downloads by stored file_type. The body is sent straight
+# from disk (no middleware rewrites it) and filename= still makes it an attachment.
+DOWNLOAD_MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "doc": "application/msword",
+    "txt": "text/plain",
+}
+
+# Threads used to save the files of one batch upload
+UPLOAD_SAVE_WORKERS = 4
+
+
+def _save_or_error(file: UploadFile):
+    """save_upload for batch uploads: (path, None) or (None, error detail)."""
+    try:
+        return save_upload(file), None
+    except HTTPException as e:
+        return None, e.detail
+
 
 def process_resume_background(candidate_id: str, file_path: str, db_url: str):
     """
@@ -34,16 +67,7 @@ def process_resume_background(candidate_id: str, file_path: str, db_url: str):
     3. Compress into structured JSON via NLP
     4. Generate embeddings for semantic matching
     """
-    from sqlalchemy import create_engine
-    from sqlalchemy.orm import sessionmaker
-    
-    connect_args = {}
-    if db_url.startswith("sqlite"):
-        connect_args = {"check_same_thread": False}
-    
-    engine = create_engine(db_url, connect_args=connect_args)
-    SessionLocal = sessionmaker(bind=engine)
-    db = SessionLocal()
+    db = background_session(db_url)
     
     candidate = None
     try:
@@ -52,45 +76,61 @@ def process_resume_background(candidate_id: str, file_path: str, db_url: str):
             logger.error(f"Candidate {candidate_id} not found for processing")
             return
         
-        # Step 1: Parse file
-        candidate.status = "parsing"
-        db.commit()
+        # Identical uploads share one content-addressed file, so a processed
+        # candidate with the same file_path already holds this resume's
+        # text, bias flags, compressed data and embedding
+        processed = db.query(
+            Candidate.original_text, Candidate.bias_flags, Candidate.compressed_data, Candidate.embedding,
+        ) \
+            .filter(Candidate.file_path == file_path, Candidate.status == "compressed", Candidate.id != candidate_id) \
+            .first() if file_path else None
         
-        raw_text = FileParser.parse(file_path)
-        candidate.original_text = raw_text
-        candidate.status = "parsed"
-        db.commit()
+        if processed:
+            # Set only on rows processed before text moved beside the upload
+            stored_text = processed.original_text
+            bias_analysis = processed.bias_flags or {}
+            compressed = processed.compressed_data or {}
+            candidate.embedding = processed.embedding
+            logger.info(f"♻️ Reusing processed content for duplicate upload {candidate_id}")
+        else:
+            # Step 1: Parse file. "parsing" is the only intermediate status
+            # committed, so the dashboard can count in-flight resumes; the
+            # rest of the job lands in a single commit at the end.
+            candidate.status = "parsing"
+            db.commit()
+            
+            raw_text = FileParser.parse(file_path)
+            # Extracted text is kept gzipped beside the upload, not in the
+            # row, so the candidates table stays compact
+            save_extracted_text(file_path, raw_text)
+            stored_text = None
+            
+            # Step 2: Bias detection & neutralization
+            bias_analysis, neutralized_text, changes = BiasDetector.analyze_and_neutralize(raw_text)
+            
+            # Step 3: NLP compression
+            compressed = ResumeCompressor.compress_resume(neutralized_text, use_llm=False)
+            
+            # Step 4: Generate embedding (off unless GENERATE_EMBEDDINGS — the model
+            # would OOM the Render free tier). Batched with other in-flight tasks.
+            if settings.GENERATE_EMBEDDINGS:
+                try:
+                    from app.services.matcher import embedding_batcher
+                    candidate.embedding = embedding_batcher.embed(neutralized_text)
+                except Exception as e:
+                    logger.warning(f"Embedding generation skipped for {candidate_id}: {e}")
         
-        # Step 2: Bias detection & neutralization
-        bias_analysis = BiasDetector.analyze(raw_text)
-        neutralized_text, changes = BiasDetector.neutralize(raw_text)
+        candidate.original_text = stored_text
         candidate.bias_flags = bias_analysis
-        
-        # Step 3: NLP compression
-        candidate.status = "compressing"
-        db.commit()
-        
-        compressed = ResumeCompressor.compress_resume(neutralized_text, use_llm=False)
-        
         candidate.compressed_data = compressed
         candidate.name = candidate.name or compressed.get("name", "")
         candidate.skills = compressed.get("skills", [])
         candidate.experience_years = compressed.get("total_experience_years", 0)
         candidate.education = str(compressed.get("education", ""))
         
-        # Step 4: Generate embedding (optional — disabled for Render free tier to prevent OOM)
-        try:
-            # from app.services.matcher import MatchingEngine
-            # embedding = MatchingEngine.generate_embedding(neutralized_text)
-            # candidate.embedding = embedding
-            pass
-        except Exception as e:
-            logger.warning(f"Embedding generation skipped for {candidate_id}: {e}")
-        
         candidate.status = "compressed"
-        db.commit()
         
-        # Audit log
+        # Audit log, committed together with the processed candidate
         audit = AuditLog(
             entity_type="candidate",
             entity_id=candidate_id,
@@ -118,7 +158,7 @@ def process_resume_background(candidate_id: str, file_path: str, db_url: str):
 
 
 @router.post("/upload", status_code=201)
-async def upload_resume(
+def upload_resume(
     file: UploadFile = File(...),
     name: Optional[str] = Form(None),
     email: Optional[str] = Form(None),
@@ -135,54 +175,44 @@ async def upload_resume(
     error = FileParser.validate_file(
         file.filename,
         settings.max_upload_bytes,
-        file.size or 0
+        file.size
     )
     if error:
         raise HTTPException(status_code=400, detail=error)
     
     # Save file
-    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    file_path = save_upload(file)
     file_ext = os.path.splitext(file.filename)[1]
-    unique_filename = f"{uuid.uuid4()}{file_ext}"
-    file_path = os.path.join(settings.UPLOAD_DIR, unique_filename)
-    
-    content = await file.read()
-    with open(file_path, "wb") as f:
-        f.write(content)
     
     # Create candidate record
-    candidate = Candidate(
-        name=name or "",
-        email=email or "",
-        file_path=file_path,
-        file_name=file.filename,
-        file_type=file_ext.lstrip("."),
-        status="uploaded",
-    )
-    db.add(candidate)
+    # RETURNING supplies the id and server-side created_at without a refresh SELECT
+    candidate = db.execute(
+        insert(Candidate).values(
+            name=name or "",
+            email=email or "",
+            file_path=file_path,
+            file_name=file.filename,
+            file_type=file_ext.lstrip("."),
+            status="uploaded",
+        ).returning(Candidate.id, Candidate.name, Candidate.email, Candidate.status, Candidate.created_at)
+    ).one()
     db.commit()
-    db.refresh(candidate)
     
     # Process in background
-    background_tasks.add_task(
-        process_resume_background,
-        str(candidate.id),
-        file_path,
-        settings.DATABASE_URL,
-    )
+    enqueue(background_tasks, "process_resume_task", process_resume_background, str(candidate.id), file_path)
     
-    return {
+    return FastJSONResponse({
         "id": candidate.id,
         "name": candidate.name,
         "email": candidate.email,
         "file_name": file.filename,
         "status": candidate.status,
         "created_at": candidate.created_at.isoformat() if candidate.created_at else None,
-    }
+    }, status_code=201)
 
 
 @router.post("/upload-batch", status_code=202)
-async def upload_resumes_batch(
+def upload_resumes_batch(
     files: List[UploadFile] = File(...),
     background_tasks: BackgroundTasks = BackgroundTasks(),
     db: Session = Depends(get_db),
@@ -196,57 +226,59 @@ async def upload_resumes_batch(
     
     results = []
     errors = []
+    rows = []
     
+    valid = []
     for file in files:
         error = FileParser.validate_file(
             file.filename,
             settings.max_upload_bytes,
-            file.size or 0
+            file.size
         )
         if error:
             errors.append({"filename": file.filename, "error": error})
             continue
-        
-        # Save file
-        os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+        valid.append(file)
+    
+    # Save files on a few threads; hashing and disk writes release the GIL
+    with ThreadPoolExecutor(max_workers=UPLOAD_SAVE_WORKERS) as pool:
+        saved = list(pool.map(_save_or_error, valid))
+    
+    for file, (file_path, error) in zip(valid, saved):
+        if error:
+            errors.append({"filename": file.filename, "error": error})
+            continue
         file_ext = os.path.splitext(file.filename)[1]
-        unique_filename = f"{uuid.uuid4()}{file_ext}"
-        file_path = os.path.join(settings.UPLOAD_DIR, unique_filename)
-        
-        content = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
         
-        # Create candidate record
-        candidate = Candidate(
-            file_path=file_path,
-            file_name=file.filename,
-            file_type=file_ext.lstrip("."),
-            status="uploaded",
-        )
-        db.add(candidate)
+        rows.append({
+            "id": new_id(),
+            "file_path": file_path,
+            "file_name": file.filename,
+            "file_type": file_ext.lstrip("."),
+            "status": "uploaded",
+        })
+    
+    # Insert all candidate records in one executemany + one commit instead of
+    # a commit (and fsync) per file
+    if rows:
+        db.execute(insert(Candidate), rows)
         db.commit()
-        db.refresh(candidate)
-        
+    
+    for row in rows:
         # Queue background processing
-        background_tasks.add_task(
-            process_resume_background,
-            str(candidate.id),
-            file_path,
-            settings.DATABASE_URL,
-        )
+        enqueue(background_tasks, "process_resume_task", process_resume_background, row["id"], row["file_path"])
         
         results.append({
-            "id": str(candidate.id),
-            "filename": file.filename,
+            "id": row["id"],
+            "filename": row["file_name"],
             "status": "queued",
         })
     
-    return {
+    return FastJSONResponse({
         "message": f"Queued {len(results)} resumes for processing",
         "queued": results,
         "errors": errors,
-    }
+    }, status_code=202)
 
 
 @router.get("")
@@ -257,29 +289,31 @@ async def list_candidates(
     db: Session = Depends(get_db),
 ):
     """List all uploaded candidates with pagination."""
-    query = db.query(Candidate)
+    # Only the listed columns, not the text/JSON/embedding blobs
+    query = db.query(*CANDIDATE_LIST_COLUMNS)
     
     if status:
         query = query.filter(Candidate.status == status)
     
-    total = query.count()
+    # Page rows come straight off ix_candidates_status_created_at (or
+    # ix_candidates_created_at) in order. A COUNT(*) OVER () window here would
+    # force every matching row to be materialized and sorted, so the total is
+    # a separate count that the same index answers without touching rows.
     candidates = query.order_by(Candidate.created_at.desc()) \
         .offset((page - 1) * per_page) \
         .limit(per_page) \
         .all()
+    if page == 1 and len(candidates) < per_page:
+        total = len(candidates)
+    else:
+        total = query.with_entities(func.count(Candidate.id)).scalar()
     
-    return {
+    # Payload is already JSON-ready; skip FastAPI's jsonable_encoder pass
+    return FastJSONResponse({
         "candidates": [
             {
-                "id": c.id,
-                "name": c.name,
-                "email": c.email,
-                "phone": c.phone,
+                **c._mapping,
                 "skills": c.skills or [],
-                "experience_years": float(c.experience_years) if c.experience_years else 0,
-                "education": c.education,
-                "status": c.status,
-                "file_name": c.file_name,
                 "created_at": c.created_at.isoformat() if c.created_at else None,
                 "updated_at": c.updated_at.isoformat() if c.updated_at else None,
             }
@@ -288,16 +322,16 @@ async def list_candidates(
         "total": total,
         "page": page,
         "per_page": per_page,
-    }
+    })
 
 
 @router.get("/{candidate_id}")
-async def get_candidate(candidate_id: str, db: Session = Depends(get_db)):
+def get_candidate(candidate_id: str, db: Session = Depends(get_db)):
     """Get detailed information about a specific candidate."""
     candidate = db.query(Candidate).filter(Candidate.id == candidate_id).first()
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
-    return {
+    return FastJSONResponse({
         "id": candidate.id,
         "name": candidate.name,
         "email": candidate.email,
@@ -306,7 +340,7 @@ async def get_candidate(candidate_id: str, db: Session = Depends(get_db)):
         "experience_years": float(candidate.experience_years) if candidate.experience_years else 0,
         "education": candidate.education,
         "status": candidate.status,
-        "original_text": candidate.original_text,
+        "original_text": candidate.original_text or load_extracted_text(candidate.file_path),
         "compressed_data": candidate.compressed_data,
         "bias_flags": candidate.bias_flags,
         "file_name": candidate.file_name,
@@ -314,36 +348,43 @@ async def get_candidate(candidate_id: str, db: Session = Depends(get_db)):
         "created_at": candidate.created_at.isoformat() if candidate.created_at else None,
         "updated_at": candidate.updated_at.isoformat() if candidate.updated_at else None,
         "expires_at": candidate.expires_at.isoformat() if candidate.expires_at else None,
-    }
+    })
 
 
 @router.get("/{candidate_id}/download")
-async def download_resume(candidate_id: str, db: Session = Depends(get_db)):
+def download_resume(candidate_id: str, db: Session = Depends(get_db)):
     """Download the original resume file."""
-    candidate = db.query(Candidate).filter(Candidate.id == candidate_id).first()
+    # Only the file metadata; the text/JSON/embedding columns aren't needed
+    candidate = db.query(Candidate.file_path, Candidate.file_name, Candidate.file_type) \
+        .filter(Candidate.id == candidate_id) \
+        .first()
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
     
-    if not candidate.file_path or not os.path.exists(candidate.file_path):
+    # Single stat, handed to FileResponse so it doesn't stat the file again
+    try:
+        stat_result = os.stat(candidate.file_path) if candidate.file_path else None
+    except OSError:
+        stat_result = None
+    if stat_result is None:
         raise HTTPException(status_code=404, detail="Resume file not found on server")
     
     return FileResponse(
         path=candidate.file_path,
         filename=candidate.file_name,
-        media_type='application/octet-stream'
+        media_type=DOWNLOAD_MEDIA_TYPES.get((candidate.file_type or "").lower(), "application/octet-stream"),
+        stat_result=stat_result,
     )
 
 
 @router.delete("/{candidate_id}", status_code=204)
-async def delete_candidate(candidate_id: str, db: Session = Depends(get_db)):
+def delete_candidate(candidate_id: str, db: Session = Depends(get_db)):
     """Delete a candidate and associated files (GDPR compliance)."""
     candidate = db.query(Candidate).filter(Candidate.id == candidate_id).first()
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
     
-    # Delete file
-    if candidate.file_path and os.path.exists(candidate.file_path):
-        os.remove(candidate.file_path)
+    file_path = candidate.file_path
     
     # Audit log
     audit = AuditLog(
@@ -355,4 +396,7 @@ async def delete_candidate(candidate_id: str, db: Session = Depends(get_db)):
     db.add(audit)
     
     db.delete(candidate)
+    db.flush()
+    # Stored files are shared by identical uploads; remove only the last reference
+    remove_upload(db, file_path)
     db.commit()
@@ -7,19 +7,26 @@ Provides webhook integration for Applicant Tracking Systems.
 import logging
 import hmac
 import hashlib
-import json
 from datetime import datetime
+from functools import lru_cache
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.config import settings
 from app.models.webhook import WebhookLog
+from app.utils.responses import json_bytes, json_loads
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/webhooks", tags=["Webhooks"])
 
 
+@lru_cache(maxsize=4)
+def _hmac_template(secret: str):
+    """HMAC-SHA256 already keyed with `secret`; copy() it per message instead of re-keying."""
+    return hmac.new(secret.encode(), digestmod=hashlib.sha256)
+
+
 class WebhookService:
     """Handles sending and receiving webhook notifications."""
     
@@ -30,7 +37,9 @@ class WebhookService:
             logger.debug(f"Webhook skipped (no URL configured): {event_type}")
             return False
         
-        signature = WebhookService._sign_payload(json.dumps(payload))
+        # Serialize once: the signed bytes are exactly the bytes sent
+        body = json_bytes(payload)
+        signature = WebhookService._sign_payload(body)
         headers = {
             "Content-Type": "application/json",
             "X-Webhook-Event": event_type,
@@ -40,7 +49,7 @@ class WebhookService:
         try:
             import httpx
             async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(url, json=payload, headers=headers)
+                response = await client.post(url, content=body, headers=headers)
             
             if db:
                 log = WebhookLog(
@@ -61,12 +70,14 @@ class WebhookService:
             return False
     
     @staticmethod
-    def _sign_payload(payload_str: str) -> str:
-        secret = settings.ATS_WEBHOOK_SECRET or "default-secret"
-        return hmac.new(secret.encode(), payload_str.encode(), hashlib.sha256).hexdigest()
+    def _sign_payload(payload_bytes: bytes) -> str:
+        # Keyed on the current secret, so a changed setting gets a fresh template
+        mac = _hmac_template(settings.ATS_WEBHOOK_SECRET or "default-secret").copy()
+        mac.update(payload_bytes)
+        return mac.hexdigest()
     
     @staticmethod
-    def verify_signature(payload: str, signature: str) -> bool:
+    def verify_signature(payload: bytes, signature: str) -> bool:
         expected = WebhookService._sign_payload(payload)
         return hmac.compare_digest(expected, signature)
 
@@ -84,10 +95,10 @@ async def receive_ats_webhook(request: Request, db: Session = Depends(get_db)):
     body = await request.body()
     signature = request.headers.get("X-Webhook-Signature", "")
     
-    if settings.ATS_WEBHOOK_SECRET and not WebhookService.verify_signature(body.decode(), signature):
+    if settings.ATS_WEBHOOK_SECRET and not WebhookService.verify_signature(body, signature):
         raise HTTPException(status_code=401, detail="Invalid webhook signature")
     
-    payload = await request.json()
+    payload = json_loads(body)
     event_type = request.headers.get("X-Webhook-Event", "unknown")
     
     log = WebhookLog(event_type=f"received:{event_type}", payload=payload, response_status=200)
@@ -9,6 +9,11 @@ import re
 import logging
 from typing import Dict, Any, List, Tuple
 
+try:
+    import re2
+except ImportError:
+    re2 = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -69,11 +74,29 @@ class BiasDetector:
     ]
     
     # Gendered pronouns (for statistical analysis)
-    PRONOUN_PATTERNS = {
-        "masculine": [r'\bhe\b', r'\bhis\b', r'\bhim\b'],
-        "feminine": [r'\bshe\b', r'\bher\b', r'\bhers\b'],
+    PRONOUNS = {
+        "he": "masculine", "his": "masculine", "him": "masculine",
+        "she": "feminine", "her": "feminine", "hers": "feminine",
     }
     
+    # Compiled once at import: all gendered terms as one alternation (longest
+    # first), so a single scan finds and replaces every term. Plain literals,
+    # so RE2's linear-time automaton (google-re2, when installed) matches
+    # exactly what re would, much faster on long texts.
+    _GENDERED_RE = (re2 or re).compile(
+        "(?i)" + "|".join(re.escape(term) for term in sorted(GENDERED_TERMS, key=len, reverse=True))
+    )
+    # Age and demographic patterns fused into one alternation scanned once;
+    # the named group that matched (age / demographic) gives the category.
+    # One group per category, not per pattern: re is several times slower
+    # with a capture group around every alternative.
+    _INDICATOR_RE = re.compile(
+        "(?P<age>" + "|".join(AGE_PATTERNS) + ")"
+        "|(?P<demographic>" + "|".join(DEMOGRAPHIC_PATTERNS) + ")",
+        re.IGNORECASE,
+    )
+    _PRONOUN_RE = re.compile(r'\b(?:' + "|".join(PRONOUNS) + r')\b', re.IGNORECASE)
+    
     @staticmethod
     def analyze(text: str) -> Dict[str, Any]:
         """
@@ -86,32 +109,110 @@ class BiasDetector:
             Dictionary with bias analysis results.
         """
         text_lower = text.lower()
+        
+        # Same single scan neutralize() replaces with, not one search per term
+        found_terms = {m.group(0) for m in BiasDetector._GENDERED_RE.finditer(text_lower)}
+        gendered_terms = [term for term in BiasDetector.GENDERED_TERMS if term in found_terms]
+        age_found, demo_found = [], []
+        for m in BiasDetector._INDICATOR_RE.finditer(text_lower):
+            (age_found if m.lastgroup == "age" else demo_found).append(m.group(0))
+        
+        return BiasDetector._build_analysis(gendered_terms, age_found, demo_found, text_lower)
+    
+    @staticmethod
+    def neutralize(text: str) -> Tuple[str, List[str]]:
+        """
+        Neutralize biased language in text.
+        
+        Args:
+            text: Raw text to neutralize.
+        
+        Returns:
+            Tuple of (neutralized_text, list_of_changes_made).
+        """
+        neutralized, changes, _, _, _ = BiasDetector._neutralize_collect(text)
+        return neutralized, changes
+    
+    @staticmethod
+    def analyze_and_neutralize(text: str) -> Tuple[Dict[str, Any], str, List[str]]:
+        """
+        analyze() and neutralize() in one pass: the flags are collected from
+        the same regex scans that rewrite the text, so the resume is read
+        once instead of twice. Text already redacted by an earlier pattern
+        is not counted again.
+        
+        Args:
+            text: Raw text to analyze and neutralize.
+        
+        Returns:
+            Tuple of (bias_analysis, neutralized_text, list_of_changes_made).
+        """
+        neutralized, changes, gendered_terms, age_found, demo_found = BiasDetector._neutralize_collect(text)
+        analysis = BiasDetector._build_analysis(
+            gendered_terms,
+            [m.lower() for m in age_found],
+            [m.lower() for m in demo_found],
+            text,
+        )
+        return analysis, neutralized, changes
+    
+    @staticmethod
+    def _neutralize_collect(text: str) -> Tuple[str, List[str], List[str], List[str], List[str]]:
+        """
+        Rewrite text and record what was found along the way.
+        Returns (neutralized, changes, gendered_terms, age_matches, demographic_matches).
+        """
+        changes = []
+        
+        # Replace gendered terms in a single scan
+        found_terms = set()
+        
+        def replace_term(m):
+            term = m.group(0).lower()
+            found_terms.add(term)
+            return BiasDetector.GENDERED_TERMS[term]
+        
+        neutralized = BiasDetector._GENDERED_RE.sub(replace_term, text)
+        gendered_terms = [term for term in BiasDetector.GENDERED_TERMS if term in found_terms]
+        for term in gendered_terms:
+            changes.append(f"Replaced '{term}' → '{BiasDetector.GENDERED_TERMS[term]}'")
+        
+        # Redact age and demographic indicators in a single scan
+        age_found, demo_found = [], []
+        
+        def redact(m):
+            (age_found if m.lastgroup == "age" else demo_found).append(m.group(0))
+            return "[REDACTED]"
+        
+        neutralized = BiasDetector._INDICATOR_RE.sub(redact, neutralized)
+        if age_found:
+            changes.append(f"Redacted age information: {age_found}")
+        if demo_found:
+            changes.append(f"Redacted demographic info: {demo_found}")
+        
+        return neutralized, changes, gendered_terms, age_found, demo_found
+    
+    @staticmethod
+    def _build_analysis(gendered_terms: List[str], age_found: List[str],
+                        demo_found: List[str], text: str) -> Dict[str, Any]:
+        """Assemble the analysis payload from the indicators found in text."""
         flags = []
         
-        # Check gendered terms
-        gendered_found = []
-        for term in BiasDetector.GENDERED_TERMS:
-            if term in text_lower:
-                gendered_found.append({
-                    "term": term,
-                    "replacement": BiasDetector.GENDERED_TERMS[term],
-                    "type": "gendered_language",
-                })
-        
-        if gendered_found:
+        if gendered_terms:
             flags.append({
                 "category": "gendered_language",
                 "severity": "medium",
-                "count": len(gendered_found),
-                "details": gendered_found,
+                "count": len(gendered_terms),
+                "details": [
+                    {
+                        "term": term,
+                        "replacement": BiasDetector.GENDERED_TERMS[term],
+                        "type": "gendered_language",
+                    }
+                    for term in gendered_terms
+                ],
             })
         
-        # Check age indicators
-        age_found = []
-        for pattern in BiasDetector.AGE_PATTERNS:
-            matches = re.findall(pattern, text_lower)
-            age_found.extend(matches)
-        
         if age_found:
             flags.append({
                 "category": "age_indicators",
@@ -120,12 +221,6 @@ class BiasDetector:
                 "details": age_found,
             })
         
-        # Check demographic indicators
-        demo_found = []
-        for pattern in BiasDetector.DEMOGRAPHIC_PATTERNS:
-            matches = re.findall(pattern, text_lower)
-            demo_found.extend(matches)
-        
         if demo_found:
             flags.append({
                 "category": "demographic_information",
@@ -135,7 +230,7 @@ class BiasDetector:
             })
         
         # Analyze pronoun distribution
-        pronoun_analysis = BiasDetector._analyze_pronouns(text_lower)
+        pronoun_analysis = BiasDetector._analyze_pronouns(text)
         
         return {
             "has_bias_indicators": len(flags) > 0,
@@ -145,54 +240,15 @@ class BiasDetector:
             "risk_level": BiasDetector._calculate_risk_level(flags),
         }
     
-    @staticmethod
-    def neutralize(text: str) -> Tuple[str, List[str]]:
-        """
-        Neutralize biased language in text.
-        
-        Args:
-            text: Raw text to neutralize.
-        
-        Returns:
-            Tuple of (neutralized_text, list_of_changes_made).
-        """
-        changes = []
-        neutralized = text
-        
-        # Replace gendered terms
-        for term, replacement in BiasDetector.GENDERED_TERMS.items():
-            pattern = re.compile(re.escape(term), re.IGNORECASE)
-            if pattern.search(neutralized):
-                neutralized = pattern.sub(replacement, neutralized)
-                changes.append(f"Replaced '{term}' → '{replacement}'")
-        
-        # Remove age indicators
-        for pattern in BiasDetector.AGE_PATTERNS:
-            matches = re.findall(pattern, neutralized, re.IGNORECASE)
-            if matches:
-                neutralized = re.sub(pattern, "[REDACTED]", neutralized, flags=re.IGNORECASE)
-                changes.append(f"Redacted age information: {matches}")
-        
-        # Remove demographic information
-        for pattern in BiasDetector.DEMOGRAPHIC_PATTERNS:
-            matches = re.findall(pattern, neutralized, re.IGNORECASE)
-            if matches:
-                neutralized = re.sub(pattern, "[REDACTED]", neutralized, flags=re.IGNORECASE)
-                changes.append(f"Redacted demographic info: {matches}")
-        
-        return neutralized, changes
-    
     @staticmethod
     def _analyze_pronouns(text: str) -> Dict[str, Any]:
-        """Analyze pronoun distribution in text."""
-        masc_count = sum(
-            len(re.findall(p, text))
-            for p in BiasDetector.PRONOUN_PATTERNS["masculine"]
-        )
-        fem_count = sum(
-            len(re.findall(p, text))
-            for p in BiasDetector.PRONOUN_PATTERNS["feminine"]
-        )
+        """Analyze pronoun distribution in text (one case-insensitive scan)."""
+        masc_count = fem_count = 0
+        for word in BiasDetector._PRONOUN_RE.findall(text):
+            if BiasDetector.PRONOUNS[word.lower()] == "masculine":
+                masc_count += 1
+            else:
+                fem_count += 1
         
         total = masc_count + fem_count
         
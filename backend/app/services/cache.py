@@ -0,0 +1,102 @@
+"""
+RSA MVP Enhanced — Cache Service
+==================================
+Small JSON cache on top of Redis (REDIS_URL), serialized with the same
+encoder as API responses (numpy values, non-string keys).
+Degrades to a no-op when Redis is unreachable so the API keeps working
+without it, retrying the connection after a short cooldown.
+"""
+
+import logging
+import time
+from typing import Any, Optional
+
+from app.config import settings
+from app.utils.responses import json_bytes, json_loads
+
+logger = logging.getLogger(__name__)
+
+# Seconds to skip Redis after a connection failure before trying again
+RETRY_COOLDOWN = 30.0
+
+_client = None
+_disabled_until = 0.0
+
+
+def _get_client():
+    """Lazily create the Redis client; returns None while Redis is unavailable."""
+    global _client
+    if time.monotonic() < _disabled_until:
+        return None
+    if _client is None:
+        try:
+            import redis
+        except ImportError:
+            logger.warning("⚠️ redis package not installed — caching disabled")
+            _mark_unavailable()
+            return None
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_connect_timeout=0.25,
+            socket_timeout=0.25,
+            decode_responses=True,
+        )
+    return _client
+
+
+def _mark_unavailable(error: Exception = None):
+    global _disabled_until
+    if error is not None:
+        logger.warning(f"⚠️ Redis unavailable, caching paused for {RETRY_COOLDOWN:.0f}s: {error}")
+    _disabled_until = time.monotonic() + RETRY_COOLDOWN
+
+
+class CacheService:
+    """Best-effort JSON cache. Every method swallows Redis errors."""
+
+    @staticmethod
+    def ping() -> bool:
+        """Open the Redis connection and check it responds (used to warm up at startup)."""
+        client = _get_client()
+        if client is None:
+            return False
+        try:
+            return bool(client.ping())
+        except Exception as e:
+            _mark_unavailable(e)
+            return False
+
+    @staticmethod
+    def get_json(key: str) -> Optional[Any]:
+        """Return the cached value for `key`, or None on a miss or Redis error."""
+        client = _get_client()
+        if client is None:
+            return None
+        try:
+            raw = client.get(key)
+        except Exception as e:
+            _mark_unavailable(e)
+            return None
+        return json_loads(raw) if raw is not None else None
+
+    @staticmethod
+    def set_json(key: str, value: Any, ttl: int) -> None:
+        """Store `value` as JSON under `key` for `ttl` seconds."""
+        client = _get_client()
+        if client is None:
+            return
+        try:
+            client.setex(key, ttl, json_bytes(value))
+        except Exception as e:
+            _mark_unavailable(e)
+
+    @staticmethod
+    def delete(*keys: str) -> None:
+        """Remove `keys` from the cache."""
+        client = _get_client()
+        if client is None or not keys:
+            return
+        try:
+            client.delete(*keys)
+        except Exception as e:
+            _mark_unavailable(e)
@@ -8,10 +8,78 @@ and qualifications from raw text into structured JSON.
 import json
 import logging
 import re
+from bisect import bisect_right
+from functools import lru_cache
 from typing import Dict, Any, Optional
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 logger = logging.getLogger(__name__)
 
+RESUME_PROMPT = """
+            Analyze the following resume text and extract structured information.
+            Return a JSON object with these fields:
+            - summary: A 2-3 sentence professional summary
+            - skills: Array of technical and soft skills
+            - experience: Array of objects with {{title, company, duration, description}}
+            - education: Array of objects with {{degree, institution, year}}
+            - certifications: Array of certification names
+            - total_experience_years: Estimated total years of experience (number)
+            
+            Resume Text:
+            {resume_text}
+            
+            Return ONLY valid JSON, no other text:
+            """
+
+JD_PROMPT = """
+            Analyze the following job description and extract structured information.
+            Return a JSON object with these fields:
+            - summary: A brief summary of the role
+            - required_skills: Array of required technical skills
+            - preferred_skills: Array of preferred/nice-to-have skills
+            - responsibilities: Array of key responsibilities
+            - experience_range: Expected experience range (e.g., "3-5 years")
+            - education_requirements: Required education level
+            - benefits: Array of benefits mentioned
+            
+            Job Description:
+            {jd_text}
+            
+            Return ONLY valid JSON, no other text:
+            """
+
+
+def _build_llm_chain(input_variable: str, template: str):
+    """Assemble a HuggingFaceHub-backed LLMChain for the given prompt."""
+    from langchain.prompts import PromptTemplate
+    from langchain.chains import LLMChain
+    from langchain_community.llms import HuggingFaceHub
+    from app.config import settings
+    
+    llm = HuggingFaceHub(
+        repo_id="google/flan-t5-large",
+        huggingfacehub_api_token=settings.HUGGINGFACE_API_TOKEN,
+        model_kwargs={"temperature": 0.1, "max_length": 1024}
+    )
+    prompt_template = PromptTemplate(input_variables=[input_variable], template=template)
+    return LLMChain(llm=llm, prompt=prompt_template)
+
+
+# Chains are built on first use and reused for every later document,
+# instead of constructing the prompt, client and chain per resume/JD
+@lru_cache(maxsize=1)
+def _resume_chain():
+    return _build_llm_chain("resume_text", RESUME_PROMPT)
+
+
+@lru_cache(maxsize=1)
+def _jd_chain():
+    return _build_llm_chain("jd_text", JD_PROMPT)
+
 
 class ResumeCompressor:
     """
@@ -41,6 +109,29 @@ class ResumeCompressor:
         "university", "college", "institute", "school", "degree",
     }
     
+    CERT_KEYWORDS = {
+        "certified", "certification", "certificate", "aws", "azure", "gcp",
+        "pmp", "scrum master", "cissp", "comptia",
+    }
+    
+    # Compiled once at import rather than looked up in re's cache per call
+    _EXPERIENCE_YEARS_RES = [
+        re.compile(p, re.IGNORECASE) for p in (
+            r'(\d+)\+?\s*years?\s*(?:of\s+)?(?:experience|exp)',
+            r'experience\s*:?\s*(\d+)\+?\s*years?',
+            r'(\d+)\+?\s*years?\s+(?:in|of)\s+(?:software|development|engineering)',
+        )
+    ]
+    _DEGREE_RE = re.compile(
+        r'(bachelor|master|phd|doctorate|mba|b\.?tech|m\.?tech|b\.?sc|m\.?sc|b\.?e|m\.?e|diploma)'
+    )
+    _DATE_RE = re.compile(
+        r'((?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\w*\s+\d{4}|'
+        r'\d{4}\s*[-–]\s*(?:\d{4}|present|current))',
+        re.IGNORECASE
+    )
+    _YEAR_RE = re.compile(r'(19|20)\d{2}')
+    
     @staticmethod
     def compress_resume(text: str, use_llm: bool = False) -> Dict[str, Any]:
         """
@@ -64,37 +155,7 @@ class ResumeCompressor:
     @staticmethod
     def _compress_with_langchain(text: str) -> Dict[str, Any]:
         """Use LangChain to extract structured data from resume text."""
-        from langchain.prompts import PromptTemplate
-        from langchain.chains import LLMChain
-        from langchain_community.llms import HuggingFaceHub
-        from app.config import settings
-        
-        prompt_template = PromptTemplate(
-            input_variables=["resume_text"],
-            template="""
-            Analyze the following resume text and extract structured information.
-            Return a JSON object with these fields:
-            - summary: A 2-3 sentence professional summary
-            - skills: Array of technical and soft skills
-            - experience: Array of objects with {{title, company, duration, description}}
-            - education: Array of objects with {{degree, institution, year}}
-            - certifications: Array of certification names
-            - total_experience_years: Estimated total years of experience (number)
-            
-            Resume Text:
-            {resume_text}
-            
-            Return ONLY valid JSON, no other text:
-            """
-        )
-        
-        llm = HuggingFaceHub(
-            repo_id="google/flan-t5-large",
-            huggingfacehub_api_token=settings.HUGGINGFACE_API_TOKEN,
-            model_kwargs={"temperature": 0.1, "max_length": 1024}
-        )
-        
-        chain = LLMChain(llm=llm, prompt=prompt_template)
+        chain = _resume_chain()
         result = chain.run(resume_text=text[:3000])  # Limit input length
         
         try:
@@ -113,10 +174,7 @@ class ResumeCompressor:
         lines = text.strip().split("\n")
         
         # Extract skills
-        found_skills = []
-        for skill in ResumeCompressor.TECH_SKILLS:
-            if skill.lower() in text_lower:
-                found_skills.append(skill.title() if len(skill) > 3 else skill.upper())
+        found_skills = _extract_skills(text_lower)
         
         # Extract experience years
         experience_years = ResumeCompressor._extract_experience_years(text)
@@ -151,15 +209,9 @@ class ResumeCompressor:
     @staticmethod
     def _extract_experience_years(text: str) -> float:
         """Extract total years of experience from text."""
-        patterns = [
-            r'(\d+)\+?\s*years?\s*(?:of\s+)?(?:experience|exp)',
-            r'experience\s*:?\s*(\d+)\+?\s*years?',
-            r'(\d+)\+?\s*years?\s+(?:in|of)\s+(?:software|development|engineering)',
-        ]
-        
         max_years = 0.0
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in ResumeCompressor._EXPERIENCE_YEARS_RES:
+            matches = pattern.findall(text)
             for match in matches:
                 try:
                     years = float(match)
@@ -174,21 +226,27 @@ class ResumeCompressor:
         """Extract education entries from text."""
         education = []
         lines = text.split("\n")
-        
-        for i, line in enumerate(lines):
-            line_lower = line.lower().strip()
-            if any(kw in line_lower for kw in ResumeCompressor.EDUCATION_KEYWORDS):
-                # Look for degree-like patterns
-                degree_match = re.search(
-                    r'(bachelor|master|phd|doctorate|mba|b\.?tech|m\.?tech|b\.?sc|m\.?sc|b\.?e|m\.?e|diploma)',
-                    line_lower
-                )
-                if degree_match:
-                    education.append({
-                        "degree": line.strip(),
-                        "institution": lines[i + 1].strip() if i + 1 < len(lines) else "",
-                        "year": ResumeCompressor._extract_year_from_line(line),
-                    })
+        text_lower = text.lower()
+        line_starts = _line_starts(text_lower)
+        
+        # Lines holding an education keyword, found by one scan of the whole
+        # text; only those are then checked for a degree-like pattern
+        keyword_lines = sorted({
+            bisect_right(line_starts, start) - 1
+            for start, _ in _iter_keyword_hits(text_lower, "education")
+        })
+        line_starts.append(len(text_lower) + 1)
+        
+        for i in keyword_lines:
+            degree_match = ResumeCompressor._DEGREE_RE.search(text_lower, line_starts[i], line_starts[i + 1] - 1)
+            if not degree_match:
+                continue
+            line = lines[i]
+            education.append({
+                "degree": line.strip(),
+                "institution": lines[i + 1].strip() if i + 1 < len(lines) else "",
+                "year": ResumeCompressor._extract_year_from_line(line),
+            })
         
         return education if education else [{"degree": "Not specified", "institution": "", "year": ""}]
     
@@ -209,12 +267,7 @@ class ResumeCompressor:
                 continue
             
             # Detect date patterns (indicative of experience entries)
-            date_match = re.search(
-                r'((?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\w*\s+\d{4}|'
-                r'\d{4}\s*[-–]\s*(?:\d{4}|present|current))',
-                line_stripped,
-                re.IGNORECASE
-            )
+            date_match = ResumeCompressor._DATE_RE.search(line_stripped)
             
             if date_match:
                 if current_entry:
@@ -239,16 +292,17 @@ class ResumeCompressor:
     @staticmethod
     def _extract_certifications(text: str) -> list:
         """Extract certifications from text."""
-        cert_keywords = ["certified", "certification", "certificate", "aws", "azure", "gcp", 
-                         "pmp", "scrum master", "cissp", "comptia"]
-        certs = []
+        lines = text.split("\n")
+        text_lower = text.lower()
+        line_starts = _line_starts(text_lower)
         
-        for line in text.split("\n"):
-            line_lower = line.lower().strip()
-            if any(kw in line_lower for kw in cert_keywords) and len(line.strip()) < 200:
-                certs.append(line.strip())
+        cert_lines = sorted({
+            bisect_right(line_starts, start) - 1
+            for start, _ in _iter_keyword_hits(text_lower, "certifications")
+        })
+        certs = [lines[i].strip() for i in cert_lines]
         
-        return certs[:10]
+        return [cert for cert in certs if len(cert) < 200][:10]
     
     @staticmethod
     def _generate_summary(text: str, skills: list, years: float) -> str:
@@ -264,15 +318,104 @@ class ResumeCompressor:
     @staticmethod
     def _extract_year_from_line(line: str) -> str:
         """Extract a 4-digit year from a line of text."""
-        match = re.search(r'(19|20)\d{2}', line)
+        match = ResumeCompressor._YEAR_RE.search(line)
         return match.group() if match else ""
 
 
+# Keyword sets scanned in the lowercased text
+KEYWORD_SETS = {
+    "skills": ResumeCompressor.TECH_SKILLS,
+    "education": ResumeCompressor.EDUCATION_KEYWORDS,
+    "certifications": ResumeCompressor.CERT_KEYWORDS,
+}
+
+# Sets whose keywords only count with no letter directly before or after:
+# "r" in "engineer", "go" in "good" or "aws" in "laws" are not hits.
+# Education stays a plain substring match so "Bachelors"/"Masters" still count.
+WHOLE_WORD_CATEGORIES = {"skills", "certifications"}
+
+
+def _build_keyword_automata() -> Dict[str, Any]:
+    """
+    One Aho-Corasick automaton per keyword set, built once at import, so a
+    single scan of the text finds every keyword (overlaps included) instead
+    of one substring search per keyword. Empty when pyahocorasick is missing.
+    """
+    if ahocorasick is None:
+        return {}
+    automata = {}
+    for category, keywords in KEYWORD_SETS.items():
+        automaton = ahocorasick.Automaton()
+        for keyword in keywords:
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        automata[category] = automaton
+    return automata
+
+
+_KEYWORD_AUTOMATA = _build_keyword_automata()
+
+
+def _is_whole_word(text: str, start: int, end: int) -> bool:
+    """Whether text[start:end] has no letter directly before or after it."""
+    return (start == 0 or not text[start - 1].isalpha()) and \
+        (end == len(text) or not text[end].isalpha())
+
+
+def _iter_keyword_hits(text_lower: str, category: str):
+    """Yield (start, keyword) for every hit of a `category` keyword in `text_lower`."""
+    whole_word = category in WHOLE_WORD_CATEGORIES
+    automaton = _KEYWORD_AUTOMATA.get(category)
+    if automaton is not None:
+        for end, kw in automaton.iter(text_lower):
+            start = end - len(kw) + 1
+            if not whole_word or _is_whole_word(text_lower, start, end + 1):
+                yield start, kw
+        return
+    
+    # Without pyahocorasick: one substring search per keyword
+    for kw in KEYWORD_SETS[category]:
+        start = text_lower.find(kw)
+        while start != -1:
+            if not whole_word or _is_whole_word(text_lower, start, start + len(kw)):
+                yield start, kw
+            start = text_lower.find(kw, start + 1)
+
+
+def _keywords_in(text_lower: str, category: str) -> set:
+    """Keywords of `category` occurring in `text_lower`."""
+    return {kw for _, kw in _iter_keyword_hits(text_lower, category)}
+
+
+def _line_starts(text: str) -> list:
+    """Offsets at which each line of text begins, for bisecting a match position to its line."""
+    starts = [0]
+    pos = text.find("\n")
+    while pos != -1:
+        starts.append(pos + 1)
+        pos = text.find("\n", pos + 1)
+    return starts
+
+
+def _extract_skills(text_lower: str) -> list:
+    """Display names of the TECH_SKILLS found in the text."""
+    hits = _keywords_in(text_lower, "skills")
+    return [
+        skill.title() if len(skill) > 3 else skill.upper()
+        for skill in ResumeCompressor.TECH_SKILLS
+        if skill in hits
+    ]
+
+
 class JDCompressor:
     """
     Compresses job description text into a structured JSON format.
     """
     
+    _EXPERIENCE_RANGE_RE = re.compile(r'(\d+)\s*[-–to]+\s*(\d+)\s*years?', re.IGNORECASE)
+    _EXPERIENCE_SINGLE_RE = re.compile(r'(\d+)\+?\s*years?', re.IGNORECASE)
+    _NUMBERED_ITEM_RE = re.compile(r'^\d+[.)]\s')
+    
     @staticmethod
     def compress_jd(text: str, use_llm: bool = False) -> Dict[str, Any]:
         """
@@ -296,38 +439,7 @@ class JDCompressor:
     @staticmethod
     def _compress_with_langchain(text: str) -> Dict[str, Any]:
         """Use LangChain to extract structured data from JD text."""
-        from langchain.prompts import PromptTemplate
-        from langchain.chains import LLMChain
-        from langchain_community.llms import HuggingFaceHub
-        from app.config import settings
-        
-        prompt_template = PromptTemplate(
-            input_variables=["jd_text"],
-            template="""
-            Analyze the following job description and extract structured information.
-            Return a JSON object with these fields:
-            - summary: A brief summary of the role
-            - required_skills: Array of required technical skills
-            - preferred_skills: Array of preferred/nice-to-have skills
-            - responsibilities: Array of key responsibilities
-            - experience_range: Expected experience range (e.g., "3-5 years")
-            - education_requirements: Required education level
-            - benefits: Array of benefits mentioned
-            
-            Job Description:
-            {jd_text}
-            
-            Return ONLY valid JSON, no other text:
-            """
-        )
-        
-        llm = HuggingFaceHub(
-            repo_id="google/flan-t5-large",
-            huggingfacehub_api_token=settings.HUGGINGFACE_API_TOKEN,
-            model_kwargs={"temperature": 0.1, "max_length": 1024}
-        )
-        
-        chain = LLMChain(llm=llm, prompt=prompt_template)
+        chain = _jd_chain()
         result = chain.run(jd_text=text[:3000])
         
         try:
@@ -341,10 +453,7 @@ class JDCompressor:
         text_lower = text.lower()
         
         # Extract skills from JD
-        found_skills = []
-        for skill in ResumeCompressor.TECH_SKILLS:
-            if skill.lower() in text_lower:
-                found_skills.append(skill.title() if len(skill) > 3 else skill.upper())
+        found_skills = _extract_skills(text_lower)
         
         # Split into required vs preferred
         required_marker = text_lower.find("required")
@@ -355,10 +464,10 @@ class JDCompressor:
         preferred_skills = found_skills[len(found_skills)//2 + 1:] if found_skills else []
         
         # Extract experience range
-        exp_match = re.search(r'(\d+)\s*[-–to]+\s*(\d+)\s*years?', text, re.IGNORECASE)
+        exp_match = JDCompressor._EXPERIENCE_RANGE_RE.search(text)
         exp_range = f"{exp_match.group(1)}-{exp_match.group(2)} years" if exp_match else ""
         if not exp_range:
-            exp_single = re.search(r'(\d+)\+?\s*years?', text, re.IGNORECASE)
+            exp_single = JDCompressor._EXPERIENCE_SINGLE_RE.search(text)
             exp_range = f"{exp_single.group(1)}+ years" if exp_single else "Not specified"
         
         # Extract education
@@ -376,7 +485,7 @@ class JDCompressor:
         responsibilities = []
         for line in text.split("\n"):
             line_stripped = line.strip()
-            if line_stripped and (line_stripped[0] in "-•●" or re.match(r'^\d+[.)]\s', line_stripped)):
+            if line_stripped and (line_stripped[0] in "-•●" or JDCompressor._NUMBERED_ITEM_RE.match(line_stripped)):
                 responsibilities.append(line_stripped.lstrip("-•●0123456789.) "))
         
         # Generate summary
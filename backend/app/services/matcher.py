@@ -9,29 +9,141 @@ and multi-dimensional scoring.
 import numpy as np
 import pickle
 import logging
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Future
 from typing import Dict, List, Any, Optional, Tuple
-from scipy.spatial.distance import cosine
+
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
 # Global model cache
 _embedding_model = None
 
+# Stored embeddings are unit vectors quantized to int8: value = round(x * 127)
+EMBEDDING_SCALE = 127
+
+# Embedding requests from concurrent tasks are encoded together: up to this
+# many texts per model call, waiting at most this long for a batch to fill
+EMBEDDING_BATCH_SIZE = 16
+EMBEDDING_BATCH_WAIT = 0.05
+
+# Patterns used while scoring every candidate/job pair, compiled once
+_EXPERIENCE_RANGE_RE = re.compile(r'(\d+)\s*[-–to]+\s*(\d+)')
+_EXPERIENCE_MIN_RE = re.compile(r'(\d+)\+?')
+_YEAR_RE = re.compile(r'(19|20)\d{2}')
+
+# Score dimensions in the column order used for batch scoring: (name, weight key)
+MATCH_COMPONENTS = (
+    ("skill", "skill_weight"),
+    ("experience", "experience_weight"),
+    ("education", "education_weight"),
+    ("title", "title_weight"),
+    ("stability", "stability_weight"),
+    ("growth", "growth_weight"),
+    ("semantic", "semantic_weight"),
+)
+
+DEFAULT_MATCH_WEIGHTS = {
+    "skill_weight": 0.35,
+    "experience_weight": 0.20,
+    "education_weight": 0.10,
+    "title_weight": 0.15,
+    "stability_weight": 0.10,
+    "growth_weight": 0.10,
+    "semantic_weight": 0.0,
+}
+
 
 def get_embedding_model():
-    """Lazy-load the sentence-transformer model (cached after first load)."""
+    """
+    Lazy-load the sentence-transformer model (cached after first load).
+    With EMBEDDING_BACKEND=onnx the int8-quantized ONNX export is run on
+    ONNX Runtime instead of PyTorch; if that can't load (needs
+    sentence-transformers>=3.2 with optimum/onnxruntime) it falls back to torch.
+    """
     global _embedding_model
     if _embedding_model is None:
         try:
             from sentence_transformers import SentenceTransformer
-            _embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
-            logger.info("Loaded sentence-transformer model: all-MiniLM-L6-v2")
+            if settings.EMBEDDING_BACKEND == "onnx":
+                try:
+                    _embedding_model = SentenceTransformer(
+                        settings.EMBEDDING_MODEL,
+                        backend="onnx",
+                        model_kwargs={"file_name": settings.EMBEDDING_ONNX_FILE},
+                    )
+                    logger.info(f"Loaded ONNX embedding model: {settings.EMBEDDING_MODEL} ({settings.EMBEDDING_ONNX_FILE})")
+                except Exception as e:
+                    logger.warning(f"⚠️ ONNX embedding backend unavailable, using torch: {e}")
+            if _embedding_model is None:
+                _embedding_model = SentenceTransformer(settings.EMBEDDING_MODEL)
+                logger.info(f"Loaded sentence-transformer model: {settings.EMBEDDING_MODEL}")
         except Exception as e:
             logger.error(f"Failed to load embedding model: {e}")
             raise
     return _embedding_model
 
 
+class EmbeddingBatcher:
+    """
+    Coalesces embedding requests from concurrently running background tasks
+    into batched model.encode() calls, so the transformer runs on a batch
+    instead of one text at a time. embed() blocks until its batch is done.
+    """
+    
+    def __init__(self, max_batch: int = EMBEDDING_BATCH_SIZE, max_wait: float = EMBEDDING_BATCH_WAIT):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+    
+    def embed(self, text: str) -> bytes:
+        """Embed one text as part of the next batch."""
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((text, future))
+        return future.result()
+    
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._worker.start()
+    
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            try:
+                embeddings = MatchingEngine.generate_embeddings([text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
+
+
+# Shared by resume and JD processing in this process
+embedding_batcher = EmbeddingBatcher()
+
+
 class MatchingEngine:
     """
     Multi-dimensional matching engine that combines:
@@ -58,7 +170,42 @@ class MatchingEngine:
         # Truncate to model's max length
         truncated = text[:512]
         embedding = model.encode(truncated)
-        return pickle.dumps(embedding)
+        return MatchingEngine.serialize_embedding(embedding)
+    
+    @staticmethod
+    def generate_embeddings(texts: List[str]) -> List[bytes]:
+        """Embed several texts in one batched model call; same output as generate_embedding per text."""
+        model = get_embedding_model()
+        vectors = model.encode([text[:512] for text in texts], batch_size=EMBEDDING_BATCH_SIZE)
+        return [MatchingEngine.serialize_embedding(vec) for vec in vectors]
+    
+    @staticmethod
+    def serialize_embedding(vector) -> bytes:
+        """
+        L2-normalize a vector and quantize it to int8 (scale 127), so a
+        384-d embedding is stored in 384 bytes instead of 1536.
+        """
+        vec = np.asarray(vector, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vec)
+        if norm > 0:
+            vec = vec / norm
+        return np.clip(np.round(vec * EMBEDDING_SCALE), -EMBEDDING_SCALE, EMBEDDING_SCALE).astype(np.int8).tobytes()
+    
+    @staticmethod
+    def _load_embedding(blob: bytes) -> np.ndarray:
+        """Raw stored vector: int8 for quantized rows, float32 for legacy pickles."""
+        if blob[:1] == b"\x80":
+            # Legacy pickled numpy array (quantized values never reach -128)
+            return np.asarray(pickle.loads(blob), dtype=np.float32).ravel()
+        return np.frombuffer(blob, dtype=np.int8)
+    
+    @staticmethod
+    def deserialize_embedding(blob: bytes) -> np.ndarray:
+        """Load a stored embedding as a float32 vector."""
+        vec = MatchingEngine._load_embedding(blob)
+        if vec.dtype == np.int8:
+            return vec.astype(np.float32) / EMBEDDING_SCALE
+        return vec
     
     @staticmethod
     def compute_cosine_similarity(embedding_a: bytes, embedding_b: bytes) -> float:
@@ -66,14 +213,65 @@ class MatchingEngine:
         Compute cosine similarity between two serialized embeddings.
         
         Returns:
-            Similarity score between 0.0 and 1.0.
+            Similarity score between 0.0 and 1.0; the neutral 0.5 used by
+            compute_match_batch when it is undefined (dimension mismatch, zero norm).
+        """
+        scores = MatchingEngine.compute_semantic_scores([embedding_a], embedding_b)
+        return scores[0] if scores[0] is not None else 0.5
+    
+    @staticmethod
+    def compute_semantic_scores(
+        candidate_embeddings: List[Optional[bytes]],
+        job_embedding: Optional[bytes],
+    ) -> List[Optional[float]]:
         """
-        vec_a = pickle.loads(embedding_a)
-        vec_b = pickle.loads(embedding_b)
+        Score many candidate embeddings against one job embedding with a
+        single matrix-vector product instead of a Python loop of pairwise calls.
         
-        # cosine() returns distance, not similarity
-        similarity = 1.0 - cosine(vec_a, vec_b)
-        return max(0.0, min(1.0, similarity))
+        Returns:
+            One similarity in [0, 1] per candidate, or None where the candidate
+            has no usable embedding.
+        """
+        scores: List[Optional[float]] = [None] * len(candidate_embeddings)
+        if not job_embedding:
+            return scores
+        
+        job_vec = MatchingEngine._load_embedding(job_embedding).astype(np.float32)
+        job_norm = np.linalg.norm(job_vec)
+        if job_norm == 0:
+            return scores
+        job_vec = job_vec / job_norm
+        
+        # Quantized rows are decoded with one frombuffer over the joined
+        # blobs rather than one array per candidate. Dividing by each row's
+        # norm makes the quantization scale irrelevant, so legacy float rows
+        # (decoded individually) mix in safely
+        dim = job_vec.shape[0]
+        rows, blobs, legacy_rows, legacy = [], [], [], []
+        for i, blob in enumerate(candidate_embeddings):
+            if not blob:
+                continue
+            if blob[:1] == b"\x80":
+                vec = MatchingEngine._load_embedding(blob)
+                if vec.shape == job_vec.shape:
+                    legacy_rows.append(i)
+                    legacy.append(vec)
+            elif len(blob) == dim:
+                rows.append(i)
+                blobs.append(blob)
+        if not blobs and not legacy:
+            return scores
+        
+        matrix = np.frombuffer(b"".join(blobs), dtype=np.int8).reshape(len(blobs), dim).astype(np.float32)
+        if legacy:
+            matrix = np.vstack([matrix] + legacy)
+            rows += legacy_rows
+        norms = np.linalg.norm(matrix, axis=1)
+        norms[norms == 0] = 1.0
+        similarities = np.clip((matrix @ job_vec) / norms, 0.0, 1.0)
+        for i, similarity in zip(rows, similarities):
+            scores[i] = float(similarity)
+        return scores
     
     @staticmethod
     def compute_skill_score(
@@ -89,26 +287,38 @@ class MatchingEngine:
         Returns:
             Tuple of (score, breakdown_dict)
         """
-        if not required_skills:
+        return MatchingEngine._skill_score(
+            MatchingEngine.normalize_skills(candidate_skills),
+            MatchingEngine.normalize_skills(required_skills),
+            MatchingEngine.normalize_skills(preferred_skills),
+        )
+    
+    @staticmethod
+    def normalize_skills(skills: Optional[List[str]]) -> frozenset:
+        """Lowercased, stripped skill set used for comparison."""
+        return frozenset(s.lower().strip() for s in (skills or []))
+    
+    @staticmethod
+    def _skill_score(
+        candidate_lower: frozenset,
+        required_lower: frozenset,
+        preferred_lower: frozenset,
+    ) -> Tuple[float, Dict[str, Any]]:
+        """compute_skill_score on already-normalized sets, so batch scoring
+        normalizes the job's skills once rather than per candidate."""
+        if not required_lower:
             return 0.5, {"matched": [], "missing": [], "extra": []}
         
-        # Normalize skills to lowercase for comparison
-        candidate_lower = {s.lower().strip() for s in (candidate_skills or [])}
-        required_lower = {s.lower().strip() for s in required_skills}
-        preferred_lower = {s.lower().strip() for s in (preferred_skills or [])}
-        
         # Exact + fuzzy matching
         matched_required = candidate_lower & required_lower
         missing_required = required_lower - candidate_lower
         
         # Fuzzy matching for partial matches
-        fuzzy_matches = set()
-        for cs in candidate_lower:
-            for rs in missing_required.copy():
-                if cs in rs or rs in cs:
-                    fuzzy_matches.add(rs)
-                    missing_required.discard(rs)
-        
+        fuzzy_matches = {
+            rs for rs in missing_required
+            if any(cs in rs or rs in cs for cs in candidate_lower)
+        }
+        missing_required -= fuzzy_matches
         matched_required |= fuzzy_matches
         
         # Score calculation
@@ -141,11 +351,9 @@ class MatchingEngine:
         Returns:
             Tuple of (score, breakdown_dict)
         """
-        import re
-        
         # Parse job experience range
-        range_match = re.search(r'(\d+)\s*[-–to]+\s*(\d+)', job_experience_range or "")
-        single_match = re.search(r'(\d+)\+?', job_experience_range or "")
+        range_match = _EXPERIENCE_RANGE_RE.search(job_experience_range or "")
+        single_match = _EXPERIENCE_MIN_RE.search(job_experience_range or "")
         
         if range_match:
             min_years = float(range_match.group(1))
@@ -285,14 +493,13 @@ class MatchingEngine:
     @staticmethod
     def _parse_duration_months(duration_str: str) -> int:
         """Helper to parse duration string (e.g. 'Jan 2020 - Present') into months."""
-        import re
         from datetime import datetime
         
         if not duration_str:
             return 0
             
         # Try to find years
-        years = re.findall(r'(19|20)\d{2}', duration_str)
+        years = _YEAR_RE.findall(duration_str)
         if len(years) >= 2:
             return (int(years[1]) - int(years[0])) * 12
         elif len(years) == 1 and ('present' in duration_str.lower() or 'current' in duration_str.lower()):
@@ -392,41 +599,25 @@ class MatchingEngine:
         return round(score, 4), {"latest_level": current_level, "start_level": initial_level, "status": status}
 
     @staticmethod
-    def compute_match(
+    def _component_scores(
         candidate_data: Dict[str, Any],
         job_data: Dict[str, Any],
-        candidate_embedding: bytes,
-        job_embedding: bytes,
-        config: Dict[str, float] = None
-    ) -> Dict[str, Any]:
+        job_skills: Optional[Tuple[frozenset, frozenset]] = None,
+    ) -> Tuple[List[float], Dict[str, Any]]:
         """
-        Compute the complete multi-dimensional match score.
-        
-        Args:
-            candidate_data: Compressed candidate JSON data.
-            job_data: Compressed job description JSON data.
-            candidate_embedding: Serialized candidate embedding.
-            job_embedding: Serialized job embedding.
-            config: Weight configuration for scoring dimensions.
+        Run the rule-based scorers for one candidate. job_skills holds the
+        job's normalized (required, preferred) sets when already computed.
         
         Returns:
-            Complete scoring result with breakdown.
+            Scores in MATCH_COMPONENTS order (semantic excluded) and the
+            per-dimension breakdown.
         """
-        config = config or {
-            "skill_weight": 0.35,
-            "experience_weight": 0.20,
-            "education_weight": 0.10,
-            "title_weight": 0.15,
-            "stability_weight": 0.10,
-            "growth_weight": 0.10,
-            "semantic_weight": 0.0,
-        }
-        
         # 1. Skill matching
-        skill_score, skill_breakdown = MatchingEngine.compute_skill_score(
-            candidate_data.get("skills", []),
-            job_data.get("required_skills", []),
-            job_data.get("preferred_skills", [])
+        if job_skills is None:
+            job_skills = MatchingEngine._job_skill_sets(job_data)
+        skill_score, skill_breakdown = MatchingEngine._skill_score(
+            MatchingEngine.normalize_skills(candidate_data.get("skills", [])),
+            *job_skills
         )
         
         # 2. Experience matching
@@ -466,43 +657,159 @@ class MatchingEngine:
             candidate_data.get("experience", [])
         )
         
+        scores = [skill_score, exp_score, edu_score, title_score, stability_score, growth_score]
+        breakdown = {
+            "skills": skill_breakdown,
+            "experience": exp_breakdown,
+            "education": edu_breakdown,
+            "title": title_breakdown,
+            "stability": stability_breakdown,
+            "growth": growth_breakdown,
+        }
+        return scores, breakdown
+    
+    @staticmethod
+    def _job_skill_sets(job_data: Dict[str, Any]) -> Tuple[frozenset, frozenset]:
+        """Normalized (required, preferred) skill sets for a job."""
+        return (
+            MatchingEngine.normalize_skills(job_data.get("required_skills", [])),
+            MatchingEngine.normalize_skills(job_data.get("preferred_skills", [])),
+        )
+    
+    @staticmethod
+    def _weight_vector(config: Optional[Dict[str, float]]) -> Tuple[Dict[str, float], np.ndarray]:
+        """Resolve the weight config and lay it out in MATCH_COMPONENTS order."""
+        config = config or DEFAULT_MATCH_WEIGHTS
+        weights = np.array(
+            [config.get(key, DEFAULT_MATCH_WEIGHTS[key]) for _, key in MATCH_COMPONENTS],
+            dtype=np.float64,
+        )
+        return config, weights
+    
+    @staticmethod
+    def _build_result(
+        components: np.ndarray,
+        overall: float,
+        breakdown: Dict[str, Any],
+        config: Dict[str, float],
+    ) -> Dict[str, Any]:
+        """Shape one row of component scores into the compute_match result."""
+        result = {"overall_score": round(float(overall), 4)}
+        for (name, _), score in zip(MATCH_COMPONENTS, components):
+            result[f"{name}_score"] = round(float(score), 4)
+        result["score_breakdown"] = {**breakdown, "weights": config}
+        return result
+    
+    @staticmethod
+    def compute_match(
+        candidate_data: Dict[str, Any],
+        job_data: Dict[str, Any],
+        candidate_embedding: bytes,
+        job_embedding: bytes,
+        config: Dict[str, float] = None,
+        semantic_score: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Compute the complete multi-dimensional match score.
+        
+        Args:
+            candidate_data: Compressed candidate JSON data.
+            job_data: Compressed job description JSON data.
+            candidate_embedding: Serialized candidate embedding.
+            job_embedding: Serialized job embedding.
+            config: Weight configuration for scoring dimensions.
+            semantic_score: Precomputed similarity (see compute_semantic_scores);
+                skips decoding the embeddings again when given.
+        
+        Returns:
+            Complete scoring result with breakdown.
+        """
+        config, weights = MatchingEngine._weight_vector(config)
+        scores, breakdown = MatchingEngine._component_scores(candidate_data, job_data)
+        
         # 7. Semantic similarity
-        semantic_score = 0.5  # Default
-        if candidate_embedding and job_embedding:
+        if semantic_score is None:
+            semantic_score = 0.5  # Default
+            if candidate_embedding and job_embedding:
+                try:
+                    semantic_score = MatchingEngine.compute_cosine_similarity(
+                        candidate_embedding, job_embedding
+                    )
+                except Exception as e:
+                    logger.warning(f"Semantic similarity computation failed: {e}")
+        
+        components = np.array(scores + [semantic_score], dtype=np.float64)
+        return MatchingEngine._build_result(
+            components, components @ weights, breakdown, config
+        )
+    
+    @staticmethod
+    def compute_match_batch(
+        candidates_data: List[Dict[str, Any]],
+        job_data: Dict[str, Any],
+        candidate_embeddings: List[Optional[bytes]],
+        job_embedding: Optional[bytes],
+        config: Dict[str, float] = None,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Score a whole candidate batch against one job.
+        
+        Semantic similarity comes from one matrix-vector product over the
+        stacked embeddings, and the weighted overall scores from one
+        (N, k) @ (k,) product; only the rule-based scorers run per candidate.
+        
+        Returns:
+            One compute_match-shaped result per candidate, or None where
+            scoring that candidate failed.
+        """
+        config, weights = MatchingEngine._weight_vector(config)
+        
+        try:
+            semantic = MatchingEngine.compute_semantic_scores(candidate_embeddings, job_embedding)
+        except Exception as e:
+            logger.warning(f"Batch semantic scoring failed: {e}")
+            semantic = [None] * len(candidates_data)
+        
+        job_skills = MatchingEngine._job_skill_sets(job_data)
+        components = np.empty((len(candidates_data), len(MATCH_COMPONENTS)), dtype=np.float64)
+        breakdowns: List[Optional[Dict[str, Any]]] = []
+        for i, candidate_data in enumerate(candidates_data):
             try:
-                semantic_score = MatchingEngine.compute_cosine_similarity(
-                    candidate_embedding, job_embedding
+                scores, breakdown = MatchingEngine._component_scores(
+                    candidate_data or {}, job_data, job_skills
                 )
             except Exception as e:
-                logger.warning(f"Semantic similarity computation failed: {e}")
-        
-        # Weighted overall score
-        overall = (
-            skill_score * config.get("skill_weight", 0.35) +
-            exp_score * config.get("experience_weight", 0.20) +
-            edu_score * config.get("education_weight", 0.10) +
-            title_score * config.get("title_weight", 0.15) +
-            stability_score * config.get("stability_weight", 0.10) +
-            growth_score * config.get("growth_weight", 0.10) +
-            semantic_score * config.get("semantic_weight", 0.0)
-        )
-        
-        return {
-            "overall_score": round(overall, 4),
-            "skill_score": round(skill_score, 4),
-            "experience_score": round(exp_score, 4),
-            "education_score": round(edu_score, 4),
-            "title_score": round(title_score, 4),
-            "stability_score": round(stability_score, 4),
-            "growth_score": round(growth_score, 4),
-            "semantic_score": round(semantic_score, 4),
-            "score_breakdown": {
-                "skills": skill_breakdown,
-                "experience": exp_breakdown,
-                "education": edu_breakdown,
-                "title": title_breakdown,
-                "stability": stability_breakdown,
-                "growth": growth_breakdown,
-                "weights": config,
-            },
-        }
+                logger.error(f"Scoring failed for batch row {i}: {e}")
+                components[i] = 0.0
+                breakdowns.append(None)
+                continue
+            components[i, :-1] = scores
+            breakdowns.append(breakdown)
+        
+        # Missing embeddings fall back to the same neutral 0.5 as compute_match
+        components[:, -1] = [0.5 if s is None else s for s in semantic]
+        overall = components @ weights
+        
+        return [
+            None if breakdown is None else MatchingEngine._build_result(
+                components[i], overall[i], breakdown, config
+            )
+            for i, breakdown in enumerate(breakdowns)
+        ]
+
+
+def score_candidate_batch(
+    candidates_data: List[Dict[str, Any]],
+    candidate_embeddings: List[Optional[bytes]],
+    job_data: Dict[str, Any],
+    job_embedding: Optional[bytes],
+    config: Dict[str, float] = None,
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    compute_match_batch with the per-batch arguments first, so a partial over
+    the job arguments can be passed to map / executor.map (process pools need
+    a module-level function).
+    """
+    return MatchingEngine.compute_match_batch(
+        candidates_data, job_data, candidate_embeddings, job_embedding, config
+    )
@@ -121,9 +121,11 @@ class FileParser:
         raise ValueError("Could not decode the text file with any supported encoding.")
     
     @staticmethod
-    def validate_file(filename: str, max_size_bytes: int, file_size: int) -> Optional[str]:
+    def validate_file(filename: str, max_size_bytes: int, file_size: Optional[int]) -> Optional[str]:
         """
-        Validate a file before processing.
+        Validate a file before processing. A file_size of None (not reported
+        by the client) skips the size checks; save_upload enforces the cap
+        while reading.
         
         Returns:
             None if valid, error message string if invalid.
@@ -133,6 +135,9 @@ class FileParser:
         if ext not in FileParser.SUPPORTED_EXTENSIONS:
             return f"Unsupported file type '{ext}'. Allowed: {', '.join(FileParser.SUPPORTED_EXTENSIONS)}"
         
+        if file_size is None:
+            return None
+        
         if file_size > max_size_bytes:
             max_mb = max_size_bytes / (1024 * 1024)
             return f"File too large ({file_size / (1024*1024):.1f}MB). Maximum: {max_mb}MB"
@@ -8,7 +8,7 @@ import csv
 import io
 import json
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -17,6 +17,9 @@ logger = logging.getLogger(__name__)
 class ReportGenerator:
     """Generates downloadable reports from match results."""
     
+    # Rows buffered per yielded chunk when streaming CSV
+    CSV_CHUNK_ROWS = 200
+    
     @staticmethod
     def generate_csv(results: List[Dict[str, Any]], job_title: str = "") -> str:
         """
@@ -29,17 +32,39 @@ class ReportGenerator:
         Returns:
             CSV content as a string.
         """
+        return "".join(ReportGenerator.iter_csv(results, job_title))
+    
+    @staticmethod
+    def iter_csv(results: Iterable[Dict[str, Any]], job_title: str = "") -> Iterator[str]:
+        """
+        Generate a CSV report incrementally, yielding the header and then
+        chunks of rows, so large reports never sit in memory as one string.
+        
+        Args:
+            results: Iterable of match result dictionaries (may be a DB cursor).
+            job_title: Title of the job for the report header.
+        
+        Yields:
+            CSV text chunks.
+        """
         output = io.StringIO()
         writer = csv.writer(output)
         
+        def flush() -> str:
+            chunk = output.getvalue()
+            output.seek(0)
+            output.truncate()
+            return chunk
+        
         # Header
         writer.writerow([
             "Rank", "Candidate Name", "Email", "Overall Score",
             "Skill Score", "Experience Score", "Education Score",
             "Semantic Score", "Bias Adjusted", "Skills", "Experience (Years)"
         ])
+        yield flush()
         
-        for result in results:
+        for i, result in enumerate(results, 1):
             writer.writerow([
                 result.get("rank", ""),
                 result.get("candidate_name", "N/A"),
@@ -53,8 +78,12 @@ class ReportGenerator:
                 ", ".join(result.get("candidate_skills", [])),
                 result.get("candidate_experience_years", "N/A"),
             ])
+            if i % ReportGenerator.CSV_CHUNK_ROWS == 0:
+                yield flush()
         
-        return output.getvalue()
+        tail = flush()
+        if tail:
+            yield tail
     
     @staticmethod
     def generate_json_report(
@@ -0,0 +1,49 @@
+"""
+RSA MVP Enhanced — Background Task Dispatch
+=============================================
+Sends resume/JD processing and matching runs to the Celery worker when
+USE_CELERY is enabled, otherwise runs them in-process via FastAPI
+BackgroundTasks after the response is sent. In-process tasks run on a
+dedicated, bounded thread pool so upload bursts can't run unbounded
+parsing/NLP jobs side by side in the API process.
+"""
+
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+from fastapi import BackgroundTasks
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Runs in-process background tasks across all requests. Kept apart from
+# Starlette's AnyIO threadpool, which also serves the sync route handlers
+_executor = ThreadPoolExecutor(
+    max_workers=settings.BACKGROUND_TASK_LIMIT or os.cpu_count() or 1,
+    thread_name_prefix="background-task",
+)
+
+
+async def _run_bounded(local_fn: Callable, *args):
+    """
+    Run a background task on the dedicated executor. Tasks waiting for a
+    free worker are suspended on the event loop, not parked on a threadpool
+    thread, so a burst of uploads can't starve request handling.
+    """
+    await asyncio.wrap_future(_executor.submit(local_fn, *args))
+
+
+def enqueue(background_tasks: BackgroundTasks, task_name: str, local_fn: Callable, *args):
+    """
+    Queue `task_name` from app.tasks.worker on Celery, or `local_fn(*args, DATABASE_URL)`
+    as an in-process background task when Celery is disabled.
+    """
+    if settings.USE_CELERY:
+        from app.tasks import worker
+        getattr(worker, task_name).delay(*args)
+        logger.info(f"📨 Queued {task_name} on Celery")
+        return
+    background_tasks.add_task(_run_bounded, local_fn, *args, settings.DATABASE_URL)
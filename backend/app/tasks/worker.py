@@ -40,6 +40,16 @@ def process_resume_task(self, candidate_id: str, file_path: str):
         self.retry(exc=e, countdown=30)
 
 
+@celery_app.task(bind=True, max_retries=3)
+def process_jd_task(self, job_id: str, file_path: str = None, text: str = None):
+    """Celery task wrapper for job description processing."""
+    try:
+        from app.routers.jobs import process_jd_background
+        process_jd_background(job_id, file_path, text, settings.DATABASE_URL)
+    except Exception as e:
+        self.retry(exc=e, countdown=30)
+
+
 @celery_app.task(bind=True, max_retries=3)
 def run_matching_task(self, session_id: str):
     """Celery task wrapper for matching session."""
@@ -56,29 +66,31 @@ def cleanup_expired_data():
     Periodic task to clean up expired data (GDPR compliance).
     Should be scheduled via celery-beat.
     """
-    from sqlalchemy import create_engine
-    from sqlalchemy.orm import sessionmaker
     from datetime import datetime
+    from app.database import background_session
     from app.models.candidate import Candidate
     from app.models.job import Job
     
-    engine = create_engine(settings.DATABASE_URL)
-    SessionLocal = sessionmaker(bind=engine)
-    db = SessionLocal()
+    db = background_session()
     
     try:
         now = datetime.utcnow()
         
         # Delete expired candidates
         expired_candidates = db.query(Candidate).filter(Candidate.expires_at < now).all()
+        expired_files = {c.file_path for c in expired_candidates if c.file_path}
         for c in expired_candidates:
-            import os
-            if c.file_path and os.path.exists(c.file_path):
-                os.remove(c.file_path)
             db.delete(c)
+        db.flush()
+        
+        # Stored files are shared by identical uploads; keep any still referenced
+        from app.utils.uploads import remove_upload
+        for file_path in expired_files:
+            remove_upload(db, file_path)
         
         # Delete expired jobs
         expired_jobs = db.query(Job).filter(Job.expires_at < now).all()
+        expired_job_ids = [j.id for j in expired_jobs]
         for j in expired_jobs:
             import os
             if j.file_path and os.path.exists(j.file_path):
@@ -86,6 +98,10 @@ def cleanup_expired_data():
             db.delete(j)
         
         db.commit()
+        
+        from app.routers.jobs import job_payload_key
+        from app.services.cache import CacheService
+        CacheService.delete(*[job_payload_key(job_id) for job_id in expired_job_ids])
         return f"Cleaned up {len(expired_candidates)} candidates and {len(expired_jobs)} jobs"
     finally:
         db.close()
@@ -0,0 +1,43 @@
+"""
+RSA MVP Enhanced — Keyset Pagination
+======================================
+Cursor helpers for newest-first lists ordered by (created_at, id).
+A cursor is "<created_at iso>|<id>" of the last row of the previous page,
+so each page is an index range scan instead of an OFFSET walk.
+List bodies keep their shape; the next page's cursor is returned in the
+X-Next-Cursor response header.
+"""
+
+from datetime import datetime
+from typing import Dict, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: Optional[datetime], row_id: str) -> Optional[str]:
+    """Cursor pointing just past the given row (None if it has no timestamp)."""
+    if created_at is None:
+        return None
+    return f"{created_at.isoformat()}|{row_id}"
+
+
+def next_cursor_headers(last_row, has_more: bool) -> Dict[str, str]:
+    """X-Next-Cursor header pointing past `last_row`; empty on the last page."""
+    cursor = encode_cursor(last_row.created_at, last_row.id) if has_more else None
+    return {NEXT_CURSOR_HEADER: cursor} if cursor else {}
+
+
+def keyset_filter(created_col, id_col, cursor: str):
+    """WHERE clause selecting rows that sort after `cursor` in (created_at, id) DESC order."""
+    try:
+        created_at, last_id = cursor.split("|", 1)
+        created_at = datetime.fromisoformat(created_at)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return or_(
+        created_col < created_at,
+        and_(created_col == created_at, id_col < last_id),
+    )
@@ -0,0 +1,35 @@
+"""
+RSA MVP Enhanced — Response Helpers
+=====================================
+JSON response class backed by orjson when it is installed.
+Returning an instance directly from a route also skips FastAPI's
+jsonable_encoder pass, so handlers must pass plain JSON-ready data.
+json_bytes()/json_loads() are the same encoder for other JSON I/O
+(webhook bodies, JSON columns).
+"""
+
+import json
+from typing import Any
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_bytes(content: Any) -> bytes:
+    """Compact UTF-8 JSON bytes, via orjson when installed."""
+    if orjson is None:
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+json_loads = orjson.loads if orjson is not None else json.loads
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that serializes with orjson, falling back to the stdlib encoder."""
+
+    def render(self, content: Any) -> bytes:
+        return json_bytes(content)
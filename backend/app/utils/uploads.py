@@ -0,0 +1,115 @@
+"""
+RSA MVP Enhanced — Upload Helpers
+===================================
+Content-addressed upload storage under UPLOAD_DIR.
+Files are named by the SHA-256 of their bytes, so re-uploading the same
+document reuses the stored copy instead of writing it again.
+Text extracted from an upload is kept gzipped beside it (<file>.txt.gz)
+rather than in the candidates table.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import shutil
+import uuid
+from typing import Optional
+from fastapi import HTTPException, UploadFile
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.candidate import Candidate
+
+logger = logging.getLogger(__name__)
+
+# Hash and copy uploads in 1 MB pieces (Starlette spools uploads over 1 MB
+# to a temp file, so most resumes are a read or two)
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+def save_upload(file: UploadFile) -> str:
+    """
+    Store an upload at UPLOAD_DIR/<sha[:2]>/<sha><ext> and return its path,
+    skipping the write when identical content is already stored. Raises
+    413 past max_upload_bytes and 400 for an empty file; nothing is written
+    in either case.
+    Blocking: call from a sync (threadpool) handler, not on the event loop.
+    """
+    src = file.file
+    src.seek(0)
+    digest = hashlib.sha256()
+    size = 0
+    while chunk := src.read(UPLOAD_CHUNK_BYTES):
+        size += len(chunk)
+        if size > settings.max_upload_bytes:
+            # Only reachable when the client didn't report a size up front
+            raise HTTPException(status_code=413, detail=f"File too large. Maximum: {settings.MAX_UPLOAD_SIZE_MB}MB")
+        digest.update(chunk)
+    if size == 0:
+        raise HTTPException(status_code=400, detail="File is empty.")
+    sha = digest.hexdigest()
+    
+    file_ext = os.path.splitext(file.filename)[1]
+    file_path = os.path.join(settings.UPLOAD_DIR, sha[:2], f"{sha}{file_ext}")
+    if os.path.exists(file_path):
+        return file_path
+    
+    # Write under a temporary name and rename, so a concurrent upload of the
+    # same content never sees a partial file. The shard directory is only
+    # created the first time it is missing.
+    tmp_path = f"{file_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        out = open(tmp_path, "wb")
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        out = open(tmp_path, "wb")
+    src.seek(0)
+    with out:
+        shutil.copyfileobj(src, out, UPLOAD_CHUNK_BYTES)
+    os.replace(tmp_path, file_path)
+    return file_path
+
+
+def extracted_text_path(file_path: str) -> str:
+    """Sidecar path holding the text extracted from an upload."""
+    return f"{file_path}.txt.gz"
+
+
+def save_extracted_text(file_path: str, text: str) -> None:
+    """Store an upload's extracted text beside it (same content, same text)."""
+    text_path = extracted_text_path(file_path)
+    tmp_path = f"{text_path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as out:
+        out.write(gzip.compress(text.encode("utf-8"), compresslevel=3))
+    os.replace(tmp_path, text_path)
+
+
+def load_extracted_text(file_path: Optional[str]) -> Optional[str]:
+    """Extracted text for an upload, or None if it hasn't been parsed."""
+    if not file_path:
+        return None
+    try:
+        with open(extracted_text_path(file_path), "rb") as f:
+            return gzip.decompress(f.read()).decode("utf-8")
+    except FileNotFoundError:
+        return None
+
+
+def remove_upload(db: Session, file_path: str) -> None:
+    """
+    Delete a stored upload once no candidate references it. Call after the
+    owning candidate's delete has been flushed.
+    """
+    if not file_path:
+        return
+    if db.query(Candidate.id).filter(Candidate.file_path == file_path).first():
+        return
+    for path in (file_path, extracted_text_path(file_path)):
+        try:
+            os.remove(path)
+            logger.info(f"Deleted file: {path}")
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not delete file {path}: {e}")
@@ -48,12 +48,268 @@ class TestResumeEndpoints:
         )
         assert response.status_code == 400
     
+    def test_upload_batch_inserts_all_candidates(self, tmp_path, monkeypatch):
+        """Batch upload should create one candidate per valid file."""
+        from app.config import settings
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+        response = client.post(
+            "/api/v1/resumes/upload-batch",
+            files=[
+                ("files", ("a.txt", io.BytesIO(b"Python developer, 3 years"), "text/plain")),
+                ("files", ("b.txt", io.BytesIO(b"Java developer, 5 years"), "text/plain")),
+                ("files", ("c.exe", io.BytesIO(b"nope"), "application/octet-stream")),
+            ],
+        )
+        assert response.status_code == 202
+        data = response.json()
+        assert len(data["queued"]) == 2
+        assert len(data["errors"]) == 1
+        
+        for queued in data["queued"]:
+            detail = client.get(f"/api/v1/resumes/{queued['id']}")
+            assert detail.status_code == 200
+    
+    def test_upload_cap_enforced_without_reported_size(self, tmp_path, monkeypatch):
+        """Files with no reported size are still capped while being read."""
+        from fastapi import HTTPException, UploadFile
+        from app.config import settings
+        from app.utils.uploads import save_upload
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+        
+        oversized = UploadFile(io.BytesIO(b"x" * (settings.max_upload_bytes + 1)), filename="big.txt")
+        assert oversized.size is None
+        with pytest.raises(HTTPException) as exc:
+            save_upload(oversized)
+        assert exc.value.status_code == 413
+        assert not any(tmp_path.rglob("*"))
+        
+        path = save_upload(UploadFile(io.BytesIO(b"small resume"), filename="small.txt"))
+        assert open(path, "rb").read() == b"small resume"
+    
+    def test_download_resume(self, tmp_path, monkeypatch):
+        """Uploaded files should be downloadable byte-for-byte."""
+        from app.config import settings
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+        content = b"Python developer with 4 years of FastAPI experience"
+        response = client.post(
+            "/api/v1/resumes/upload",
+            files={"file": ("cv.txt", io.BytesIO(content), "text/plain")},
+        )
+        assert response.status_code == 201
+        
+        download = client.get(f"/api/v1/resumes/{response.json()['id']}/download")
+        assert download.status_code == 200
+        assert download.content == content
+        assert download.headers["content-length"] == str(len(content))
+        assert download.headers["content-type"].startswith("text/plain")
+        assert download.headers["content-disposition"].startswith("attachment")
+    
+    def test_identical_uploads_share_one_file(self, tmp_path, monkeypatch):
+        """Re-uploaded content is stored once and kept until its last candidate goes."""
+        from app.config import settings
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+        content = b"Rust developer, Tokio, 5 years"
+        ids = [
+            client.post(
+                "/api/v1/resumes/upload",
+                files={"file": (f"copy{i}.txt", io.BytesIO(content), "text/plain")},
+            ).json()["id"]
+            for i in range(2)
+        ]
+        stored = [p for p in tmp_path.rglob("*") if p.is_file() and not p.name.endswith(".txt.gz")]
+        assert len(stored) == 1
+        
+        assert client.delete(f"/api/v1/resumes/{ids[0]}").status_code == 204
+        assert stored[0].exists()
+        assert client.get(f"/api/v1/resumes/{ids[1]}/download").content == content
+        assert client.delete(f"/api/v1/resumes/{ids[1]}").status_code == 204
+        # The upload and its extracted-text sidecar go with the last reference
+        assert not any(p.is_file() for p in tmp_path.rglob("*"))
+    
+    def test_duplicate_upload_reuses_processed_content(self, tmp_path, monkeypatch):
+        """A re-uploaded resume copies the processed fields instead of parsing again."""
+        from app.config import settings
+        from app.services.parser import FileParser
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+        parsed = []
+        original_parse = FileParser.parse
+        monkeypatch.setattr(FileParser, "parse", staticmethod(lambda path: parsed.append(path) or original_parse(path)))
+        content = b"Kotlin developer with Android, Jetpack Compose and 6 years experience"
+
+        ids = [
+            client.post(
+                "/api/v1/resumes/upload",
+                files={"file": (f"dup{i}.txt", io.BytesIO(content), "text/plain")},
+            ).json()["id"]
+            for i in range(2)
+        ]
+        first, second = (client.get(f"/api/v1/resumes/{cid}").json() for cid in ids)
+        assert len(parsed) == 1
+        assert "Jetpack Compose" in first["original_text"]
+        assert second["status"] == "compressed"
+        for field in ("original_text", "compressed_data", "skills", "bias_flags"):
+            assert second[field] == first[field]
+
+    def test_processing_embeds_through_batcher_when_enabled(self, tmp_path, monkeypatch):
+        """With GENERATE_EMBEDDINGS, resumes and JDs are embedded via the shared batcher."""
+        import numpy as np
+        from app.config import settings
+        from app.database import SessionLocal
+        from app.models.candidate import Candidate
+        from app.models.job import Job
+        from app.services import matcher
+        encoded = []
+
+        class FakeModel:
+            def encode(self, texts, batch_size=32):
+                encoded.extend(texts)
+                return [np.array([float(len(t)), 1.0]) for t in texts]
+
+        monkeypatch.setattr(settings, "GENERATE_EMBEDDINGS", True)
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+        monkeypatch.setattr(matcher, "get_embedding_model", lambda: FakeModel())
+        monkeypatch.setattr(matcher, "embedding_batcher", matcher.EmbeddingBatcher(max_wait=0.01))
+
+        candidate_id = client.post(
+            "/api/v1/resumes/upload",
+            files={"file": ("embed.txt", io.BytesIO(b"Elixir developer, Phoenix, 5 years"), "text/plain")},
+        ).json()["id"]
+        job_id = client.post(
+            "/api/v1/jobs/create", json={"title": "Elixir Dev", "description_text": "Elixir and Phoenix"},
+        ).json()["id"]
+
+        db = SessionLocal()
+        try:
+            candidate_embedding = db.query(Candidate.embedding).filter(Candidate.id == candidate_id).scalar()
+            job_embedding = db.query(Job.embedding).filter(Job.id == job_id).scalar()
+        finally:
+            db.close()
+        assert len(encoded) == 2
+        assert candidate_embedding == matcher.MatchingEngine.serialize_embedding([len(encoded[0]), 1.0])
+        assert job_embedding == matcher.MatchingEngine.serialize_embedding([len(encoded[1]), 1.0])
+
+    def test_upload_queues_on_celery_when_enabled(self, tmp_path, monkeypatch):
+        """With USE_CELERY, uploads should be queued on the worker instead of processed in-process."""
+        import types
+        import app.tasks
+        from app.config import settings
+        queued = []
+        fake_worker = types.SimpleNamespace(
+            process_resume_task=types.SimpleNamespace(delay=lambda *args: queued.append(args)),
+        )
+        monkeypatch.setattr(app.tasks, "worker", fake_worker, raising=False)
+        monkeypatch.setattr(settings, "USE_CELERY", True)
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+
+        response = client.post(
+            "/api/v1/resumes/upload",
+            files={"file": ("queued.txt", io.BytesIO(b"Scala developer, 4 years"), "text/plain")},
+        )
+        assert response.status_code == 201
+        candidate_id = response.json()["id"]
+        assert [args[0] for args in queued] == [candidate_id]
+        assert client.get(f"/api/v1/resumes/{candidate_id}").json()["status"] == "uploaded"
+
+    def test_background_sessions_on_other_sqlite_urls_use_wal(self, tmp_path):
+        """Background sessions on a non-app SQLite URL get the same WAL/busy_timeout pragmas."""
+        from sqlalchemy import text
+        from app.database import background_session
+        db = background_session(f"sqlite:///{tmp_path / 'worker.db'}")
+        try:
+            assert db.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert db.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        finally:
+            db.close()
+
+    def test_in_process_tasks_share_bounded_slots(self, monkeypatch):
+        """In-process background tasks from concurrent requests should never exceed the worker count."""
+        import asyncio
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from fastapi import BackgroundTasks
+        from app.tasks import dispatch
+        monkeypatch.setattr(dispatch, "_executor", ThreadPoolExecutor(max_workers=2))
+        lock = threading.Lock()
+        running, peak = [0], [0]
+
+        def task(*args):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+
+        async def run_all():
+            queued = []
+            for _ in range(6):
+                tasks = BackgroundTasks()
+                dispatch.enqueue(tasks, "process_resume_task", task, "candidate")
+                queued.append(tasks.tasks[0]())
+            await asyncio.gather(*queued)
+
+        asyncio.run(run_all())
+        dispatch._executor.shutdown()
+        assert peak[0] == 2
+
+    def test_handlers_stay_responsive_while_task_slots_are_full(self, monkeypatch):
+        """Tasks queued behind busy workers should not hold the threadpool that runs sync handlers."""
+        import asyncio
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        import anyio
+        import anyio.to_thread
+        from fastapi import BackgroundTasks
+        from app.tasks import dispatch
+        monkeypatch.setattr(dispatch, "_executor", ThreadPoolExecutor(max_workers=1))
+        release = threading.Event()
+
+        async def scenario():
+            anyio.to_thread.current_default_thread_limiter().total_tokens = 2
+            queued = []
+            for _ in range(4):
+                tasks = BackgroundTasks()
+                dispatch.enqueue(tasks, "process_resume_task", lambda *args: release.wait(5), "candidate")
+                queued.append(asyncio.ensure_future(tasks.tasks[0]()))
+            await asyncio.sleep(0.05)
+            try:
+                # A sync handler still gets a threadpool thread while every task slot is busy
+                with anyio.fail_after(1):
+                    assert await anyio.to_thread.run_sync(lambda: "ok") == "ok"
+            finally:
+                release.set()
+                await asyncio.gather(*queued)
+
+        asyncio.run(scenario())
+        dispatch._executor.shutdown()
+
     def test_list_candidates_empty(self):
         """Should return empty list when no candidates exist."""
         response = client.get("/api/v1/resumes")
         # May return 200 or 500 depending on DB availability
         assert response.status_code in [200, 500]
-    
+
+    def test_list_candidates_total_past_last_page(self, tmp_path, monkeypatch):
+        """The page total should match the number of rows, including past the last page."""
+        from app.config import settings
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+        for i in range(2):
+            client.post(
+                "/api/v1/resumes/upload",
+                files={"file": (f"list{i}.txt", io.BytesIO(f"Go developer {i}".encode()), "text/plain")},
+            )
+
+        first = client.get("/api/v1/resumes", params={"per_page": 1}).json()
+        total = first["total"]
+        assert total >= 2
+        assert len(first["candidates"]) == 1
+        assert "original_text" not in first["candidates"][0]
+
+        beyond = client.get("/api/v1/resumes", params={"per_page": 1, "page": total + 1}).json()
+        assert beyond["candidates"] == []
+        assert beyond["total"] == total
+
     def test_get_nonexistent_candidate(self):
         """Should return 404 for non-existent candidate."""
         response = client.get("/api/v1/resumes/00000000-0000-0000-0000-000000000000")
@@ -76,6 +332,31 @@ class TestJobEndpoints:
         )
         # Success depends on DB availability
         assert response.status_code in [201, 500]
+        if response.status_code == 201:
+            # Server-side timestamps come back from the INSERT itself
+            body = response.json()
+            assert body["title"] == "Senior Python Developer"
+            assert body["status"] == "uploaded"
+            assert body["created_at"] is not None
+    
+    def test_list_jobs_keyset_cursor(self):
+        """Following the X-Next-Cursor header should walk the list without repeats."""
+        for i in range(3):
+            client.post("/api/v1/jobs/create", json={"title": f"Cursor Job {i}"})
+        
+        seen = []
+        response = client.get("/api/v1/jobs", params={"per_page": 2})
+        while True:
+            page = response.json()
+            assert "next_cursor" not in page
+            seen += [j["id"] for j in page["jobs"]]
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            response = client.get("/api/v1/jobs", params={"per_page": 2, "cursor": cursor})
+        assert len(seen) == len(set(seen)) == page["total"]
+        
+        assert client.get("/api/v1/jobs", params={"cursor": "not-a-cursor"}).status_code == 400
     
     def test_create_job_missing_title(self):
         """Should reject job creation without a title."""
@@ -85,6 +366,21 @@ class TestJobEndpoints:
         )
         assert response.status_code == 422  # Validation error
 
+    def test_upload_job_description_file(self, tmp_path, monkeypatch):
+        """Uploaded JD files should be written to disk and parsed into skills."""
+        from app.config import settings
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+        response = client.post(
+            "/api/v1/jobs/upload",
+            params={"title": "Backend Engineer"},
+            files={"file": ("jd.txt", io.BytesIO(b"Backend engineer with Python, Docker and AWS."), "text/plain")},
+        )
+        assert response.status_code == 201
+        assert len(list(tmp_path.iterdir())) == 1
+
+        job = client.get(f"/api/v1/jobs/{response.json()['id']}").json()
+        assert job["status"] == "compressed"
+
 
 class TestMatchEndpoints:
     """Tests for matching endpoints."""
@@ -111,6 +407,385 @@ class TestDashboardEndpoints:
         response = client.get("/api/v1/dashboard/metrics")
         assert response.status_code in [200, 500]
 
+    def test_dashboard_metrics_cache_tracks_new_rows(self):
+        """Cached metrics should be reused until a new row changes the watermark."""
+        first = client.get("/api/v1/dashboard/metrics").json()
+        assert client.get("/api/v1/dashboard/metrics").json() == first
+
+        client.post("/api/v1/jobs/create", json={"title": "Cache Probe", "description_text": "Python"})
+        after = client.get("/api/v1/dashboard/metrics").json()
+        assert after["total_jobs"] == first["total_jobs"] + 1
+
+
+class TestMatchingFlow:
+    """End-to-end: job + resume → match session → dashboard and export."""
+    
+    RESUME = (
+        b"Jane Tester\njane.tester@example.com\n"
+        b"Senior Python Developer with 6 years of experience in Python, Django, FastAPI and AWS.\n"
+        b"Bachelor of Technology in Computer Science."
+    )
+    
+    @pytest.fixture
+    def completed_session(self, tmp_path, monkeypatch):
+        from app.config import settings
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+        
+        job = client.post(
+            "/api/v1/jobs/create",
+            json={
+                "title": "Senior Python Developer",
+                "company": "TechCorp",
+                "description_text": "Senior Python developer, 5+ years, Python, Django, FastAPI, AWS. Bachelor's degree.",
+            },
+        ).json()
+        candidate = client.post(
+            "/api/v1/resumes/upload",
+            files={"file": ("jane.txt", io.BytesIO(self.RESUME), "text/plain")},
+            data={"name": "Jane Tester", "email": "jane.tester@example.com"},
+        ).json()
+        session = client.post(
+            "/api/v1/match/run",
+            json={"job_id": job["id"], "candidate_ids": [candidate["id"]]},
+        ).json()
+        return {"job": job, "candidate": candidate, "session": session}
+    
+    def test_results_and_dashboard(self, completed_session):
+        """Completed sessions should surface in results and the dashboard leaderboard."""
+        candidate_id = completed_session["candidate"]["id"]
+        results = client.get(f"/api/v1/match/results/{completed_session['session']['id']}").json()
+        assert results["session"]["status"] == "completed"
+        assert [r["candidate_id"] for r in results["results"]] == [candidate_id]
+        assert results["results"][0]["candidate_name"] == "Jane Tester"
+        assert results["session"]["job_title"] == "Senior Python Developer"
+        
+        sessions = client.get("/api/v1/match/sessions").json()
+        listed = next(s for s in sessions if s["id"] == completed_session["session"]["id"])
+        assert listed["job_title"] == "Senior Python Developer"
+        
+        metrics = client.get("/api/v1/dashboard/metrics")
+        assert metrics.status_code == 200
+        data = metrics.json()
+        assert data["total_candidates"] >= data["candidates_ready"] >= 1
+        assert data["total_jobs"] >= data["total_active_jobs"] >= 1
+        assert data["total_sessions"] >= data["completed_sessions"] >= 1
+        matched_job = next(j for j in data["active_jobs"] if j["id"] == completed_session["job"]["id"])
+        assert matched_job["candidates_matched"] == 1
+        leaderboard = data["leaderboard"]
+        assert all(entry["matched_job"] for entry in leaderboard)
+        assert len({entry["candidate_id"] for entry in leaderboard}) == len(leaderboard)
+    
+    def test_sessions_keyset_cursor_header(self, completed_session):
+        """The session list pages by the X-Next-Cursor header."""
+        client.post(
+            "/api/v1/match/run",
+            json={"job_id": completed_session["job"]["id"], "candidate_ids": [completed_session["candidate"]["id"]]},
+        )
+        first = client.get("/api/v1/match/sessions", params={"per_page": 1})
+        cursor = first.headers["X-Next-Cursor"]
+        second = client.get("/api/v1/match/sessions", params={"per_page": 1, "cursor": cursor})
+        assert first.json()[0]["id"] != second.json()[0]["id"]
+        assert first.json()[0]["created_at"] >= second.json()[0]["created_at"]
+    
+    def test_timestamps_set_on_tables_without_server_default(self, tmp_path):
+        """Tables created before the DB-side defaults still get created_at on insert."""
+        from sqlalchemy import create_engine, text
+        from sqlalchemy.orm import Session
+        from app.models.audit import AuditLog
+        old_engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        with old_engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE audit_logs (id VARCHAR(36) PRIMARY KEY, entity_type VARCHAR(50) NOT NULL, "
+                "entity_id VARCHAR(36), action VARCHAR(50) NOT NULL, details JSON, user_id VARCHAR(36), "
+                "company_id VARCHAR(36), created_at DATETIME)"
+            ))
+        with Session(old_engine) as db:
+            db.add(AuditLog(entity_type="candidate", action="created"))
+            db.commit()
+            assert db.query(AuditLog).one().created_at is not None
+        old_engine.dispose()
+
+    def test_index_failure_does_not_skip_remaining_indexes(self, tmp_path, monkeypatch):
+        """One index that can't be created is logged; the indexes after it are still created."""
+        from sqlalchemy import Index, create_engine, inspect
+        from app import database
+        from app.models.candidate import Candidate
+        new_engine = create_engine(f"sqlite:///{tmp_path / 'idx.db'}")
+        database.Base.metadata.create_all(bind=new_engine)
+        indexes = [i for i in Candidate.__table__.indexes if not i.name.endswith("_gin")]
+        for index in indexes:
+            index.drop(bind=new_engine)
+        monkeypatch.setattr(database, "engine", new_engine)
+        original_create = Index.create
+
+        def create(index, bind, checkfirst=False):
+            if index is indexes[0]:
+                raise RuntimeError("boom")
+            return original_create(index, bind=bind, checkfirst=checkfirst)
+
+        monkeypatch.setattr(Index, "create", create)
+        database._create_missing_indexes()
+
+        created = {i["name"] for i in inspect(new_engine).get_indexes("candidates")}
+        assert indexes[0].name not in created
+        assert {i.name for i in indexes[1:]} <= created
+        new_engine.dispose()
+
+    def test_gin_indexes_need_jsonb_columns(self):
+        """jsonb_path_ops GIN indexes are skipped on skill columns still typed json."""
+        from sqlalchemy import JSON, String
+        from sqlalchemy.dialects.postgresql import JSONB
+        from app.database import _needs_jsonb
+        from app.models.candidate import Candidate
+        indexes = {i.name: i for i in Candidate.__table__.indexes}
+        gin = indexes["ix_candidates_skills_gin"]
+        assert _needs_jsonb(gin, {"skills": JSON()})
+        assert not _needs_jsonb(gin, {"skills": JSONB()})
+        assert not _needs_jsonb(indexes["ix_candidates_created_at"], {"created_at": String()})
+
+    def test_job_title_added_to_existing_match_sessions(self, tmp_path, monkeypatch):
+        """Databases created before match_sessions.job_title get the column, backfilled from jobs."""
+        from sqlalchemy import create_engine, inspect, text
+        from app import database
+        old_engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        with old_engine.begin() as conn:
+            conn.execute(text("CREATE TABLE jobs (id VARCHAR(36) PRIMARY KEY, title VARCHAR(500))"))
+            conn.execute(text("CREATE TABLE match_sessions (id VARCHAR(36) PRIMARY KEY, job_id VARCHAR(36))"))
+            conn.execute(text("INSERT INTO jobs VALUES ('j1', 'Data Engineer')"))
+            conn.execute(text("INSERT INTO match_sessions VALUES ('s1', 'j1')"))
+        monkeypatch.setattr(database, "engine", old_engine)
+
+        database._add_match_session_job_title()
+        database._add_match_session_job_title()
+
+        assert "job_title" in {c["name"] for c in inspect(old_engine).get_columns("match_sessions")}
+        with old_engine.connect() as conn:
+            assert conn.execute(text("SELECT job_title FROM match_sessions")).scalar() == "Data Engineer"
+        old_engine.dispose()
+
+    def test_cache_serializes_like_responses(self, monkeypatch):
+        """Cached values with numpy scalars and non-string keys round-trip like API responses."""
+        import numpy as np
+        from app.services import cache
+        from app.services.cache import CacheService
+
+        class FakeRedis:
+            def __init__(self):
+                self.store = {}
+
+            def setex(self, key, ttl, value):
+                self.store[key] = value
+
+            def get(self, key):
+                return self.store.get(key)
+
+        monkeypatch.setattr(cache, "_client", FakeRedis())
+        monkeypatch.setattr(cache, "_disabled_until", 0.0)
+        CacheService.set_json("progress", {"score": np.float32(0.5), 7: np.int64(3)}, ttl=60)
+        assert CacheService.get_json("progress") == {"score": 0.5, "7": 3}
+
+    def test_list_sessions_skips_sessions_without_job(self, completed_session):
+        """Sessions whose job no longer exists are left out of the listing."""
+        from app.database import SessionLocal
+        from app.models.match import MatchSession
+        db = SessionLocal()
+        try:
+            orphan = MatchSession(job_id="missing-job", job_title="Gone", status="completed")
+            db.add(orphan)
+            db.commit()
+            orphan_id = orphan.id
+        finally:
+            db.close()
+        ids = [s["id"] for s in client.get("/api/v1/match/sessions").json()]
+        assert completed_session["session"]["id"] in ids
+        assert orphan_id not in ids
+
+    def test_status_polls_read_published_progress(self, completed_session, monkeypatch):
+        """The matcher publishes status; polls read it without the session row."""
+        from app.services.cache import CacheService
+        store = {}
+        monkeypatch.setattr(CacheService, "get_json", staticmethod(lambda key: store.get(key)))
+        monkeypatch.setattr(CacheService, "set_json", staticmethod(lambda key, value, ttl: store.__setitem__(key, value)))
+        monkeypatch.setattr(CacheService, "delete", staticmethod(lambda *keys: [store.pop(k, None) for k in keys]))
+        
+        session = client.post(
+            "/api/v1/match/run",
+            json={"job_id": completed_session["job"]["id"], "candidate_ids": [completed_session["candidate"]["id"]]},
+        ).json()
+        key = f"match:session:{session['id']}:status"
+        assert store[key]["status"] == "completed"
+        assert store[key]["progress_percent"] == 100.0
+        
+        store[key]["status"] = "from-cache"
+        assert client.get(f"/api/v1/match/status/{session['id']}").json()["status"] == "from-cache"
+        store.pop(key)
+        assert client.get(f"/api/v1/match/status/{session['id']}").json()["status"] == "completed"
+        
+        listed = client.get("/api/v1/match/sessions").json()
+        assert next(s for s in listed if s["id"] == session["id"])["job_title"] == "Senior Python Developer"
+    
+    def test_job_analytics(self, completed_session):
+        """Analytics aggregates should reflect the single matched candidate."""
+        job_id = completed_session["job"]["id"]
+        response = client.get(f"/api/v1/dashboard/job/{job_id}/analytics")
+        assert response.status_code == 200
+        data = response.json()
+        summary = data["summary"]
+        assert summary["total_matched"] == 1
+        assert summary["highest_score"] == summary["lowest_score"] == summary["avg_overall_score"]
+        assert sum(b["count"] for b in data["score_distribution"]) == 1
+        assert sum(b["count"] for b in data["experience_distribution"]) == 1
+        assert data["top_candidates"][0]["candidate_id"] == completed_session["candidate"]["id"]
+
+    def test_results_are_ranked_by_score(self, completed_session):
+        """Batch-inserted results should carry contiguous ranks in score order."""
+        junior = client.post(
+            "/api/v1/resumes/upload",
+            files={"file": ("junior.txt", io.BytesIO(b"Junior designer, Photoshop, 1 year"), "text/plain")},
+        ).json()
+        session = client.post(
+            "/api/v1/match/run",
+            json={
+                "job_id": completed_session["job"]["id"],
+                "candidate_ids": [junior["id"], completed_session["candidate"]["id"]],
+            },
+        ).json()
+        data = client.get(f"/api/v1/match/results/{session['id']}").json()
+        assert data["session"]["processed_candidates"] == 2
+        results = data["results"]
+        assert [r["rank"] for r in results] == [1, 2]
+        assert results[0]["overall_score"] >= results[1]["overall_score"]
+        assert results[0]["candidate_id"] == completed_session["candidate"]["id"]
+
+    def test_large_sessions_score_in_process_pool(self, completed_session, monkeypatch):
+        """Pooled scoring should rank exactly like inline scoring."""
+        from app.config import settings
+        from app.routers import matching
+        other = client.post(
+            "/api/v1/resumes/upload",
+            files={"file": ("pooled.txt", io.BytesIO(b"Python developer, Django, 2 years"), "text/plain")},
+        ).json()
+        payload = {
+            "job_id": completed_session["job"]["id"],
+            "candidate_ids": [completed_session["candidate"]["id"], other["id"]],
+        }
+        
+        def ranked(session):
+            results = client.get(f"/api/v1/match/results/{session['id']}").json()["results"]
+            return [(r["candidate_id"], r["overall_score"]) for r in results]
+        
+        inline = ranked(client.post("/api/v1/match/run", json=payload).json())
+        monkeypatch.setattr(settings, "MATCH_WORKERS", 2)
+        monkeypatch.setattr(settings, "MATCH_PARALLEL_MIN_CANDIDATES", 1)
+        monkeypatch.setattr(matching, "PROGRESS_EVERY", 1)
+        try:
+            assert matching.get_match_executor(2) is not None
+            pooled = ranked(client.post("/api/v1/match/run", json=payload).json())
+        finally:
+            matching.shutdown_match_executor()
+        assert pooled == inline
+    
+    def test_unfiltered_session_streams_candidates_in_chunks(self, completed_session, monkeypatch):
+        """Chunked candidate scans should score everyone once with contiguous ranks."""
+        from app.routers import matching
+        monkeypatch.setattr(matching, "CANDIDATE_SCAN_CHUNK", 1)
+        session = client.post("/api/v1/match/run", json={"job_id": completed_session["job"]["id"]}).json()
+        data = client.get(f"/api/v1/match/results/{session['id']}").json()
+        assert data["session"]["status"] == "completed"
+        results = data["results"]
+        assert len(results) == data["session"]["total_candidates"] >= 1
+        assert len({r["candidate_id"] for r in results}) == len(results)
+        assert [r["rank"] for r in results] == list(range(1, len(results) + 1))
+        scores = [r["overall_score"] for r in results]
+        assert scores == sorted(scores, reverse=True)
+    
+    def test_candidate_id_filter_is_chunked(self, completed_session, monkeypatch):
+        """Long candidate id lists are split into IN chunks without duplicating rows."""
+        from app.routers import matching
+        monkeypatch.setattr(matching, "CANDIDATE_ID_CHUNK", 1)
+        other = client.post(
+            "/api/v1/resumes/upload",
+            files={"file": ("other.txt", io.BytesIO(b"Go developer, Kubernetes, 3 years"), "text/plain")},
+        ).json()
+        candidate_id = completed_session["candidate"]["id"]
+        session = client.post(
+            "/api/v1/match/run",
+            json={
+                "job_id": completed_session["job"]["id"],
+                "candidate_ids": [candidate_id, other["id"], candidate_id],
+            },
+        ).json()
+        data = client.get(f"/api/v1/match/results/{session['id']}").json()
+        assert data["session"]["total_candidates"] == 2
+        assert sorted(r["candidate_id"] for r in data["results"]) == sorted([candidate_id, other["id"]])
+
+    def test_job_analytics_dedupes_top_candidates_across_sessions(self, completed_session):
+        """Re-running a match should count both sessions but list the candidate once."""
+        job_id = completed_session["job"]["id"]
+        client.post(
+            "/api/v1/match/run",
+            json={"job_id": job_id, "candidate_ids": [completed_session["candidate"]["id"]]},
+        )
+        data = client.get(f"/api/v1/dashboard/job/{job_id}/analytics").json()
+        assert data["summary"]["total_sessions"] == 2
+        assert data["summary"]["total_matched"] == 2
+        assert len(data["sessions"]) == 2
+        assert len(data["top_candidates"]) == 1
+
+    def test_job_payload_cached_for_matching(self, monkeypatch):
+        """Processed jobs cache their scoring inputs; deleting the job drops them."""
+        from app.services.cache import CacheService
+        from app.routers.jobs import cache_job_payload, job_payload_key, load_job_payload
+        store = {}
+        monkeypatch.setattr(CacheService, "get_json", staticmethod(lambda key: store.get(key)))
+        monkeypatch.setattr(CacheService, "set_json", staticmethod(lambda key, value, ttl: store.__setitem__(key, value)))
+        monkeypatch.setattr(CacheService, "delete", staticmethod(lambda *keys: [store.pop(k, None) for k in keys]))
+        
+        job = client.post("/api/v1/jobs/create", json={"title": "Cached Role", "description_text": "Python, SQL"}).json()
+        key = job_payload_key(job["id"])
+        assert store[key]["title"] == "Cached Role"
+        
+        # Cache hits never touch the DB, and the embedding survives the round-trip
+        cache_job_payload("j-1", "Blob Role", {"required_skills": ["go"]}, b"\x01\xff\x7f")
+        job_data, embedding = load_job_payload(None, "j-1")
+        assert job_data == {"required_skills": ["go"], "title": "Blob Role"}
+        assert embedding == b"\x01\xff\x7f"
+        
+        assert client.delete(f"/api/v1/jobs/{job['id']}").status_code == 204
+        assert key not in store
+    
+    def test_export_json(self, completed_session):
+        """JSON export should include the matched candidate."""
+        response = client.post(
+            "/api/v1/reports/export",
+            json={"session_id": completed_session["session"]["id"], "format": "json"},
+        )
+        assert response.status_code == 200
+        report = response.json()["report"]
+        assert report["job_title"] == "Senior Python Developer"
+        assert report["results"][0]["candidate_name"] == "Jane Tester"
+    
+    def test_export_csv(self, completed_session):
+        """CSV export should include a header and the candidate row."""
+        response = client.post(
+            "/api/v1/reports/export",
+            json={"session_id": completed_session["session"]["id"], "format": "csv"},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        lines = response.text.strip().splitlines()
+        assert lines[0].startswith("Rank,Candidate Name")
+        assert len(lines) == 2
+        assert "Jane Tester" in lines[1]
+    
+    def test_export_unsupported_format(self, completed_session):
+        """Unknown formats should be rejected."""
+        response = client.post(
+            "/api/v1/reports/export",
+            json={"session_id": completed_session["session"]["id"], "format": "xml"},
+        )
+        assert response.status_code == 400
+
 
 class TestWebhookEndpoints:
     """Tests for webhook endpoints."""
@@ -120,6 +795,97 @@ class TestWebhookEndpoints:
         response = client.get("/api/v1/webhooks/ats/logs")
         assert response.status_code in [200, 500]
 
+    def test_receive_verifies_signature_over_raw_body(self, monkeypatch):
+        """Incoming webhooks are verified against the exact bytes received."""
+        import json
+        from app.config import settings
+        from app.routers.webhooks import WebhookService
+        monkeypatch.setattr(settings, "ATS_WEBHOOK_SECRET", "s3cret")
+        body = json.dumps({"candidate": "Zoë", "stage": "interview"}).encode()
+        headers = {"Content-Type": "application/json", "X-Webhook-Event": "stage_changed"}
+
+        ok = client.post(
+            "/api/v1/webhooks/ats/receive", content=body,
+            headers={**headers, "X-Webhook-Signature": WebhookService._sign_payload(body)},
+        )
+        assert ok.status_code == 200
+        bad = client.post(
+            "/api/v1/webhooks/ats/receive", content=body,
+            headers={**headers, "X-Webhook-Signature": "0" * 64},
+        )
+        assert bad.status_code == 401
+
+
+class TestGdprEndpoints:
+    """Tests for GDPR endpoints."""
+
+    def test_erasure_audit_stores_keyed_name_hash(self, tmp_path, monkeypatch):
+        """Erasure audit records should hold a stable hex HMAC, not Python's hash()."""
+        from app.config import settings
+        from app.routers.gdpr import audit_hash
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+        upload = client.post(
+            "/api/v1/resumes/upload",
+            files={"file": ("gdpr.txt", io.BytesIO(b"Go developer, 2 years"), "text/plain")},
+        )
+        assert upload.status_code == 201
+        candidate_id = upload.json()["id"]
+        name = client.get(f"/api/v1/resumes/{candidate_id}").json().get("name") or "Unknown"
+
+        response = client.post("/api/v1/gdpr/delete", json={"entity_id": candidate_id})
+        assert response.status_code == 200
+
+        logs = client.get("/api/v1/gdpr/audit-trail", params={"entity_id": candidate_id}).json()["logs"]
+        erased = next(log for log in logs if log["action"] == "data_erased")
+        name_hash = erased["details"]["candidate_name_hash"]
+        assert len(name_hash) == 64
+        assert name_hash == audit_hash(name)
+
+    def test_export_candidate_data(self, tmp_path, monkeypatch):
+        """Right-of-access export should return the candidate as a JSON attachment."""
+        from app.config import settings
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+        upload = client.post(
+            "/api/v1/resumes/upload",
+            files={"file": ("export.txt", io.BytesIO(b"Rust developer, 6 years"), "text/plain")},
+        )
+        candidate_id = upload.json()["id"]
+
+        response = client.get(f"/api/v1/gdpr/export/{candidate_id}")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert "attachment" in response.headers["content-disposition"]
+        data = response.json()
+        assert data["candidate_profile"]["id"] == candidate_id
+        assert data["file_metadata"]["file_name"] == "export.txt"
+
+    def test_status_counts_audit_actions(self):
+        """Status statistics should count consent records per action."""
+        before = client.get("/api/v1/gdpr/status").json()["statistics"]
+        client.post("/api/v1/gdpr/consent", json={"entity_id": "c-1", "consent_given": True})
+        client.post("/api/v1/gdpr/consent", json={"entity_id": "c-1", "consent_given": False})
+
+        after = client.get("/api/v1/gdpr/status").json()["statistics"]
+        assert after["consent_records"] == before["consent_records"] + 2
+        assert after["data_deletions"] == before["data_deletions"]
+        assert after["total_candidates"] >= after["expired_awaiting_cleanup"]
+
+    def test_status_cache_invalidated_by_consent(self, monkeypatch):
+        """Cached status should be reused until a GDPR write drops it."""
+        from app.services.cache import CacheService
+        store = {}
+        monkeypatch.setattr(CacheService, "get_json", staticmethod(lambda key: store.get(key)))
+        monkeypatch.setattr(CacheService, "set_json", staticmethod(lambda key, value, ttl: store.__setitem__(key, value)))
+        monkeypatch.setattr(CacheService, "delete", staticmethod(lambda *keys: [store.pop(k, None) for k in keys]))
+
+        first = client.get("/api/v1/gdpr/status").json()
+        store["gdpr:status"]["statistics"]["consent_records"] = -1
+        assert client.get("/api/v1/gdpr/status").json()["statistics"]["consent_records"] == -1
+
+        client.post("/api/v1/gdpr/consent", json={"entity_id": "c-2"})
+        after = client.get("/api/v1/gdpr/status").json()
+        assert after["statistics"]["consent_records"] == first["statistics"]["consent_records"] + 1
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,209 @@
+"""
+RSA MVP Enhanced — Tests for authentication (password hashing, tokens, login)
+"""
+
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database import SessionLocal
+from app.models.user import User
+from app.config import settings
+from app.routers.auth import (
+    hash_password, verify_password, password_needs_rehash, _legacy_hash_password,
+    create_token, verify_token, UserCtx,
+)
+from app.services.cache import CacheService
+
+client = TestClient(app)
+
+
+def _unique_email() -> str:
+    return f"user-{uuid.uuid4().hex[:12]}@example.com"
+
+
+class TestPasswordHashing:
+    """Tests for the scrypt password hashing helpers."""
+
+    def test_hash_is_salted_per_user(self):
+        """Same password should produce different hashes."""
+        assert hash_password("s3cret!") != hash_password("s3cret!")
+
+    def test_verify_correct_password(self):
+        """Correct password should verify against its hash."""
+        hashed = hash_password("s3cret!")
+        assert hashed.startswith("scrypt$")
+        assert verify_password("s3cret!", hashed) is True
+
+    def test_verify_wrong_password(self):
+        """Wrong password should fail verification."""
+        hashed = hash_password("s3cret!")
+        assert verify_password("wrong", hashed) is False
+
+    def test_verify_malformed_hash(self):
+        """Malformed stored hashes should fail closed."""
+        assert verify_password("s3cret!", "scrypt$garbage") is False
+        assert verify_password("s3cret!", "") is False
+
+    def test_legacy_hash_verifies_and_needs_rehash(self):
+        """Legacy SHA256 hashes still verify but are flagged for upgrade."""
+        legacy = _legacy_hash_password("s3cret!")
+        assert verify_password("s3cret!", legacy) is True
+        assert password_needs_rehash(legacy) is True
+        assert password_needs_rehash(hash_password("s3cret!")) is False
+
+
+class TestTokens:
+    """Tests for JWT creation and verification."""
+
+    def test_token_roundtrip(self):
+        """A freshly created token should verify and keep its claims."""
+        token = create_token({"sub": "user-1", "role": "admin"})
+        payload = verify_token(token)
+        assert payload["sub"] == "user-1"
+        assert payload["role"] == "admin"
+        assert isinstance(payload["exp"], int)
+
+    def test_tampered_token_rejected(self):
+        """Changing the signature should invalidate the token."""
+        token = create_token({"sub": "user-1"})
+        tampered = token[:-2] + ("AA" if not token.endswith("AA") else "BB")
+        assert verify_token(tampered) is None
+
+    def test_expired_token_rejected(self, monkeypatch):
+        """Tokens past their expiry should be rejected."""
+        monkeypatch.setattr(settings, "ACCESS_TOKEN_EXPIRE_MINUTES", -1)
+        token = create_token({"sub": "user-1"})
+        assert verify_token(token) is None
+
+    def test_garbage_token_rejected(self):
+        """Non-JWT strings should be rejected."""
+        assert verify_token("not-a-token") is None
+
+
+class TestUserCache:
+    """Tests for the cached auth user context."""
+
+    def test_user_ctx_cache_roundtrip(self):
+        """Cached contexts should deserialize back to equal objects."""
+        ctx = UserCtx(
+            id="u1", email="a@b.com", name="A", role="admin", company_id=None,
+            company_name="", is_active=True, created_at=datetime(2024, 1, 2, 3, 4, 5),
+        )
+        assert UserCtx.from_cache(json.loads(json.dumps(ctx.to_cache()))) == ctx
+
+    def test_me_served_from_cache(self, monkeypatch):
+        """A cache hit should be used instead of the database row."""
+        cached = UserCtx(
+            id="cached-user", email="cached@example.com", name="Cached", role="viewer",
+            company_id=None, company_name="", is_active=True,
+        ).to_cache()
+        monkeypatch.setattr(CacheService, "get_json", staticmethod(lambda key: dict(cached)))
+        token = create_token({"sub": "cached-user"})
+        response = client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+        assert response.json()["email"] == "cached@example.com"
+
+
+class TestAuthEndpoints:
+    """Tests for register/login endpoints."""
+
+    def test_register_and_login(self):
+        """Registered users should be able to log in."""
+        email = _unique_email()
+        response = client.post(
+            "/api/v1/auth/register",
+            json={"email": email, "password": "pa55word", "name": "Test User"},
+        )
+        assert response.status_code == 201
+
+        response = client.post("/api/v1/auth/login", json={"email": email, "password": "pa55word"})
+        assert response.status_code == 200
+        token = response.json()["access_token"]
+
+        response = client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+        assert response.json()["email"] == email
+
+    def test_login_wrong_password(self):
+        """Wrong password should be rejected."""
+        email = _unique_email()
+        client.post(
+            "/api/v1/auth/register",
+            json={"email": email, "password": "pa55word", "name": "Test User"},
+        )
+        response = client.post("/api/v1/auth/login", json={"email": email, "password": "nope"})
+        assert response.status_code == 401
+
+    def test_login_upgrades_legacy_hash(self):
+        """Logging in with a legacy hash should store an scrypt hash."""
+        email = _unique_email()
+        db = SessionLocal()
+        try:
+            db.add(User(email=email, password_hash=_legacy_hash_password("pa55word"), name="Legacy"))
+            db.commit()
+        finally:
+            db.close()
+
+        response = client.post("/api/v1/auth/login", json={"email": email, "password": "pa55word"})
+        assert response.status_code == 200
+
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter(User.email == email).first()
+            assert user.password_hash.startswith("scrypt$")
+        finally:
+            db.close()
+
+    def test_list_users_keyset_pagination(self):
+        """Walking the X-Next-Cursor header should visit every user exactly once."""
+        emails = {_unique_email() for _ in range(3)}
+        for email in emails:
+            client.post(
+                "/api/v1/auth/register",
+                json={"email": email, "password": "pa55word", "name": "Test User"},
+            )
+        admin_email = _unique_email()
+        token = client.post(
+            "/api/v1/auth/register",
+            json={"email": admin_email, "password": "pa55word", "name": "Admin", "role": "admin"},
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = client.get("/api/v1/auth/users", params=params, headers=headers)
+            assert response.status_code == 200
+            users = response.json()
+            assert isinstance(users, list) and len(users) <= 2
+            seen.extend(u["email"] for u in users)
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        assert len(seen) == len(set(seen))
+        assert emails | {admin_email} <= set(seen)
+        assert seen[0] == admin_email
+
+    def test_list_users_rejects_bad_cursor(self):
+        """Malformed cursors should be a 400, not a 500."""
+        token = client.post(
+            "/api/v1/auth/register",
+            json={"email": _unique_email(), "password": "pa55word", "name": "Admin", "role": "admin"},
+        ).json()["access_token"]
+        response = client.get(
+            "/api/v1/auth/users", params={"cursor": "garbage"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert response.status_code == 400
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -108,6 +108,17 @@ class TestBiasNeutralization:
         
         assert "chairman" not in neutralized.lower() or "chairperson" in neutralized.lower()
 
+    def test_fused_pass_matches_separate_calls(self):
+        """analyze_and_neutralize should agree with analyze() and neutralize()."""
+        text = (
+            "The Chairman and the WAITRESS met. He thanked her. "
+            "Age: 35, born in 1990. Marital status: Married. Nationality: American."
+        )
+        analysis, neutralized, changes = BiasDetector.analyze_and_neutralize(text)
+
+        assert analysis == BiasDetector.analyze(text)
+        assert (neutralized, changes) == BiasDetector.neutralize(text)
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -81,6 +81,22 @@ class TestResumeCompressor:
         expected_keys = ["summary", "skills", "experience", "education", "certifications", "total_experience_years"]
         for key in expected_keys:
             assert key in result
+    
+    def test_keyword_scan_matches_substring_fallback(self, monkeypatch):
+        """Automaton and plain substring scans should find the same keywords."""
+        from app.services import compressor
+        
+        text_lower = self.SAMPLE_RESUME.lower()
+        found = {category: compressor._keywords_in(text_lower, category)
+                 for category in compressor.KEYWORD_SETS}
+        assert {"javascript", "python", "git"} <= found["skills"]
+        # Only whole words count: no "java" in "javascript", no "r" in "engineer"
+        assert not {"java", "r", "go"} & found["skills"]
+        assert "bachelor" in found["education"]
+        
+        monkeypatch.setattr(compressor, "_KEYWORD_AUTOMATA", {})
+        for category, keywords in found.items():
+            assert compressor._keywords_in(text_lower, category) == keywords
 
 
 class TestJDCompressor:
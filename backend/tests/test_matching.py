@@ -208,6 +208,89 @@ class TestOverallMatching:
         )
         assert sim < 1.0
     
+    def test_embedding_roundtrip_is_quantized(self):
+        """Serialized embeddings are unit vectors stored as one int8 per dimension."""
+        vec = np.random.rand(384).astype(np.float32)
+        blob = MatchingEngine.serialize_embedding(vec)
+        assert len(blob) == 384
+        restored = MatchingEngine.deserialize_embedding(blob)
+        assert np.isclose(np.linalg.norm(restored), 1.0, atol=2e-2)
+        
+        # Quantization error barely moves the cosine similarity
+        original = pickle.dumps(vec)
+        assert MatchingEngine.compute_cosine_similarity(blob, original) > 0.995
+    
+    def test_batch_semantic_scores_match_pairwise(self):
+        """Batch scoring should agree with pairwise cosine similarity."""
+        job = MatchingEngine.serialize_embedding(np.random.rand(384))
+        candidates = [MatchingEngine.serialize_embedding(np.random.rand(384)) for _ in range(5)]
+        candidates.insert(2, None)
+        
+        scores = MatchingEngine.compute_semantic_scores(candidates, job)
+        assert scores[2] is None
+        for blob, score in zip(candidates, scores):
+            if blob is not None:
+                assert score == pytest.approx(MatchingEngine.compute_cosine_similarity(blob, job), abs=1e-6)
+    
+    def test_batch_semantic_scores_mix_legacy_rows(self):
+        """Legacy float pickles and quantized rows score together in one batch."""
+        job = MatchingEngine.serialize_embedding(np.random.rand(384))
+        candidates = [
+            pickle.dumps(np.random.rand(384).astype(np.float32)),
+            MatchingEngine.serialize_embedding(np.random.rand(384)),
+            MatchingEngine.serialize_embedding(np.random.rand(128)),
+            pickle.dumps(np.random.rand(384).astype(np.float32)),
+            MatchingEngine.serialize_embedding(np.random.rand(384)),
+        ]
+        
+        scores = MatchingEngine.compute_semantic_scores(candidates, job)
+        assert scores[2] is None
+        for i in (0, 1, 3, 4):
+            assert scores[i] == pytest.approx(
+                MatchingEngine.compute_cosine_similarity(candidates[i], job), abs=1e-6
+            )
+    
+    def test_batch_match_agrees_with_compute_match(self):
+        """Batch scoring should reproduce compute_match row by row."""
+        job = MatchingEngine.serialize_embedding(np.random.rand(384))
+        embeddings = [MatchingEngine.serialize_embedding(np.random.rand(384)) for _ in range(3)] + [None]
+        candidates = [
+            {"skills": ["Python", "SQL"], "total_experience_years": 4},
+            {"skills": ["Java"], "total_experience_years": 1, "education": [{"degree": "Master of Science"}]},
+            {"skills": [], "experience": [{"title": "Senior Engineer", "duration": "3 years"}]},
+            {"skills": ["Python"], "total_experience_years": 8},
+        ]
+        job_data = {
+            "title": "Backend Engineer",
+            "required_skills": ["Python", "SQL"],
+            "experience_range": "3-5 years",
+            "education_requirements": "Bachelor's degree",
+        }
+        config = {"skill_weight": 0.4, "experience_weight": 0.2, "semantic_weight": 0.2}
+        
+        batch = MatchingEngine.compute_match_batch(candidates, job_data, embeddings, job, config=config)
+        assert len(batch) == len(candidates)
+        for data, blob, result in zip(candidates, embeddings, batch):
+            single = MatchingEngine.compute_match(data, job_data, blob, job, config=config)
+            assert result == single
+    
+    def test_unusable_embeddings_score_same_in_single_and_batch(self):
+        """Mismatched dimensions or a zero job vector fall back to the same neutral 0.5 on both paths."""
+        job = MatchingEngine.serialize_embedding(np.random.rand(384))
+        pairs = [
+            (MatchingEngine.serialize_embedding(np.random.rand(128)), job),
+            (MatchingEngine.serialize_embedding(np.random.rand(384)), np.zeros(384, dtype=np.int8).tobytes()),
+        ]
+        data = {"skills": ["Python"], "total_experience_years": 4}
+        job_data = {"required_skills": ["Python"], "experience_range": "3-5 years"}
+        config = {"semantic_weight": 0.3}
+        
+        for blob, job_blob in pairs:
+            single = MatchingEngine.compute_match(data, job_data, blob, job_blob, config=config)
+            [batch] = MatchingEngine.compute_match_batch([data], job_data, [blob], job_blob, config=config)
+            assert single["semantic_score"] == 0.5
+            assert batch == single
+    
     def test_custom_weights(self):
         """Custom weights should affect the overall score."""
         vec = np.random.rand(384).astype(np.float32)
@@ -251,11 +334,65 @@ class TestEmbeddingGeneration:
             assert isinstance(embedding, bytes)
             
             # Deserialize and check shape
-            vec = pickle.loads(embedding)
+            vec = MatchingEngine.deserialize_embedding(embedding)
             assert vec.shape[0] > 0
         except Exception:
             pytest.skip("Sentence-transformer model not available")
 
+    def test_onnx_backend_falls_back_to_torch(self, monkeypatch):
+        """EMBEDDING_BACKEND=onnx requests the quantized export and falls back if it can't load."""
+        import sys
+        import types
+        from app.config import settings
+        from app.services import matcher
+        calls = []
+
+        class FakeSentenceTransformer:
+            def __init__(self, name, backend="torch", model_kwargs=None):
+                calls.append((backend, model_kwargs))
+                if backend == "onnx":
+                    raise ImportError("optimum is not installed")
+
+        monkeypatch.setitem(sys.modules, "sentence_transformers",
+                            types.SimpleNamespace(SentenceTransformer=FakeSentenceTransformer))
+        monkeypatch.setattr(matcher, "_embedding_model", None)
+        monkeypatch.setattr(settings, "EMBEDDING_BACKEND", "onnx")
+
+        assert isinstance(matcher.get_embedding_model(), FakeSentenceTransformer)
+        assert calls == [
+            ("onnx", {"file_name": settings.EMBEDDING_ONNX_FILE}),
+            ("torch", None),
+        ]
+
+    def test_batcher_coalesces_concurrent_requests(self, monkeypatch):
+        """Concurrent embed() calls share model.encode() batches and get their own vectors back."""
+        import threading
+        from app.services import matcher
+        batches = []
+
+        class FakeModel:
+            def encode(self, texts, batch_size=32):
+                batches.append(len(texts))
+                return [np.array([float(len(t)), 1.0]) for t in texts]
+
+        monkeypatch.setattr(matcher, "get_embedding_model", lambda: FakeModel())
+        batcher = matcher.EmbeddingBatcher(max_batch=8, max_wait=0.5)
+        texts = ["x" * n for n in range(1, 9)]
+        results = [None] * len(texts)
+
+        def embed(i):
+            results[i] = batcher.embed(texts[i])
+
+        threads = [threading.Thread(target=embed, args=(i,)) for i in range(len(texts))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert sum(batches) == len(texts)
+        assert len(batches) < len(texts)
+        assert results == [MatchingEngine.serialize_embedding([len(t), 1.0]) for t in texts]
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,57 @@
+"""
+RSA MVP Enhanced — Unit Tests for Report Generation
+=====================================================
+Tests CSV report output and incremental streaming.
+"""
+
+import csv
+import io
+
+import pytest
+from app.services.reports import ReportGenerator
+
+
+def _result(rank: int) -> dict:
+    return {
+        "rank": rank,
+        "candidate_name": f"Candidate {rank}",
+        "candidate_email": f"c{rank}@example.com",
+        "overall_score": 0.5,
+        "skill_score": 0.4,
+        "experience_score": 0.3,
+        "education_score": 0.2,
+        "semantic_score": 0.1,
+        "bias_adjusted": rank % 2 == 0,
+    }
+
+
+class TestCsvReport:
+    """Tests for CSV generation."""
+
+    def test_csv_has_header_and_rows(self):
+        """CSV should contain a header plus one row per result."""
+        content = ReportGenerator.generate_csv([_result(1), _result(2)], "Engineer")
+        rows = list(csv.reader(io.StringIO(content)))
+        assert rows[0][0] == "Rank"
+        assert len(rows) == 3
+        assert rows[1][1] == "Candidate 1"
+        assert rows[1][3] == "50.0%"
+        assert rows[2][8] == "Yes"
+
+    def test_iter_csv_streams_in_chunks(self):
+        """Streaming output should be chunked and identical to the buffered CSV."""
+        results = [_result(i) for i in range(1, 451)]
+        chunks = list(ReportGenerator.iter_csv(iter(results), "Engineer"))
+        # header + two full chunks + remainder
+        assert len(chunks) == 4
+        assert "".join(chunks) == ReportGenerator.generate_csv(results, "Engineer")
+
+    def test_iter_csv_empty_results(self):
+        """No results should still yield the header."""
+        chunks = list(ReportGenerator.iter_csv([], "Engineer"))
+        assert len(chunks) == 1
+        assert chunks[0].startswith("Rank,")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])